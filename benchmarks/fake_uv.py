@@ -0,0 +1,169 @@
+"""
+Scriptable stand-in for `uv` and `pip` used by the benchmark suite.
+
+Invoked as `fake_uv.py uv ARGS...` or `fake_uv.py pip ARGS...` by the
+wrapper scripts that run.py puts on PATH. It answers from the synthetic
+package set described in synthetic.py.
+
+    PKGR_FAKE_PACKAGES   number of installed packages (default 100)
+    PKGR_FAKE_LATENCY    seconds to sleep before answering (default 0)
+    PKGR_FAKE_STREAM_SECONDS
+                         spread the JSON of `pip list` over this many seconds,
+                         still on a single line like uv (default 0)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+
+# options that take a value, so the value is not mistaken for a package
+_VALUE_OPTIONS = {"--python", "-p", "-r", "--requirement", "--format", "--index-url"}
+
+
+def positional(args: list[str]) -> list[str]:
+    names = []
+    skip = False
+
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg in _VALUE_OPTIONS:
+            skip = True
+        elif not arg.startswith("-"):
+            names.append(arg)
+
+    return names
+
+
+def pip_list(count: int, args: list[str]):
+    outdated = "--outdated" in args
+    rows = []
+
+    for i in range(count):
+        row = {
+            "name": synthetic.package_name(i),
+            "version": synthetic.installed_version(i),
+        }
+        if outdated:
+            if synthetic.latest_version(i) == row["version"]:
+                continue
+            row["latest_version"] = synthetic.latest_version(i)
+            row["latest_filetype"] = "wheel"
+        rows.append(row)
+
+    seconds = float(os.environ.get("PKGR_FAKE_STREAM_SECONDS", "0"))
+    if not seconds or not rows:
+        print(json.dumps(rows))
+        return
+
+    sys.stdout.write("[")
+    for i, row in enumerate(rows):
+        sys.stdout.write((", " if i else "") + json.dumps(row))
+        sys.stdout.flush()
+        time.sleep(seconds / len(rows))
+    sys.stdout.write("]\n")
+
+
+def pip_show(count: int, names: list[str]) -> int:
+    i = synthetic.package_index(names[0]) if names else -1
+    if not 0 <= i < count:
+        print(f"warning: Package(s) not found for: {' '.join(names)}", file=sys.stderr)
+        return 1
+
+    required_by = [synthetic.package_name(j) for j in (i - 1, i - 2) if j >= 0]
+    print(f"Name: {synthetic.package_name(i)}")
+    print(f"Version: {synthetic.installed_version(i)}")
+    print(f"Location: {os.getcwd()}")
+    print(f"Requires: {', '.join(synthetic.requires(i, count))}")
+    print(f"Required-by: {', '.join(required_by)}")
+
+    return 0
+
+
+def pip_change(count: int, command: str, args: list[str]):
+    # pinned requirements (name==version) are resolved like plain names
+    names = [re.split(r"[<>=!~;\[ ]", arg, maxsplit=1)[0] for arg in positional(args)]
+    upgrade = command == "install" and ("--upgrade" in args or "-U" in args)
+    dry_run = "--dry-run" in args
+
+    lines = []
+    for name in names:
+        i = synthetic.package_index(name)
+        installed = 0 <= i < count
+        if command == "uninstall":
+            if installed:
+                lines.append(f" - {name}=={synthetic.installed_version(i)}")
+        elif not installed:
+            lines.append(f" + {name}=={synthetic.LATEST}")
+        elif upgrade and synthetic.latest_version(i) != synthetic.installed_version(i):
+            lines.append(f" - {name}=={synthetic.installed_version(i)}")
+            lines.append(f" + {name}=={synthetic.latest_version(i)}")
+
+    if command == "uninstall":
+        verb, sign = "Uninstalled", " -"
+    else:
+        verb, sign = "Installed", " +"
+    if dry_run:
+        verb = f"Would {verb[:-2].lower()}"
+    changed = sum(line.startswith(sign) for line in lines)
+    print(f"Resolved {len(names)} packages in 1ms", file=sys.stderr)
+    print(f"{verb} {changed} packages in 1ms", file=sys.stderr)
+    for line in lines:
+        print(line, file=sys.stderr)
+
+
+def pip_index_versions(count: int, names: list[str]) -> int:
+    i = synthetic.package_index(names[0]) if names else -1
+    if not 0 <= i < count:
+        print(f"ERROR: No matching distribution found for {names}", file=sys.stderr)
+        return 1
+
+    latest = synthetic.latest_version(i)
+    print(f"{synthetic.package_name(i)} ({latest})")
+    print(f"Available versions: {latest}, {synthetic.installed_version(i)}")
+    print(f"  INSTALLED: {synthetic.installed_version(i)}")
+    print(f"  LATEST:    {latest}")
+
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    time.sleep(float(os.environ.get("PKGR_FAKE_LATENCY", "0")))
+    count = int(os.environ.get("PKGR_FAKE_PACKAGES", "100"))
+
+    program, args = argv[0], argv[1:]
+
+    if program == "uv":
+        if args[:2] == ["python", "list"]:
+            print("[]")
+            return 0
+        if not args or args[0] != "pip":
+            print(f"fake uv: unsupported command {args}", file=sys.stderr)
+            return 2
+        args = args[1:]
+
+    command, rest = (args[0], args[1:]) if args else ("", [])
+
+    if command == "list":
+        pip_list(count, rest)
+    elif command == "show":
+        return pip_show(count, positional(rest))
+    elif command in ("install", "uninstall"):
+        pip_change(count, command, rest)
+    elif command == "index" and rest[:1] == ["versions"]:
+        return pip_index_versions(count, positional(rest[1:]))
+    else:
+        print(f"fake {program}: unsupported command {args}", file=sys.stderr)
+        return 2
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,188 @@
+"""
+Time to first frame of the GUI.
+
+Starts the application in fresh interpreters, stops it as soon as the
+first frame has been drawn and fails (exit code 1) when the median wall
+time from process start exceeds the budget. One extra run under
+`python -X importtime` records the import time of every module.
+
+    python benchmarks/first_frame.py [--runs 5] [--budget-ms 1500] [--top 15]
+
+Needs a display (use xvfb-run on headless machines). Without one only the
+imports on the way to the first frame are measured and reported, and the
+exit code is 2 so that the missing measurement does not pass as a success.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+DEFAULT_BUDGET_MS = 1500
+
+# the probe prints the startup marks once the first frame is drawn and quits
+_PROBE = """
+import json
+from pkgr.core.startup import StartupProfile
+profile = StartupProfile.default()
+from pkgr.gui.main_window import PackageManagerApp
+profile.mark("imports")
+app = PackageManagerApp()
+
+def done():
+    print(json.dumps(profile.marks), flush=True)
+    app.destroy()
+
+app.after_idle(done)
+app.mainloop()
+"""
+
+# without a display only the imports can run, Tk needs one for the window
+_IMPORTS_PROBE = """
+import json
+from pkgr.core.startup import StartupProfile
+profile = StartupProfile.default()
+from pkgr.gui.main_window import PackageManagerApp
+profile.mark("imports")
+print(json.dumps(profile.marks), flush=True)
+"""
+
+
+def has_display() -> bool:
+    """Whether Tk can open a window, only Linux may lack a display."""
+
+    if not sys.platform.startswith("linux"):
+        return True
+
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def run_once(
+    env: dict[str, str], importtime: bool = False, probe: str = _PROBE
+) -> tuple[float, dict, str]:
+    flags = ["-X", "importtime"] if importtime else []
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, *flags, "-c", probe],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    first_line = process.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, stderr = process.communicate(timeout=60)
+
+    if process.returncode != 0 or not first_line:
+        raise RuntimeError(f"probe failed:\n{stderr}")
+
+    return elapsed, json.loads(first_line), stderr
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """Rows of `-X importtime` output as {module, self_ms, cumulative_ms}."""
+
+    modules = []
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append(
+            {
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(
+            os.environ.get("PKGR_FIRST_FRAME_BUDGET_MS", DEFAULT_BUDGET_MS)
+        ),
+    )
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to show")
+    options = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+
+    if not has_display():
+        run_once(env, probe=_IMPORTS_PROBE)  # warms the caches
+        _, marks, importtime = run_once(env, importtime=True, probe=_IMPORTS_PROBE)
+        modules = parse_importtime(importtime)
+        slowest = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+
+        print(
+            json.dumps(
+                {
+                    "benchmark": "first_frame",
+                    "skipped": "no display, only the imports were measured",
+                    "marks": marks,
+                    "import_total_ms": round(sum(m["self_ms"] for m in modules), 1),
+                    "slowest_imports": slowest[: options.top],
+                },
+                indent=2,
+            )
+        )
+        print(
+            "SKIPPED: the first frame needs a display, run under xvfb-run",
+            file=sys.stderr,
+        )
+        return 2
+
+    _, _, importtime = run_once(env, importtime=True)  # also warms the caches
+    modules = parse_importtime(importtime)
+
+    runs = [run_once(env) for _ in range(options.runs)]
+    times = [elapsed for elapsed, _, _ in runs]
+    median = statistics.median(times)
+
+    slowest = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)
+    pkgr_modules = [m for m in modules if m["module"].startswith("pkgr")]
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "first_frame",
+                "runs": options.runs,
+                "median_ms": round(median, 1),
+                "min_ms": round(min(times), 1),
+                "budget_ms": options.budget_ms,
+                # phases inside the process, ms since main() started
+                "marks": runs[times.index(min(times))][1],
+                "import_total_ms": round(sum(m["self_ms"] for m in modules), 1),
+                "slowest_imports": slowest[: options.top],
+                "pkgr_imports": pkgr_modules,
+            },
+            indent=2,
+        )
+    )
+
+    if median > options.budget_ms:
+        print(
+            f"FAIL: median {median:.0f} ms to first frame is over the budget"
+            f" of {options.budget_ms:.0f} ms",
+            file=sys.stderr,
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+"""
+Benchmark suite for pkgr's hot paths.
+
+Puts a fake `uv`/`pip` (fake_uv.py) on PATH and a fake package index on
+localhost, builds synthetic environments and times every PackageManager
+method, the Operations flows and, when a display (or Xvfb) is available,
+PackageWindow.populate_treeview and filtering. Results are saved as JSON.
+
+    python benchmarks/run.py [--sizes 100,1000,10000,50000] [--repeat 5]
+                             [--latency 0.0] [--output results.json]
+    python benchmarks/run.py --compare old.json new.json [--threshold 1.2]
+
+Every PackageManager method is timed against two backends: "uv", where no
+site-packages is found and every query goes through the fake uv, and
+"index", where the synthetic environment is targeted directly.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+BENCHMARKS = Path(__file__).resolve().parent
+ROOT = BENCHMARKS.parent
+
+sys.path.insert(0, str(BENCHMARKS))
+sys.path.insert(0, str(ROOT / "src"))
+
+import synthetic  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+
+# querying the index for every package costs one HTTP request each
+DEFAULT_MAX_INDEX_SIZE = 1000
+
+SEARCH_QUERIES = ["synth", "pkg-0001", "number 42", "zzz", ""]
+
+
+# fake environment
+
+
+def install_fake_tools(bin_dir: Path):
+    """Write uv and pip wrappers that run fake_uv.py."""
+
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    script = BENCHMARKS / "fake_uv.py"
+
+    for program in ("uv", "pip"):
+        if os.name == "nt":
+            wrapper = bin_dir / f"{program}.cmd"
+            wrapper.write_text(f'@"{sys.executable}" "{script}" {program} %*\r\n')
+        else:
+            wrapper = bin_dir / program
+            wrapper.write_text(
+                f'#!/bin/sh\nexec "{sys.executable}" "{script}" {program} "$@"\n'
+            )
+            wrapper.chmod(0o755)
+
+
+class _IndexHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+
+        name = self.path.strip("/").split("/")[-1]
+        i = synthetic.package_index(name)
+
+        if i < 0:
+            self.send_error(404)
+            return
+
+        versions = [synthetic.installed_version(i), synthetic.latest_version(i)]
+        body = json.dumps(
+            {
+                "meta": {"api-version": "1.1"},
+                "name": synthetic.package_name(i),
+                "files": [
+                    {"filename": f"{name.replace('-', '_')}-{v}-py3-none-any.whl"}
+                    for v in dict.fromkeys(versions)
+                ],
+            }
+        ).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.pypi.simple.v1+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=0")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_index(latency: float) -> ThreadingHTTPServer:
+    _IndexHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _IndexHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def start_virtual_display() -> Optional[subprocess.Popen]:
+    """Start Xvfb when there is no display, None if there is no need or no Xvfb."""
+
+    if os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        return None
+
+    display = f":{os.getpid() % 1000 + 100}"
+    process = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+
+    return process
+
+
+# measuring
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    """Time fn repeat times, the first call is reported separately as cold."""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "cold_ms": round(times[0], 3),
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+        "runs": repeat,
+    }
+
+
+class Suite:
+    def __init__(self, repeat: int, max_index_size: int):
+        self.repeat = repeat
+        self.max_index_size = max_index_size
+        self.results: list[dict] = []
+
+    def record(self, name: str, size: int, fn: Callable[[], object], repeat=None):
+        try:
+            stats = measure(fn, repeat or self.repeat)
+        except Exception as e:
+            stats = {"error": f"{type(e).__name__}: {e}"}
+
+        self.results.append({"name": name, "size": size, **stats})
+        summary = stats.get("median_ms", stats.get("error"))
+        print(f"  {name:<48} {size:>6}  {summary}", file=sys.stderr)
+
+    def skip(self, name: str, size: int, reason: str):
+        self.results.append({"name": name, "size": size, "skipped": reason})
+
+    def package_manager(self, backend: str, size: int):
+        from pkgr.core.package_manager import PackageManager
+
+        first = synthetic.package_name(0)
+        middle = synthetic.package_name(size // 2)
+        batch = [synthetic.package_name(i) for i in range(0, size, size // 10 or 1)]
+        output = "\n".join(f" + {name}==2.0.0" for name in batch)
+        changes = PackageManager.parse_uv_changes(output)
+
+        methods = {
+            "check_package_if_installed": lambda: (
+                PackageManager.check_package_if_installed(middle)
+            ),
+            "get_installed_packages": PackageManager.get_installed_packages,
+            "stream_installed_packages": lambda: (
+                PackageManager.stream_installed_packages(lambda rows: None)
+            ),
+            "get_packages_details": lambda: PackageManager.get_packages_details(middle),
+            "get_package_summaries": PackageManager.get_package_summaries,
+            "get_dependency_graph": PackageManager.get_dependency_graph,
+            "check_package_version": lambda: (
+                PackageManager.check_package_version(first)
+            ),
+            "install_package": lambda: PackageManager.install_package("new-package"),
+            "upgrade_package": lambda: PackageManager.upgrade_package(first),
+            "uninstall_package": lambda: PackageManager.uninstall_package(first),
+            "install_packages": lambda: PackageManager.install_packages(batch),
+            "uninstall_packages": lambda: PackageManager.uninstall_packages(batch),
+            "parse_uv_changes": lambda: PackageManager.parse_uv_changes(output),
+            "summarize_batch": lambda: (
+                PackageManager.summarize_batch(batch, changes, "install")
+            ),
+        }
+
+        for method, fn in methods.items():
+            self.record(f"{backend}/PackageManager.{method}", size, fn)
+
+        name = f"{backend}/PackageManager.get_outdated_packages"
+        if backend == "index" and size > self.max_index_size:
+            self.skip(name, size, f"more than {self.max_index_size} index requests")
+        else:
+            self.record(name, size, PackageManager.get_outdated_packages)
+
+    def operations(self, backend: str, size: int):
+        from pkgr.core.base_operation import Operations
+
+        def noop(*args, **kwargs):
+            pass
+
+        first = synthetic.package_name(0)
+        batch = [synthetic.package_name(i) for i in range(10)] + ["new-package"]
+        flows = {
+            "install_new": ("new-package", "install"),
+            "install_existing": (first, "install"),
+            "upgrade": (first, "upgrade"),
+            "uninstall": (first, "uninstall"),
+            "batch_install": (batch, "install"),
+            "batch_uninstall": (batch, "uninstall"),
+        }
+
+        for flow, (names, operation) in flows.items():
+            self.record(
+                f"{backend}/Operations.{flow}",
+                size,
+                lambda: Operations(
+                    names, operation, noop, noop, noop, noop, None, noop
+                ),
+            )
+
+    def package_window(self, size: int, root):
+        from pkgr.core.package_manager import PackageManager
+        from pkgr.gui.packages_window import PackageWindow
+
+        packages = PackageManager.get_installed_packages()
+        columns = ["#", "package_name", "version"]
+
+        created = []
+        self.record(
+            "gui/PackageWindow.__init__",
+            size,
+            lambda: created.append(
+                PackageWindow("installed", packages, root, columns, "benchmark")
+            ),
+            repeat=1,
+        )
+        if not created:
+            return
+        window = created[0]
+
+        # rows are inserted over the following event-loop turns
+        def until(done):
+            while not done():
+                root.update()
+
+        self.record(
+            "gui/PackageWindow.first_rows",
+            size,
+            lambda: until(lambda: window.rows),
+            repeat=1,
+        )
+        self.record(
+            "gui/PackageWindow.loaded",
+            size,
+            lambda: until(lambda: not window.loading),
+            repeat=1,
+        )
+
+        # rebuilding from scratch, then with every row reused
+        def populate_fresh():
+            window.items, window.rows = [], []
+            window.treeview.delete(*window.treeview.get_children())
+            window.populate_treeview(list(packages))
+            root.update_idletasks()
+
+        self.record("gui/PackageWindow.populate_treeview", size, populate_fresh)
+        self.record(
+            "gui/PackageWindow.populate_treeview_unchanged",
+            size,
+            lambda: window.populate_treeview(list(packages)),
+        )
+
+        for query in SEARCH_QUERIES:
+
+            def run_filter(query=query):
+                window.search_var.set(query)
+                window.apply_filter()
+                root.update_idletasks()
+
+            name = f"gui/PackageWindow.filter_packages[{query!r}]"
+            self.record(name, size, run_filter)
+
+        window.window.destroy()
+
+
+def run_suite(options) -> dict:
+    workdir = Path(options.workdir or tempfile.mkdtemp(prefix="pkgr-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    bin_dir = workdir / "bin"
+    install_fake_tools(bin_dir)
+    index = start_fake_index(options.latency)
+
+    # isolate pkgr from the real environment, caches and index
+    for var in ("VIRTUAL_ENV", "CONDA_PREFIX", "UV_DEFAULT_INDEX", "PIP_INDEX_URL"):
+        os.environ.pop(var, None)
+    os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ["PATH"]
+    os.environ["PKGR_FAKE_LATENCY"] = str(options.latency)
+    os.environ["PKGR_CACHE_DIR"] = str(workdir / "cache")
+    os.environ["PKGR_CONFIG_DIR"] = str(workdir / "config")
+    os.environ["UV_INDEX_URL"] = f"http://127.0.0.1:{index.server_port}/simple/"
+    os.chdir(workdir)
+
+    from pkgr.core.environments import python_executable
+    from pkgr.core.package_manager import PackageManager
+
+    suite = Suite(options.repeat, options.max_index_size)
+
+    display = None
+    root = None
+    if not options.no_gui:
+        display = start_virtual_display()
+        try:
+            import customtkinter
+
+            root = customtkinter.CTk()
+            root.withdraw()
+            from pkgr.gui.dispatcher import UiDispatcher
+
+            root.update_status = lambda *args, **kwargs: None
+            root.refresh_prefetched = lambda: None
+            root.submit_job = lambda description, run, **kwargs: run()
+            root.ui = UiDispatcher(root)
+        except Exception as e:
+            print(f"GUI benchmarks skipped: {e}", file=sys.stderr)
+
+    try:
+        for size in options.sizes:
+            print(f"{size} packages", file=sys.stderr)
+            os.environ["PKGR_FAKE_PACKAGES"] = str(size)
+            prefix = synthetic.make_environment(workdir / "envs", size)
+
+            PackageManager.set_environment(None)
+            suite.package_manager("uv", size)
+            suite.operations("uv", size)
+
+            PackageManager.set_environment(str(prefix), python_executable(str(prefix)))
+            suite.package_manager("index", size)
+            suite.operations("index", size)
+
+            if root is not None:
+                suite.package_window(size, root)
+            else:
+                suite.skip("gui/PackageWindow", size, "no display or customtkinter")
+    finally:
+        if root is not None:
+            root.destroy()
+        if display is not None:
+            display.terminate()
+        index.shutdown()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": options.sizes,
+            "repeat": options.repeat,
+            "latency_s": options.latency,
+        },
+        "results": suite.results,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# comparing
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Print the median of every benchmark in both files, exit 1 on regressions."""
+
+    def load(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {
+            (r["name"], r["size"]): r["median_ms"]
+            for r in data["results"]
+            if "median_ms" in r
+        }, data["meta"]
+
+    old, old_meta = load(old_path)
+    new, new_meta = load(new_path)
+
+    print(f"{'benchmark':<56} {'size':>6} {old_meta['commit']:>10} "
+          f"{new_meta['commit']:>10} {'ratio':>7}")
+
+    regressions = 0
+    for key in sorted(old.keys() & new.keys(), key=lambda k: (k[1], k[0])):
+        before, after = old[key], new[key]
+        ratio = after / before if before else 1.0
+        flag = ""
+        # sub-millisecond timings are too noisy to call regressions
+        if ratio > threshold and after - before > 1:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[0]:<56} {key[1]:>6} {before:>10.2f} {after:>10.2f} "
+              f"{ratio:>6.2f}x{flag}")
+
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        type=lambda text: [int(size) for size in text.split(",")],
+        default=DEFAULT_SIZES,
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every fake call"
+    )
+    parser.add_argument("--max-index-size", type=int, default=DEFAULT_MAX_INDEX_SIZE)
+    parser.add_argument("--workdir", help="reuse synthetic environments from here")
+    parser.add_argument("--output", help="default: benchmarks/results/<commit>.json")
+    parser.add_argument("--no-gui", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.2)
+    options = parser.parse_args()
+
+    if options.compare:
+        return compare(*options.compare, options.threshold)
+
+    # the suite changes the working directory
+    output = Path(options.output).resolve() if options.output else None
+
+    results = run_suite(options)
+
+    if output is None:
+        output = BENCHMARKS / "results" / f"{results['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"results written to {output}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
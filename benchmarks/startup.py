@@ -0,0 +1,108 @@
+"""
+Startup budget of the headless CLI.
+
+Runs `pkgr list` in fresh interpreters and fails (exit code 1) when the
+median wall time exceeds the budget or when the command imported Tk.
+
+    python benchmarks/startup.py [--runs 7] [--budget-ms 600] [--prefix PATH]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+DEFAULT_BUDGET_MS = 600
+
+# prints the modules a `pkgr list` run left behind
+_PROBE = """
+import sys
+import json
+import pkgr.main
+try:
+    pkgr.main.main(sys.argv[1:])
+except SystemExit:
+    pass
+gui = [m for m in sys.modules if m.split(".")[0] in ("tkinter", "customtkinter")]
+print(json.dumps(gui), file=sys.stderr)
+"""
+
+
+def run_once(args: list[str], env: dict[str, str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "pkgr.main", *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def gui_modules(args: list[str], env: dict[str, str]) -> list[str]:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.environ.get("PKGR_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+    )
+    parser.add_argument("--prefix", help="environment to list, default: sys.prefix")
+    options = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    args = ["list", "--format", "ndjson", "--prefix", options.prefix or sys.prefix]
+
+    run_once(args, env)  # warm the OS file cache and the metadata store
+    times = [run_once(args, env) for _ in range(options.runs)]
+    median = statistics.median(times)
+    leaked = gui_modules(args, env)
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "cli_startup",
+                "runs": options.runs,
+                "median_ms": round(median, 1),
+                "min_ms": round(min(times), 1),
+                "budget_ms": options.budget_ms,
+                "gui_modules": leaked,
+            }
+        )
+    )
+
+    if leaked:
+        print(f"FAIL: `pkgr list` imported {', '.join(leaked)}", file=sys.stderr)
+        return 1
+    if median > options.budget_ms:
+        print(
+            f"FAIL: median {median:.0f} ms is over the budget"
+            f" of {options.budget_ms:.0f} ms",
+            file=sys.stderr,
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Deterministic synthetic package sets shared by the fake uv and the suite.
+
+Package i is called synth-pkg-{i:05d}, every third one has a newer
+release on the (fake) index and every package requires the next two.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+PREFIX = "synth-pkg-"
+LATEST = "2.0.0"
+
+
+def package_name(i: int) -> str:
+    return f"{PREFIX}{i:05d}"
+
+
+def package_index(name: str) -> int:
+    """Position of a synthetic package, -1 for any other name."""
+
+    name = name.lower().replace("_", "-")
+    if not name.startswith(PREFIX):
+        return -1
+    try:
+        return int(name[len(PREFIX) :])
+    except ValueError:
+        return -1
+
+
+def installed_version(i: int) -> str:
+    return f"1.{i % 10}.{i % 7}"
+
+
+def latest_version(i: int) -> str:
+    return LATEST if i % 3 == 0 else installed_version(i)
+
+
+def requires(i: int, count: int) -> list[str]:
+    return [package_name(j) for j in (i + 1, i + 2) if j < count]
+
+
+def packages(count: int) -> list[tuple[str, str]]:
+    return [(package_name(i), installed_version(i)) for i in range(count)]
+
+
+def _metadata(i: int, count: int) -> str:
+    lines = [
+        "Metadata-Version: 2.1",
+        f"Name: {package_name(i)}",
+        f"Version: {installed_version(i)}",
+        f"Summary: Synthetic package number {i}",
+        "Home-page: https://example.invalid/",
+        "Author: pkgr benchmarks",
+        "License: MIT",
+    ]
+    lines += [f"Requires-Dist: {name}" for name in requires(i, count)]
+
+    return "\n".join(lines) + "\n\n"
+
+
+def make_environment(root: Path, count: int) -> Path:
+    """
+    Create (or reuse) an environment holding count synthetic packages.
+
+    Returns:
+        Path: the environment prefix
+    """
+
+    prefix = root / f"env-{count}"
+    marker = prefix / ".complete"
+    if marker.exists():
+        return prefix
+
+    version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    if os.name == "nt":
+        site = prefix / "Lib" / "site-packages"
+        scripts = prefix / "Scripts"
+        python = scripts / "python.exe"
+    else:
+        site = prefix / "lib" / version / "site-packages"
+        scripts = prefix / "bin"
+        python = scripts / "python"
+
+    site.mkdir(parents=True, exist_ok=True)
+    scripts.mkdir(parents=True, exist_ok=True)
+    (prefix / "pyvenv.cfg").write_text(f"home = {Path(sys.executable).parent}\n")
+    if not python.exists():
+        os.symlink(sys.executable, python)
+
+    for i in range(count):
+        name = package_name(i).replace("-", "_")
+        dist_info = site / f"{name}-{installed_version(i)}.dist-info"
+        dist_info.mkdir(exist_ok=True)
+        (dist_info / "METADATA").write_text(_metadata(i, count))
+        (dist_info / "INSTALLER").write_text("uv\n")
+        (dist_info / "RECORD").write_text(
+            f"{name}/__init__.py,sha256=,{100 + i % 900}\n"
+            f"{dist_info.name}/METADATA,,\n"
+        )
+
+    marker.write_text("")
+
+    return prefix
@@ -0,0 +1,424 @@
+import os
+import sys
+import json
+import argparse
+from typing import Any, Iterable, Optional
+
+# pkgr.core is imported inside the commands so `pkgr --help` stays instant
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pkgr",
+        description=(
+            "Manage the packages of a Python environment. "
+            "Without a command the graphical interface is started."
+        ),
+    )
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="json prints one document, ndjson one record per line (default: json)",
+    )
+    common.add_argument(
+        "--prefix",
+        help="environment to manage, defaults to the environment uv would use",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    subparsers.add_parser("list", parents=[common], help="list installed packages")
+    subparsers.add_parser(
+        "outdated", parents=[common], help="list packages with a newer version"
+    )
+
+    du = subparsers.add_parser(
+        "du", parents=[common], help="list installed packages by disk usage"
+    )
+    du.add_argument(
+        "--top", type=int, metavar="N", help="only list the N largest packages"
+    )
+    du.add_argument(
+        "--total",
+        action="store_true",
+        help="only print the totals of the environment",
+    )
+
+    show = subparsers.add_parser(
+        "show", parents=[common], help="show the metadata of a package"
+    )
+    show.add_argument("package")
+
+    for name, text in (
+        ("install", "install packages"),
+        ("uninstall", "uninstall packages"),
+        ("upgrade", "upgrade packages to their latest version"),
+    ):
+        sub = subparsers.add_parser(name, parents=[common], help=text)
+        sub.add_argument("packages", nargs="*")
+        sub.add_argument(
+            "-v",
+            "--verbose",
+            action="store_true",
+            help="stream the output of uv to stderr",
+        )
+        if name == "install":
+            sub.add_argument(
+                "-r", "--requirement", help="install from a requirements file"
+            )
+        if name != "uninstall":
+            sub.add_argument(
+                "--dry-run",
+                action="store_true",
+                help="only print the packages that would change",
+            )
+
+    export = subparsers.add_parser(
+        "export", parents=[common], help="write the installed packages to a lock file"
+    )
+    export.add_argument("lock_file", help="file to write, '-' for stdout")
+
+    diff = subparsers.add_parser(
+        "diff",
+        parents=[common],
+        help="compare a lock file with another one or with the environment",
+    )
+    diff.add_argument("old", help="lock file")
+    diff.add_argument("new", nargs="?", help="lock file, defaults to the environment")
+
+    sync = subparsers.add_parser(
+        "sync",
+        parents=[common],
+        help="make the environment match a lock file in a single uv pip sync",
+    )
+    sync.add_argument("lock_file")
+    sync.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="stream the output of uv to stderr",
+    )
+
+    wheelhouse = subparsers.add_parser(
+        "wheelhouse",
+        parents=[common],
+        help="manage the local wheel store installs use before the index",
+    )
+    wheelhouse.add_argument(
+        "action",
+        choices=("list", "populate", "add", "evict"),
+        help="list the stored wheels, populate it from the environment or a lock "
+        "file, add wheel files or evict the least recently used wheels",
+    )
+    wheelhouse.add_argument(
+        "paths", nargs="*", help="wheel files or directories to add"
+    )
+    wheelhouse.add_argument(
+        "--lock", help="populate from this lock file instead of the environment"
+    )
+    wheelhouse.add_argument(
+        "--max-mb",
+        type=int,
+        help="evict down to this size (default: PKGR_WHEELHOUSE_MAX_MB or 2048)",
+    )
+    wheelhouse.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="stream the output of pip to stderr",
+    )
+
+    return parser
+
+
+def emit(records: Iterable[dict[str, Any]], fmt: str, single: bool = False):
+    """Write records to stdout as one JSON document or as NDJSON lines."""
+
+    if fmt == "ndjson":
+        for record in records:
+            sys.stdout.write(json.dumps(record) + "\n")
+        return
+
+    records = list(records)
+    document = records[0] if single else records
+    sys.stdout.write(json.dumps(document, indent=2) + "\n")
+
+
+def _stream_to_stderr(line: str):
+    sys.stderr.write(line.rstrip("\n") + "\n")
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Run a subcommand.
+
+    Args:
+        args: Parsed command line, args.command must be set
+
+    Returns:
+        int: process exit code
+    """
+
+    from pkgr.core.package_manager import PackageManager
+
+    if args.prefix:
+        from pkgr.core.environments import python_executable
+
+        python = python_executable(args.prefix)
+        if python is None:
+            sys.stderr.write(f"pkgr: no Python environment at {args.prefix}\n")
+            return 2
+
+        PackageManager.set_environment(args.prefix, python)
+
+    if args.command == "list":
+        emit(
+            (
+                {"name": name, "version": version}
+                for name, version in PackageManager.get_installed_packages()
+            ),
+            args.format,
+        )
+        return 0
+
+    if args.command == "outdated":
+        outdated = PackageManager.get_outdated_packages()
+        emit(
+            (
+                {
+                    "name": name,
+                    "version": current,
+                    "latest_version": latest,
+                    "update_kind": kind,
+                }
+                for name, current, latest, kind in outdated
+            ),
+            args.format,
+        )
+        return 0
+
+    if args.command == "du":
+        packages, (count, files, size) = PackageManager.get_disk_usage(args.top)
+        if not count:
+            sys.stderr.write("pkgr du: the environment could not be scanned\n")
+            return 1
+
+        if args.total:
+            emit(
+                [{"packages": count, "files": files, "size": size}],
+                args.format,
+                single=True,
+            )
+        else:
+            emit(
+                (
+                    {"name": name, "version": version, "size": size}
+                    for name, version, size in packages
+                ),
+                args.format,
+            )
+        return 0
+
+    if args.command == "show":
+        details = PackageManager.get_packages_details(args.package)
+        if not details:
+            sys.stderr.write(f"pkgr: package not found: {args.package}\n")
+            return 1
+
+        record = {
+            key.lower().replace("-", "_"): value.strip()
+            for key, value in details.items()
+        }
+        emit([record], args.format, single=True)
+        return 0
+
+    if args.command in ("export", "diff", "sync"):
+        return run_snapshot(args)
+
+    if args.command == "wheelhouse":
+        return run_wheelhouse(args)
+
+    on_output = _stream_to_stderr if args.verbose else None
+    requirements_file = getattr(args, "requirement", None)
+
+    if not args.packages and not requirements_file:
+        sys.stderr.write(f"pkgr {args.command}: no packages given\n")
+        return 2
+
+    if getattr(args, "dry_run", False):
+        success, message, plan = PackageManager.preview_install(
+            args.packages,
+            requirements_file=requirements_file,
+            upgrade=args.command == "upgrade",
+        )
+        if not success:
+            sys.stderr.write(message.rstrip("\n") + "\n")
+            return 1
+
+        records = [
+            {"name": name, "action": "install", "version": version}
+            for name, version in plan.added.items()
+        ]
+        records.extend(
+            {"name": name, "action": "change", "from": old, "version": new}
+            for name, (old, new) in plan.changed.items()
+        )
+        records.extend(
+            {"name": name, "action": "remove", "version": version}
+            for name, version in plan.removed.items()
+        )
+        emit(records, args.format)
+        return 0
+
+    if args.command == "uninstall":
+        success, message, results = PackageManager.uninstall_packages(
+            args.packages, on_output=on_output
+        )
+    else:
+        success, message, results = PackageManager.install_packages(
+            args.packages,
+            requirements_file=requirements_file,
+            upgrade=args.command == "upgrade",
+            on_output=on_output,
+        )
+
+    if not success:
+        sys.stderr.write(message.rstrip("\n") + "\n")
+
+    emit(
+        (
+            {"name": name, "result": result, "success": success}
+            for name, result in results.items()
+        ),
+        args.format,
+    )
+
+    return 0 if success else 1
+
+
+def run_snapshot(args: argparse.Namespace) -> int:
+    """The export, diff and sync subcommands."""
+
+    from pkgr.core.package_manager import PackageManager
+    from pkgr.core.snapshots import Snapshot, diff_snapshots
+
+    if args.command == "export":
+        snapshot = PackageManager.snapshot_environment()
+        if not snapshot.packages:
+            sys.stderr.write("pkgr export: no installed packages found\n")
+            return 1
+
+        if args.lock_file == "-":
+            sys.stdout.write(snapshot.dumps())
+        else:
+            snapshot.save(args.lock_file)
+            emit(
+                [{"lock_file": args.lock_file, "packages": len(snapshot.packages)}],
+                args.format,
+                single=True,
+            )
+        return 0
+
+    try:
+        if args.command == "diff":
+            old = Snapshot.load(args.old)
+            new = Snapshot.load(args.new) if args.new else None
+        else:
+            target = Snapshot.load(args.lock_file)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"pkgr {args.command}: {e}\n")
+        return 2
+
+    if args.command == "diff":
+        if new is None:
+            new = PackageManager.snapshot_environment()
+        emit(diff_snapshots(old, new).records(), args.format)
+        return 0
+
+    # report the changes going from the environment to the lock file
+    diff = diff_snapshots(PackageManager.snapshot_environment(), target)
+
+    if not diff:
+        emit([], args.format)
+        return 0
+
+    success, message, _ = PackageManager.sync_environment(
+        args.lock_file, on_output=_stream_to_stderr if args.verbose else None
+    )
+
+    if not success:
+        sys.stderr.write(message.rstrip("\n") + "\n")
+        return 1
+
+    emit(diff.records(), args.format)
+    return 0
+
+
+def run_wheelhouse(args: argparse.Namespace) -> int:
+    """The wheelhouse subcommand."""
+
+    from pkgr.core.package_manager import PackageManager
+    from pkgr.core.wheelhouse import Wheelhouse
+
+    wheelhouse = Wheelhouse.default()
+
+    if args.action == "populate":
+        success, message, added = PackageManager.populate_wheelhouse(
+            args.lock, on_output=_stream_to_stderr if args.verbose else None
+        )
+        sys.stderr.write(message + "\n")
+        emit((entry._asdict() for entry in added), args.format)
+        return 0 if success else 1
+
+    if args.action == "add":
+        if not args.paths:
+            sys.stderr.write("pkgr wheelhouse add: no wheel files given\n")
+            return 2
+
+        added = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                added.extend(wheelhouse.add_directory(path))
+                continue
+
+            try:
+                entry = wheelhouse.add(path)
+            except OSError as e:
+                sys.stderr.write(f"pkgr wheelhouse add: {e}\n")
+                return 1
+            if entry is None:
+                sys.stderr.write(f"pkgr wheelhouse add: not a wheel: {path}\n")
+                return 2
+            added.append(entry)
+
+        wheelhouse.evict()
+        emit((entry._asdict() for entry in added), args.format)
+        return 0
+
+    if args.action == "evict":
+        max_bytes = None if args.max_mb is None else args.max_mb * 1024 * 1024
+        evicted = wheelhouse.evict(max_bytes)
+        emit((entry._asdict() for entry in evicted), args.format)
+        return 0
+
+    emit((entry._asdict() for entry in wheelhouse.entries()), args.format)
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> Optional[int]:
+    """
+    Parse the command line and run a subcommand.
+
+    Returns:
+        Exit code of the subcommand, None when no subcommand was given
+    """
+
+    args = build_parser().parse_args(argv)
+
+    if args.command is None:
+        return None
+
+    return run(args)
@@ -1,4 +1,9 @@
 from pkgr.core.package_manager import PackageManager
+from pkgr.core.metadata_store import requirement_name
+from pkgr.core.progress import UvProgress
+
+# planned changes listed in the confirmation before an install
+PREVIEW_LINES = 20
 
 
 class Operations:
@@ -10,14 +15,30 @@ class Operations:
         show_info_win,
         show_err_win,
         update_status,
+        requirements_file=None,
+        update_progress_ui=None,
+        confirm=None,
     ):
-        self.name = name
+        # a single name or a list of names for batch operations
+        self.names = [name] if isinstance(name, str) else list(name)
+        self.name = ", ".join(self.names) or requirements_file
         self.operation = operation
+        self.requirements_file = requirements_file
         self.update_status = update_status
         self.update_status_ui = update_status_ui
         self.show_info_win = show_info_win
         self.show_err_win = show_err_win
-        self.is_package_installed()
+        self.update_progress_ui = update_progress_ui
+        # confirm(message) -> bool, asked with the resolution preview
+        self.confirm = confirm
+
+        if self.is_batch():
+            self.run_batch_operations()
+        else:
+            self.is_package_installed()
+
+    def is_batch(self):
+        return len(self.names) > 1 or self.requirements_file is not None
 
     def is_package_installed(self):
         self.update_status_ui(f"Checking if {self.name} is installed....", "loading")
@@ -36,12 +57,66 @@ class Operations:
         else:
             self.run_operations_()
 
+    def output_callback(self):
+        """Callback turning streamed uv output into live status updates"""
+
+        progress = UvProgress()
+
+        def on_output(line):
+            if progress.feed(line):
+                self.update_status_ui(progress.describe(), "loading")
+                if self.update_progress_ui is not None:
+                    self.update_progress_ui(progress.fraction)
+
+        return on_output
+
+    def preview(self, names, upgrade=False):
+        """
+        Resolve the operation with a dry run and ask to confirm the changes.
+
+        Returns:
+            bool: False if the user declined
+        """
+
+        if self.confirm is None:
+            return True
+
+        self.update_status_ui(f"Resolving {self.name}....", "loading")
+
+        success, _, plan = PackageManager.preview_install(
+            names, requirements_file=self.requirements_file, upgrade=upgrade
+        )
+
+        # nothing to confirm, the real install reports errors and no-ops
+        if not success or not plan:
+            return True
+
+        lines = plan.lines()
+        if len(lines) > PREVIEW_LINES:
+            more = len(lines) - PREVIEW_LINES
+            lines = lines[:PREVIEW_LINES] + [f" … and {more} more"]
+
+        if self.confirm(
+            f"{self.operation.capitalize()} {self.name}: {plan.describe()}\n\n"
+            + "\n".join(lines)
+        ):
+            return True
+
+        # stays until the next operation, replacing it would hide it at once
+        self.update_status_ui(f"{self.operation.capitalize()} of {self.name} cancelled")
+
+        return False
+
     def run_operations_(self):
         if self.operation == "install":
+            if not self.preview(self.names):
+                return
             self.update_status_ui(
                 f"{self.operation.capitalize()}ing {self.name}....", "loading"
             )
-            success, message = PackageManager.install_package(self.name)
+            success, message = PackageManager.install_package(
+                self.name, on_output=self.output_callback()
+            )
             self.sync_status(success, message)
         if self.operation == "upgrade":
             self.update_status_ui(
@@ -49,8 +124,12 @@ class Operations:
             )
             state, message_ = PackageManager.check_package_version(self.name)
             if state:
+                if not self.preview(self.names, upgrade=True):
+                    return
                 self.update_status_ui(f"Upgrading {self.name} ", "loading")
-                success, message = PackageManager.upgrade_package(self.name)
+                success, message = PackageManager.upgrade_package(
+                    self.name, on_output=self.output_callback()
+                )
                 self.sync_status(success, message)
             else:
                 self.update_status_ui("You have the latest version", "loading")
@@ -60,10 +139,76 @@ class Operations:
             self.update_status_ui(
                 f"{self.operation.capitalize()}ing {self.name}....", "loading"
             )
-            success, message = PackageManager.uninstall_package(self.name)
+            success, message = PackageManager.uninstall_package(
+                self.name, on_output=self.output_callback()
+            )
             self.sync_status(success, message)
 
+    def run_batch_operations(self):
+        """Run the operation for every name with a single uv invocation"""
+
+        self.update_status_ui(f"Checking {len(self.names)} packages....", "loading")
+
+        skipped = {}
+        pending = []
+        for name in self.names:
+            installed, _ = PackageManager.check_package_if_installed(
+                requirement_name(name) or name
+            )
+            if self.operation == "install" and installed:
+                skipped[name] = "already installed"
+            elif self.operation != "install" and not installed:
+                skipped[name] = "not found"
+            else:
+                pending.append(name)
+
+        if not pending and not self.requirements_file:
+            message = self.format_results(skipped)
+            self.update_status_ui(f"Nothing to {self.operation}")
+            self.show_info_win(f"Nothing to {self.operation}\n\n{message}")
+            self.update_status("Ready to manage packages", "info")
+            return
+
+        if self.operation != "uninstall" and not self.preview(
+            pending, upgrade=self.operation == "upgrade"
+        ):
+            return
+
+        if self.requirements_file:
+            target = self.requirements_file
+        elif len(pending) > 1:
+            target = f"{len(pending)} packages"
+        else:
+            target = pending[0]
+
+        self.update_status_ui(
+            f"{self.operation.capitalize()}ing {target}....", "loading"
+        )
+
+        if self.operation == "uninstall":
+            success, message, results = PackageManager.uninstall_packages(
+                pending, on_output=self.output_callback()
+            )
+        else:
+            success, message, results = PackageManager.install_packages(
+                pending,
+                requirements_file=self.requirements_file,
+                upgrade=self.operation == "upgrade",
+                on_output=self.output_callback(),
+            )
+
+        if success:
+            message = self.format_results({**results, **skipped})
+
+        self.sync_status(success, message)
+
+    def format_results(self, results):
+        return "\n".join(f"{name}: {result}" for name, result in results.items())
+
     def sync_status(self, success, message):
+        if self.update_progress_ui is not None:
+            self.update_progress_ui(None)
+
         if success:
             self.update_status_ui(message, "success")
             self.show_info_win(message)
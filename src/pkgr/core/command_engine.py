@@ -0,0 +1,453 @@
+import os
+import sys
+import time
+import codecs
+import signal
+import asyncio
+import logging
+import threading
+import subprocess
+import concurrent.futures
+from collections import deque
+from typing import Callable, NamedTuple, Optional
+
+from pkgr.core.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TIMEOUT = float(os.environ.get("PKGR_COMMAND_TIMEOUT", "600"))
+DEFAULT_CONCURRENCY = int(os.environ.get("PKGR_MAX_CONCURRENCY", "4"))
+
+# lines of each stream kept in the CommandResult of a streamed command
+STREAM_TAIL_LINES = 500
+
+LineCallback = Callable[[str, str], None]
+ChunkCallback = Callable[[str, str], None]
+
+
+class CommandResult(NamedTuple):
+    success: bool
+    stdout: str
+    stderr: str
+    returncode: Optional[int] = None
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+class CommandHandle:
+    """
+    Handle to a command submitted to the CommandEngine.
+
+    It can be waited on with result(), awaited from any event loop,
+    or cancelled, which kills the whole process group of the command.
+    """
+
+    def __init__(self, engine: "CommandEngine", cmd: list[str]):
+        self.cmd = cmd
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+
+        self._engine = engine
+        self._task: Optional[asyncio.Task] = None
+
+    def result(self, timeout: Optional[float] = None) -> CommandResult:
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self):
+        """Cancel the command, killing its process group if it is running."""
+
+        self._engine._cancel(self)
+
+    def __await__(self):
+        return asyncio.wrap_future(self.future).__await__()
+
+
+def command_label(cmd: list[str]) -> str:
+    """Short name of a command for span names, e.g. "uv pip list"."""
+
+    words = [os.path.basename(cmd[0])] if cmd else []
+    for arg in cmd[1:]:
+        if arg.startswith("-") or len(words) == 3:
+            break
+        words.append(arg)
+
+    return " ".join(words)
+
+
+def _kill_process_group(process: asyncio.subprocess.Process):
+    """Kill a process started by the engine together with its children."""
+
+    if process.returncode is not None:
+        return
+
+    try:
+        if sys.platform == "win32":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError) as e:
+        logger.error(f"Failed to kill process group {process.pid}: {e}")
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+class CommandEngine:
+    """
+    Runs subprocesses on a private asyncio loop in a background thread.
+
+    Every command gets a timeout and its own process group, and at most
+    max_concurrency commands run at the same time; the rest wait in line.
+    """
+
+    _default: Optional["CommandEngine"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        default_timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_timeout = default_timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._handles: set[CommandHandle] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "CommandEngine":
+        """Return the engine shared by PackageManager."""
+
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+
+            return cls._default
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+
+                def run_loop():
+                    self._loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(self._loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    self._loop.run_forever()
+
+                self._thread = threading.Thread(
+                    target=run_loop, name="pkgr-command-engine", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+
+            return self._loop
+
+    def set_max_concurrency(self, max_concurrency: int):
+        """Change the concurrency limit for commands submitted from now on."""
+
+        self.max_concurrency = max(1, max_concurrency)
+
+        if self._loop is not None:
+
+            def replace():
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            self._loop.call_soon_threadsafe(replace)
+
+    def submit(
+        self,
+        cmd: list[str],
+        timeout: Optional[float] = None,
+        callback: Optional[Callable[[CommandResult], None]] = None,
+        env: Optional[dict[str, str]] = None,
+        on_line: Optional[LineCallback] = None,
+        on_chunk: Optional[ChunkCallback] = None,
+    ) -> CommandHandle:
+        """
+        Start a command without waiting for it.
+
+        Args:
+            cmd: List of command arguments
+            timeout: Seconds before the command is killed, defaults to default_timeout
+            callback: Called with the CommandResult from the engine thread
+            env: Environment for the process, defaults to the current one
+            on_line: Stream mode; called with ("stdout" | "stderr", line) for
+                every output line as it arrives. Only the last
+                STREAM_TAIL_LINES lines are kept in the result.
+            on_chunk: Stream mode; called with ("stdout" | "stderr", text) for
+                every piece of output as it is read, without waiting for the
+                end of the line, e.g. for one long line of JSON.
+
+        Returns:
+            CommandHandle: handle to wait on, await or cancel
+        """
+
+        loop = self._ensure_loop()
+        handle = CommandHandle(self, cmd)
+
+        with self._lock:
+            self._handles.add(handle)
+
+        def on_done(future: concurrent.futures.Future):
+            with self._lock:
+                self._handles.discard(handle)
+
+            if callback is None or future.cancelled():
+                return
+
+            if future.exception() is not None:
+                callback(CommandResult(False, "", str(future.exception())))
+            else:
+                callback(future.result())
+
+        handle.future.add_done_callback(on_done)
+
+        def start():
+            handle._task = loop.create_task(
+                self._run(
+                    cmd, timeout or self.default_timeout, env, on_line, on_chunk
+                )
+            )
+
+            def finish(task: asyncio.Task):
+                if handle.future.done():
+                    return
+                if task.cancelled():
+                    handle.future.set_result(
+                        CommandResult(False, "", "Command cancelled", cancelled=True)
+                    )
+                elif task.exception() is not None:
+                    handle.future.set_exception(task.exception())
+                else:
+                    handle.future.set_result(task.result())
+
+            handle._task.add_done_callback(finish)
+
+        loop.call_soon_threadsafe(start)
+
+        return handle
+
+    def run(
+        self,
+        cmd: list[str],
+        timeout: Optional[float] = None,
+        env=None,
+        on_line=None,
+        on_chunk=None,
+    ) -> CommandResult:
+        """Run a command and block until it finishes, times out or is cancelled."""
+
+        return self.submit(
+            cmd, timeout, env=env, on_line=on_line, on_chunk=on_chunk
+        ).result()
+
+    async def run_async(
+        self,
+        cmd: list[str],
+        timeout: Optional[float] = None,
+        env=None,
+        on_line=None,
+        on_chunk=None,
+    ) -> CommandResult:
+        """Awaitable version of run() usable from any event loop."""
+
+        return await self.submit(
+            cmd, timeout, env=env, on_line=on_line, on_chunk=on_chunk
+        )
+
+    def _cancel(self, handle: CommandHandle):
+        if self._loop is None or handle.done():
+            return
+
+        def cancel():
+            if handle._task is not None:
+                handle._task.cancel()
+
+        self._loop.call_soon_threadsafe(cancel)
+
+    def cancel_all(self):
+        """Cancel every queued and running command."""
+
+        with self._lock:
+            handles = list(self._handles)
+
+        for handle in handles:
+            handle.cancel()
+
+    def running(self) -> int:
+        """Number of commands that have been submitted and not finished yet."""
+
+        with self._lock:
+            return len(self._handles)
+
+    def _popen_kwargs(self) -> dict:
+        # a new process group lets cancellation kill uv and everything it spawned
+        if sys.platform == "win32":
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True}
+
+    async def _read_lines(
+        self,
+        stream: asyncio.StreamReader,
+        name: str,
+        on_line: Optional[LineCallback],
+        tail: deque,
+        on_chunk: Optional[ChunkCallback] = None,
+    ) -> int:
+        """
+        Split a stream into lines on newlines and carriage returns as it arrives.
+
+        on_chunk gets every piece as soon as it is read, on_line every
+        complete line.
+
+        Returns:
+            int: number of bytes read
+        """
+
+        # a multi-byte character may be split across two reads
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # pieces of the unfinished line, joined once it ends so that a very
+        # long line is not copied again on every read
+        pending: list[bytes] = []
+        size = 0
+
+        while True:
+            chunk = await stream.read(4096)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if on_chunk is not None:
+                self._emit_chunk(decoder.decode(chunk), name, on_chunk)
+
+            data = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            if b"\n" not in data:
+                pending.append(data)
+                continue
+
+            lines = data.split(b"\n")
+            lines[0] = b"".join(pending) + lines[0]
+            pending = [lines.pop()]
+
+            for raw in lines:
+                self._emit_line(raw, name, on_line, tail)
+
+        rest = b"".join(pending)
+        if rest:
+            self._emit_line(rest, name, on_line, tail)
+        if on_chunk is not None:
+            self._emit_chunk(decoder.decode(b"", final=True), name, on_chunk)
+
+        return size
+
+    def _emit_line(
+        self, raw: bytes, name: str, on_line: Optional[LineCallback], tail: deque
+    ):
+        line = raw.decode("utf-8", errors="replace")
+        tail.append(line)
+
+        if on_line is None:
+            return
+
+        try:
+            on_line(name, line)
+        except Exception as e:
+            logger.error(f"Output callback failed: {e}")
+
+    def _emit_chunk(self, text: str, name: str, on_chunk: ChunkCallback):
+        if not text:
+            return
+
+        try:
+            on_chunk(name, text)
+        except Exception as e:
+            logger.error(f"Output callback failed: {e}")
+
+    async def _stream(
+        self, process, on_line: Optional[LineCallback], on_chunk=None
+    ) -> tuple[str, str, int]:
+        stdout_tail: deque[str] = deque(maxlen=STREAM_TAIL_LINES)
+        stderr_tail: deque[str] = deque(maxlen=STREAM_TAIL_LINES)
+
+        sizes = await asyncio.gather(
+            self._read_lines(
+                process.stdout, "stdout", on_line, stdout_tail, on_chunk
+            ),
+            self._read_lines(
+                process.stderr, "stderr", on_line, stderr_tail, on_chunk
+            ),
+        )
+        await process.wait()
+
+        return "\n".join(stdout_tail), "\n".join(stderr_tail), sum(sizes)
+
+    async def _run(
+        self, cmd: list[str], timeout: float, env, on_line=None, on_chunk=None
+    ) -> CommandResult:
+        queued = time.perf_counter()
+
+        async with self._semaphore:
+            waited = round((time.perf_counter() - queued) * 1000, 3)
+
+            with span(f"command:{command_label(cmd)}", queued_ms=waited) as timing:
+                return await self._execute(
+                    cmd, timeout, env, on_line, on_chunk, timing
+                )
+
+    async def _execute(
+        self, cmd, timeout, env, on_line, on_chunk, timing
+    ) -> CommandResult:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            **self._popen_kwargs(),
+        )
+
+        try:
+            if on_line is None and on_chunk is None:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+                size = len(stdout) + len(stderr)
+                stdout = stdout.decode("utf-8", errors="replace")
+                stderr = stderr.decode("utf-8", errors="replace")
+            else:
+                stdout, stderr, size = await asyncio.wait_for(
+                    self._stream(process, on_line, on_chunk), timeout
+                )
+        except asyncio.TimeoutError:
+            _kill_process_group(process)
+            await process.wait()
+            logger.error(f"Command timed out after {timeout}s: {' '.join(cmd)}")
+            timing.set(exit_code=process.returncode, timed_out=True)
+            return CommandResult(
+                False,
+                "",
+                f"Command timed out after {timeout:g}s",
+                process.returncode,
+                timed_out=True,
+            )
+        except asyncio.CancelledError:
+            _kill_process_group(process)
+            await process.wait()
+            timing.set(exit_code=process.returncode, cancelled=True)
+            raise
+
+        timing.set(exit_code=process.returncode, output_bytes=size)
+
+        return CommandResult(
+            process.returncode == 0, stdout, stderr, process.returncode
+        )
@@ -0,0 +1,267 @@
+import sys
+import json
+import logging
+import threading
+from collections import deque
+from typing import Iterable, Optional
+
+from packaging.markers import default_environment
+from packaging.requirements import InvalidRequirement, Requirement
+
+from pkgr.core.command_engine import CommandEngine
+from pkgr.core.installed_index import InstalledIndex, normalize_name
+from pkgr.core.metadata_store import MetadataStore
+
+logger = logging.getLogger(__name__)
+
+
+# same keys as packaging.markers.default_environment(), computed by the target
+_MARKER_SCRIPT = """
+import json, os, platform, sys
+impl = sys.implementation
+version = "{0.major}.{0.minor}.{0.micro}".format(impl.version)
+if impl.version.releaselevel != "final":
+    version += impl.version.releaselevel[0] + str(impl.version.serial)
+print(json.dumps({
+    "implementation_name": impl.name,
+    "implementation_version": version,
+    "os_name": os.name,
+    "platform_machine": platform.machine(),
+    "platform_release": platform.release(),
+    "platform_system": platform.system(),
+    "platform_version": platform.version(),
+    "python_full_version": platform.python_version(),
+    "platform_python_implementation": platform.python_implementation(),
+    "python_version": ".".join(platform.python_version_tuple()[:2]),
+    "sys_platform": sys.platform,
+}))
+"""
+
+_marker_environments: dict[str, dict[str, str]] = {}
+
+
+def marker_environment(python: Optional[str] = None) -> dict[str, str]:
+    """
+    Environment markers of a target interpreter.
+
+    Args:
+        python: Interpreter path, None for the interpreter running pkgr
+
+    Returns:
+        dict usable with packaging.markers.Marker.evaluate
+    """
+
+    if python is None or python == sys.executable:
+        return dict(default_environment())
+
+    if python not in _marker_environments:
+        result = CommandEngine.default().run(
+            [python, "-c", _MARKER_SCRIPT], timeout=30
+        )
+        try:
+            _marker_environments[python] = json.loads(result.stdout)
+        except ValueError:
+            logger.error(f"Could not read markers of {python}: {result.stderr}")
+            return dict(default_environment())
+
+    return dict(_marker_environments[python])
+
+
+class DependencyGraph:
+    """
+    Dependency graph of an environment built from Requires-Dist metadata.
+
+    Requirements whose markers do not apply to the target interpreter, and
+    extras, are left out. The graph is kept per environment and refreshed
+    incrementally: only distributions whose dist-info changed since the
+    last refresh are re-parsed.
+    """
+
+    _instances: dict[tuple[str, ...], "DependencyGraph"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, markers: dict[str, str]):
+        self.markers = dict(markers, extra="")
+
+        self.names: dict[str, str] = {}
+        self.requires: dict[str, set[str]] = {}
+        self.required_by: dict[str, set[str]] = {}
+
+        self._paths: dict[str, tuple[str, int]] = {}
+        self._generation = -1
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_index(
+        cls,
+        index: InstalledIndex,
+        store: MetadataStore,
+        python: Optional[str] = None,
+    ) -> "DependencyGraph":
+        """
+        Return the up to date graph of the environment behind an index.
+
+        Args:
+            index: Installed index of the environment
+            store: Metadata store holding the parsed requirements
+            python: Interpreter whose markers decide which requirements apply
+        """
+
+        key = tuple(index.site_dirs)
+
+        with cls._instances_lock:
+            graph = cls._instances.get(key)
+            if graph is None:
+                graph = cls(marker_environment(python))
+                cls._instances[key] = graph
+
+        graph.refresh(index, store)
+
+        return graph
+
+    def refresh(self, index: InstalledIndex, store: MetadataStore):
+        """Apply the changes made to the environment since the last refresh."""
+
+        with self._lock:
+            index.refresh()
+            if index.generation == self._generation:
+                return
+
+            store.sync_index(index)
+            rows = {
+                row["normalized"]: row for row in store.requirements(index.site_dirs)
+            }
+
+            for key in [k for k in self._paths if k not in rows]:
+                self._remove(key)
+
+            for key, row in rows.items():
+                if self._paths.get(key) == (row["path"], row["mtime"]):
+                    continue
+                self._remove(key)
+                self._add(key, row["name"], row["requires"])
+                self._paths[key] = (row["path"], row["mtime"])
+
+            self._generation = index.generation
+
+    def _requirement_names(self, requires: Iterable[str]) -> set[str]:
+        names = set()
+
+        for text in requires:
+            try:
+                requirement = Requirement(text)
+            except InvalidRequirement:
+                continue
+
+            if requirement.marker is not None:
+                try:
+                    if not requirement.marker.evaluate(self.markers):
+                        continue
+                except Exception:
+                    continue
+
+            names.add(normalize_name(requirement.name))
+
+        return names
+
+    def _add(self, key: str, name: str, requires: Iterable[str]):
+        self.names[key] = name
+        self.requires[key] = self._requirement_names(requires)
+
+        for dependency in self.requires[key]:
+            self.required_by.setdefault(dependency, set()).add(key)
+
+    def _remove(self, key: str):
+        for dependency in self.requires.pop(key, set()):
+            dependents = self.required_by.get(dependency)
+            if dependents is not None:
+                dependents.discard(key)
+
+        self.names.pop(key, None)
+        self._paths.pop(key, None)
+
+    def display_name(self, key: str) -> str:
+        return self.names.get(key, key)
+
+    # queries
+
+    def dependencies(self, name: str, transitive: bool = False) -> list[str]:
+        """Installed packages that name depends on (directly or transitively)."""
+
+        with self._lock:
+            keys = self._closure([normalize_name(name)], self.requires, transitive)
+
+            return sorted(
+                (self.display_name(k) for k in keys if k in self.names), key=str.lower
+            )
+
+    def dependents(self, name: str, transitive: bool = False) -> list[str]:
+        """Installed packages that depend on name (directly or transitively)."""
+
+        with self._lock:
+            keys = self._closure([normalize_name(name)], self.required_by, transitive)
+
+            return sorted(
+                (self.display_name(k) for k in keys if k in self.names), key=str.lower
+            )
+
+    def removal_impact(self, names: Iterable[str]) -> dict[str, list[str]]:
+        """
+        What breaks if packages are removed.
+
+        Args:
+            names: Packages that would be uninstalled
+
+        Returns:
+            dict: {broken package: [removed or broken packages it requires]}
+                  for every remaining package that would lose a requirement,
+                  directly or through another broken package
+        """
+
+        with self._lock:
+            removed = {normalize_name(name) for name in names}
+            broken: dict[str, set[str]] = {}
+            queue = deque(removed)
+
+            while queue:
+                key = queue.popleft()
+                for dependent in self.required_by.get(key, ()):
+                    if dependent in removed or dependent not in self.names:
+                        continue
+                    if dependent not in broken:
+                        broken[dependent] = set()
+                        queue.append(dependent)
+                    broken[dependent].add(key)
+
+            return {
+                self.display_name(key): sorted(self.display_name(r) for r in causes)
+                for key, causes in sorted(broken.items())
+            }
+
+    def leaves(self) -> list[str]:
+        """Installed packages no other installed package depends on."""
+
+        with self._lock:
+            return sorted(
+                self.display_name(key)
+                for key in self.names
+                if not any(d in self.names for d in self.required_by.get(key, ()))
+            )
+
+    def _closure(
+        self, start: list[str], edges: dict[str, set[str]], transitive: bool
+    ) -> set[str]:
+        seen: set[str] = set()
+        queue = deque(start)
+
+        while queue:
+            key = queue.popleft()
+            for neighbour in edges.get(key, ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    if transitive:
+                        queue.append(neighbour)
+
+        seen.difference_update(start)
+
+        return seen
@@ -0,0 +1,158 @@
+import os
+import csv
+import concurrent.futures
+from typing import Iterable, Optional
+
+from pkgr.core.installed_index import InstalledDistribution
+
+# RECORD files are read on a pool, most of the time goes to open/stat calls
+SCAN_WORKERS = min(16, (os.cpu_count() or 1) + 4)
+
+
+def _stat_size(path: str) -> int:
+    try:
+        return os.stat(path, follow_symlinks=False).st_size
+    except OSError:
+        return 0
+
+
+def _tree_usage(path: str) -> tuple[int, int]:
+    """(file count, total size) of a file or of a directory tree."""
+
+    try:
+        if not os.path.isdir(path) or os.path.islink(path):
+            return (1, _stat_size(path)) if os.path.lexists(path) else (0, 0)
+    except OSError:
+        return 0, 0
+
+    files = size = 0
+    pending = [path]
+
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        else:
+                            files += 1
+                            size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+    return files, size
+
+
+def _record_usage(dist: InstalledDistribution) -> Optional[tuple[int, int]]:
+    """Usage from RECORD, None if the distribution has no RECORD."""
+
+    record = os.path.join(dist.path, "RECORD")
+
+    try:
+        f = open(record, newline="", encoding="utf-8", errors="replace")
+    except OSError:
+        return None
+
+    files = size = 0
+
+    with f:
+        for row in csv.reader(f):
+            if not row or not row[0]:
+                continue
+
+            files += 1
+            if len(row) >= 3 and row[2].isdigit():
+                size += int(row[2])
+            else:
+                # RECORD itself and byte code compiled after install have no size
+                size += _stat_size(os.path.join(dist.location, row[0]))
+
+    return files, size
+
+
+def _installed_files_usage(dist: InstalledDistribution) -> Optional[tuple[int, int]]:
+    """Usage from the installed-files.txt of an egg-info, None without one."""
+
+    listing = os.path.join(dist.path, "installed-files.txt")
+
+    try:
+        with open(listing, encoding="utf-8", errors="replace") as f:
+            paths = [line.strip() for line in f if line.strip()]
+    except OSError:
+        return None
+
+    size = sum(_stat_size(os.path.join(dist.path, path)) for path in paths)
+
+    return len(paths), size
+
+
+def _top_level_usage(dist: InstalledDistribution) -> tuple[int, int]:
+    """Usage of the top-level packages next to the metadata, plus the metadata."""
+
+    names = []
+    try:
+        with open(os.path.join(dist.path, "top_level.txt"), encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+    except OSError:
+        names = [dist.name.replace("-", "_").replace(".", "_")]
+
+    files, size = _tree_usage(dist.path)
+
+    for name in names:
+        for candidate in (name, name + ".py"):
+            candidate_files, candidate_size = _tree_usage(
+                os.path.join(dist.location, candidate)
+            )
+            files += candidate_files
+            size += candidate_size
+
+    return files, size
+
+
+def distribution_usage(dist: InstalledDistribution) -> tuple[int, int]:
+    """
+    Disk usage of an installed distribution.
+
+    RECORD is used when there is one; files it lists without a size are
+    stat'ed. Distributions without RECORD fall back to installed-files.txt
+    and then to walking their top-level packages with os.stat.
+
+    Returns:
+        (file count, total size in bytes)
+    """
+
+    usage = _record_usage(dist)
+
+    if usage is None:
+        usage = _installed_files_usage(dist)
+
+    if usage is None:
+        usage = _top_level_usage(dist)
+
+    return usage
+
+
+def scan_usage(
+    distributions: Iterable[InstalledDistribution], max_workers: int = SCAN_WORKERS
+) -> dict[str, tuple[int, int]]:
+    """
+    distribution_usage() of many distributions on a thread pool.
+
+    Returns:
+        dict: {dist-info path: (file count, total size)}
+    """
+
+    distributions = list(distributions)
+
+    if len(distributions) < 2:
+        return {dist.path: distribution_usage(dist) for dist in distributions}
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="pkgr-disk-usage"
+    ) as executor:
+        usages = executor.map(distribution_usage, distributions)
+
+        return {dist.path: usage for dist, usage in zip(distributions, usages)}
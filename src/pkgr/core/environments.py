@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import logging
+import threading
+import concurrent.futures
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pkgr.core.installed_index import (
+    InstalledIndex,
+    default_environment_prefix,
+    get_site_packages_dirs,
+)
+from pkgr.core.paths import user_config_dir
+
+logger = logging.getLogger(__name__)
+
+
+class Environment(NamedTuple):
+    name: str
+    prefix: str
+    python: str
+    source: str  # "active", "root", ".venv" or "uv"
+
+
+class EnvironmentScan(NamedTuple):
+    environment: Environment
+    packages: list[tuple[str, str]]
+    scanned_at: float
+    error: str = ""
+
+
+def python_executable(prefix: str) -> Optional[str]:
+    """Path of the interpreter of an environment, None if there is none."""
+
+    if os.name == "nt":
+        candidates = [
+            os.path.join(prefix, "Scripts", "python.exe"),
+            os.path.join(prefix, "python.exe"),
+        ]
+    else:
+        candidates = [
+            os.path.join(prefix, "bin", "python3"),
+            os.path.join(prefix, "bin", "python"),
+        ]
+
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+
+    return None
+
+
+def prefix_of_executable(executable: str) -> str:
+    """Environment prefix of an interpreter path (bin/python -> prefix)."""
+
+    parent = Path(executable).parent
+
+    if parent.name in ("bin", "Scripts"):
+        return str(parent.parent)
+
+    return str(parent)
+
+
+def configured_roots() -> list[str]:
+    """
+    Directories to search for environments.
+
+    Read from PKGR_ENV_ROOTS (os.pathsep separated) and the
+    "environment_roots" list in config.json in the user config directory.
+    """
+
+    roots = [r for r in os.environ.get("PKGR_ENV_ROOTS", "").split(os.pathsep) if r]
+
+    config = user_config_dir() / "config.json"
+    try:
+        with open(config, encoding="utf-8") as f:
+            roots.extend(json.load(f).get("environment_roots", []))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading {config}: {e}")
+
+    return [os.path.expanduser(root) for root in roots]
+
+
+class EnvironmentRegistry:
+    """
+    Discovers Python environments and scans their installed packages.
+
+    Environments come from the active environment, the configured roots
+    (every child holding a pyvenv.cfg or a .venv directory), .venv
+    directories next to the working directory and uv-managed Pythons.
+    Scans run in parallel on a worker pool and are kept so switching
+    environments does not rescan.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self.environments: list[Environment] = []
+        self.scans: dict[str, EnvironmentScan] = {}
+
+        self._lock = threading.Lock()
+
+    def _add(self, found: dict[str, Environment], prefix: str, source: str, name=None):
+        prefix = os.path.realpath(prefix)
+        if prefix in found:
+            return
+
+        python = python_executable(prefix)
+        if python is None:
+            return
+
+        if name is None:
+            path = Path(prefix)
+            name = path.parent.name if path.name == ".venv" else path.name
+
+        found[prefix] = Environment(name, prefix, python, source)
+
+    def _discover_roots(self, found: dict[str, Environment]):
+        for root in configured_roots():
+            try:
+                children = sorted(os.scandir(root), key=lambda entry: entry.name)
+            except OSError as e:
+                logger.error(f"Error scanning environment root {root}: {e}")
+                continue
+
+            for child in children:
+                if not child.is_dir():
+                    continue
+                if os.path.isfile(os.path.join(child.path, "pyvenv.cfg")):
+                    self._add(found, child.path, "root")
+                elif os.path.isfile(os.path.join(child.path, ".venv", "pyvenv.cfg")):
+                    self._add(found, os.path.join(child.path, ".venv"), "root")
+
+    def _discover_dot_venvs(self, found: dict[str, Environment]):
+        cwd = Path.cwd()
+
+        for directory in (cwd, *cwd.parents):
+            candidate = directory / ".venv"
+            if (candidate / "pyvenv.cfg").is_file():
+                self._add(found, str(candidate), ".venv")
+
+    def _discover_uv_pythons(self, found: dict[str, Environment]):
+        # asyncio is slow to import, only the discovery runs a command
+        from pkgr.core.command_engine import CommandEngine
+
+        result = CommandEngine.default().run(
+            ["uv", "python", "list", "--only-installed", "--output-format", "json"],
+            timeout=30,
+        )
+
+        if not result.success:
+            logger.error(f"Error listing uv managed pythons: {result.stderr}")
+            return
+
+        try:
+            pythons = json.loads(result.stdout)
+        except ValueError as e:
+            logger.error(f"Error parsing uv python list: {e}")
+            return
+
+        for python in pythons:
+            path = python.get("path")
+            if not path:
+                continue
+            self._add(found, prefix_of_executable(path), "uv", python.get("key"))
+
+    def discover(self) -> list[Environment]:
+        """
+        Find every known environment.
+
+        Returns:
+            list of Environment, the active one first
+        """
+
+        found: dict[str, Environment] = {}
+
+        active = default_environment_prefix()
+        if active:
+            self._add(found, active, "active")
+
+        self._discover_dot_venvs(found)
+        self._discover_roots(found)
+
+        try:
+            self._discover_uv_pythons(found)
+        except OSError as e:
+            logger.error(f"Error running uv python list: {e}")
+
+        with self._lock:
+            self.environments = list(found.values())
+
+            return list(self.environments)
+
+    def scan(self, environment: Environment) -> EnvironmentScan:
+        """Scan the installed packages of one environment."""
+
+        try:
+            site_dirs = get_site_packages_dirs(environment.prefix)
+            if not site_dirs:
+                raise OSError("no site-packages directory found")
+
+            packages = InstalledIndex.for_environment(environment.prefix).packages()
+            scan = EnvironmentScan(environment, packages, time.time())
+        except OSError as e:
+            logger.error(f"Error scanning {environment.prefix}: {e}")
+            scan = EnvironmentScan(environment, [], time.time(), str(e))
+
+        with self._lock:
+            self.scans[environment.prefix] = scan
+
+        return scan
+
+    def scan_all(
+        self, environments: Optional[list[Environment]] = None
+    ) -> list[EnvironmentScan]:
+        """
+        Scan several environments in parallel.
+
+        Args:
+            environments: Environments to scan, defaults to every discovered one
+
+        Returns:
+            list of EnvironmentScan in the same order
+        """
+
+        if environments is None:
+            environments = list(self.environments)
+
+        if not environments:
+            return []
+
+        workers = min(self.max_workers, len(environments))
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pkgr-env-scan"
+        ) as pool:
+            return list(pool.map(self.scan, environments))
+
+    def cached_scan(self, prefix: str) -> Optional[EnvironmentScan]:
+        """The last scan of an environment, None if it was never scanned."""
+
+        with self._lock:
+            return self.scans.get(os.path.realpath(prefix))
@@ -0,0 +1,452 @@
+import os
+import re
+import ssl
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+import http.client
+import concurrent.futures
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import unquote, urljoin, urlsplit
+
+from pkgr.core.installed_index import normalize_name
+from pkgr.core.paths import user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_INDEX_URL = "https://pypi.org/simple/"
+
+ACCEPT = (
+    "application/vnd.pypi.simple.v1+json, "
+    "application/vnd.pypi.simple.v1+html;q=0.2, text/html;q=0.1"
+)
+
+# sdists and wheels: {name}-{version}.tar.gz / {name}-{version}(-{build})?-{tags}.whl
+_SDIST_RE = re.compile(r"^(?P<name>.+?)-(?P<version>[^-]+)\.(?:tar\.gz|zip|tar\.bz2|tgz)$")
+_WHEEL_RE = re.compile(r"^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-[^-]+)?-[^-]+-[^-]+-[^-]+\.whl$")
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# after this many connection failures in a row get_many gives up on the index
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+def default_index_url() -> str:
+    """The index uv would use, taken from the usual environment variables."""
+
+    for var in ("UV_DEFAULT_INDEX", "UV_INDEX_URL", "PIP_INDEX_URL"):
+        url = os.environ.get(var)
+        if url:
+            return url if url.endswith("/") else url + "/"
+
+    return DEFAULT_INDEX_URL
+
+
+class ProjectVersions(NamedTuple):
+    name: str
+    versions: list[str]
+    yanked: set[str]
+
+
+class IndexUnavailableError(Exception):
+    """Raised when the index can not be reached or returns an error."""
+
+
+class _AnchorParser(HTMLParser):
+    """Collect (filename, yanked) pairs from a PEP 503 HTML project page."""
+
+    def __init__(self):
+        super().__init__()
+        self.files: list[dict] = []
+        self._current: Optional[dict] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            attrs = dict(attrs)
+            self._current = {
+                "href": attrs.get("href", ""),
+                "yanked": "data-yanked" in attrs,
+                "filename": "",
+            }
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current["filename"] += data
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._current is not None:
+            if not self._current["filename"].strip():
+                path = urlsplit(self._current["href"]).path
+                self._current["filename"] = unquote(path.rsplit("/", 1)[-1])
+            self._current["filename"] = self._current["filename"].strip()
+            self.files.append(self._current)
+            self._current = None
+
+
+def _version_from_filename(filename: str) -> Optional[str]:
+    for pattern in (_WHEEL_RE, _SDIST_RE):
+        match = pattern.match(filename)
+        if match:
+            return match.group("version")
+
+    return None
+
+
+def parse_project_page(name: str, body: bytes, content_type: str) -> ProjectVersions:
+    """
+    Parse a simple API project page (PEP 691 JSON or PEP 503 HTML).
+
+    Args:
+        name: Project name the page belongs to
+        body: Raw response body
+        content_type: Content-Type header of the response
+
+    Returns:
+        ProjectVersions: every version listed and the fully yanked ones
+    """
+
+    if "json" in content_type:
+        data = json.loads(body)
+        files = data.get("files", [])
+    else:
+        parser = _AnchorParser()
+        parser.feed(body.decode("utf-8", errors="replace"))
+        files = parser.files
+        data = {}
+
+    versions_files: dict[str, list[bool]] = {}
+
+    for file in files:
+        version = _version_from_filename(file.get("filename", ""))
+        if version is None:
+            continue
+        versions_files.setdefault(version, []).append(bool(file.get("yanked")))
+
+    # API v1.1 lists versions explicitly, including ones without files
+    versions = list(data.get("versions") or versions_files)
+
+    yanked = {
+        version
+        for version, flags in versions_files.items()
+        if flags and all(flags)
+    }
+
+    return ProjectVersions(name, versions, yanked)
+
+
+class IndexClient:
+    """
+    Concurrent client for the simple repository API with an HTTP cache.
+
+    Project pages are fetched on a thread pool, each worker keeping its own
+    persistent connection. Responses are stored on disk together with their
+    ETag/Last-Modified validators; while Cache-Control max-age holds they
+    are used as is, afterwards they are revalidated with a conditional
+    request, which the index answers with an empty 304 if nothing changed.
+    """
+
+    _default: Optional["IndexClient"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        index_url: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        max_workers: int = 16,
+        timeout: float = 15,
+    ):
+        self.index_url = index_url or default_index_url()
+        if not self.index_url.endswith("/"):
+            self.index_url += "/"
+
+        self.cache_dir = Path(cache_dir) if cache_dir else user_cache_dir() / "http"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pkgr-index"
+        )
+
+    @classmethod
+    def default(cls) -> "IndexClient":
+        """Return the shared client for the configured index."""
+
+        with cls._default_lock:
+            if cls._default is None or cls._default.index_url != default_index_url():
+                cls._default = cls()
+
+            return cls._default
+
+    # connection handling
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        key = (scheme, netloc)
+        conn = connections.get(key)
+
+        if conn is None:
+            host = netloc.rsplit("@", 1)[-1]
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(
+                    host, timeout=self.timeout, context=ssl.create_default_context()
+                )
+            else:
+                conn = http.client.HTTPConnection(host, timeout=self.timeout)
+            connections[key] = conn
+
+        return conn
+
+    def _drop_connection(self, scheme: str, netloc: str):
+        connections = getattr(self._local, "connections", {})
+        conn = connections.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _request(self, url: str, headers: dict[str, str]):
+        """GET url on a pooled connection, following redirects."""
+
+        for _ in range(5):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+            request_headers = dict(headers)
+            if parts.username:
+                credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+                request_headers["Authorization"] = (
+                    "Basic " + base64.b64encode(credentials.encode()).decode()
+                )
+
+            for attempt in range(2):
+                conn = self._connection(parts.scheme, parts.netloc)
+                try:
+                    conn.request("GET", path, headers=request_headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.HTTPException, OSError) as e:
+                    # the server may have closed an idle keep-alive connection
+                    self._drop_connection(parts.scheme, parts.netloc)
+                    if attempt:
+                        raise IndexUnavailableError(f"{url}: {e}") from e
+
+            if response.status in (301, 302, 303, 307, 308):
+                url = urljoin(url, response.getheader("Location", ""))
+                continue
+
+            return response.status, response, body
+
+        raise IndexUnavailableError(f"{url}: too many redirects")
+
+    # cache
+
+    def _cache_path(self, url: str) -> Path:
+        return self.cache_dir / (hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _load_cache(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._cache_path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # damaged entries and ones in an older format are a cache miss
+        if (
+            not isinstance(entry, dict)
+            or not isinstance(entry.get("body"), str)
+            or not isinstance(entry.get("content_type"), str)
+            or not isinstance(entry.get("fetched_at", 0), (int, float))
+            or not isinstance(entry.get("max_age", 0), (int, float))
+        ):
+            return None
+
+        return entry
+
+    @staticmethod
+    def _parse_cached(name: str, cached: dict) -> Optional[ProjectVersions]:
+        """Parse a cached page, None if the stored body is not readable."""
+
+        try:
+            return parse_project_page(
+                name, cached["body"].encode(), cached["content_type"]
+            )
+        except ValueError as e:
+            logger.error(f"Ignoring damaged HTTP cache entry for {name}: {e}")
+            return None
+
+    def _store_cache(self, url: str, entry: dict):
+        path = self._cache_path(url)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"Failed to write HTTP cache entry: {e}")
+
+    # public API
+
+    def get_project(self, name: str, revalidate: bool = False) -> Optional[ProjectVersions]:
+        """
+        Fetch the versions of a project.
+
+        Args:
+            name: Project name
+            revalidate: Ignore max-age and always send a conditional request
+
+        Returns:
+            ProjectVersions, or None if the index does not know the project
+
+        Raises:
+            IndexUnavailableError: if the index can not be reached
+        """
+
+        normalized = normalize_name(name)
+        url = urljoin(self.index_url, normalized + "/")
+        cached = self._load_cache(url)
+
+        if (
+            cached is not None
+            and not revalidate
+            and time.time() < cached.get("fetched_at", 0) + cached.get("max_age", 0)
+        ):
+            project = self._parse_cached(name, cached)
+            if project is not None:
+                return project
+            cached = None
+
+        headers = {"Accept": ACCEPT, "Accept-Encoding": "identity"}
+        plain_headers = dict(headers)
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        status, response, body = self._request(url, headers)
+
+        if status == 304 and cached is not None:
+            project = self._parse_cached(name, cached)
+            if project is not None:
+                cached["fetched_at"] = time.time()
+                cached["max_age"] = self._max_age(response, cached.get("max_age", 0))
+                self._store_cache(url, cached)
+                return project
+
+            # the stored body is unusable, fetch the page unconditionally
+            status, response, body = self._request(url, plain_headers)
+
+        if status == 404:
+            return None
+
+        if status != 200:
+            raise IndexUnavailableError(f"{url}: HTTP {status}")
+
+        content_type = response.getheader("Content-Type", "text/html")
+
+        self._store_cache(
+            url,
+            {
+                "etag": response.getheader("ETag"),
+                "last_modified": response.getheader("Last-Modified"),
+                "content_type": content_type,
+                "fetched_at": time.time(),
+                "max_age": self._max_age(response, 0),
+                "body": body.decode("utf-8", errors="replace"),
+            },
+        )
+
+        return parse_project_page(name, body, content_type)
+
+    def _max_age(self, response, default: int) -> int:
+        cache_control = response.getheader("Cache-Control", "")
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0
+
+        match = _MAX_AGE_RE.search(cache_control)
+
+        return int(match.group(1)) if match else default
+
+    def get_many(
+        self, names: list[str], revalidate: bool = False
+    ) -> dict[str, Optional[ProjectVersions]]:
+        """
+        Fetch several projects concurrently.
+
+        Args:
+            names: Project names
+            revalidate: Ignore max-age and always send conditional requests
+
+        Projects are submitted as workers free up, so once
+        MAX_CONSECUTIVE_FAILURES requests in a row could not reach the index
+        the rest of the batch is not attempted.
+
+        Returns:
+            dict: {name: ProjectVersions or None}; projects that failed to
+                  load are left out
+
+        Raises:
+            IndexUnavailableError: if not a single project could be fetched,
+                                   or the index stopped answering
+        """
+
+        remaining = iter(names)
+        pending: dict[concurrent.futures.Future, str] = {}
+
+        def submit_next():
+            for name in remaining:
+                future = self._executor.submit(self.get_project, name, revalidate)
+                pending[future] = name
+                return
+
+        for _ in range(self.max_workers):
+            submit_next()
+
+        results: dict[str, Optional[ProjectVersions]] = {}
+        errors = []
+        failures = 0
+
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    results[name] = future.result()
+                    failures = 0
+                except IndexUnavailableError as e:
+                    errors.append(e)
+                    failures += 1
+                    logger.error(f"Error fetching {name} from the index: {e}")
+                except ValueError as e:
+                    # a page that does not parse says nothing about the connection
+                    errors.append(e)
+                    logger.error(f"Error fetching {name} from the index: {e}")
+
+                if failures < MAX_CONSECUTIVE_FAILURES:
+                    submit_next()
+
+        if failures >= MAX_CONSECUTIVE_FAILURES:
+            raise IndexUnavailableError(
+                f"giving up after {failures} failed requests: {errors[-1]}"
+            )
+
+        if names and not results and errors:
+            raise IndexUnavailableError(str(errors[0]))
+
+        return results
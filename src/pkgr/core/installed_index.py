@@ -0,0 +1,357 @@
+import os
+import re
+import sys
+import glob
+import logging
+import sysconfig
+import threading
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+_NORMALIZE_RE = re.compile(r"[-_.]+")
+
+# distributions handed to a refresh(on_scanned=...) callback at a time
+SCAN_BATCH = 500
+
+ScanCallback = Callable[[list["InstalledDistribution"]], None]
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a distribution name as described in PEP 503.
+
+    Args:
+        name: Distribution name as written by the user or in metadata
+
+    Returns:
+        str: Lower-cased name with runs of '-', '_' and '.' collapsed to '-'
+    """
+
+    return _NORMALIZE_RE.sub("-", name).lower()
+
+
+def default_environment_prefix() -> Optional[str]:
+    """
+    Find the prefix of the environment that `uv pip` targets by default.
+
+    uv looks at the active virtual environment first, then at an active
+    conda environment and finally at a `.venv` directory in the working
+    directory or one of its parents.
+
+    Returns:
+        str: Environment prefix, or None if it can not be determined
+    """
+
+    for var in ("VIRTUAL_ENV", "CONDA_PREFIX"):
+        prefix = os.environ.get(var)
+        if prefix and os.path.isdir(prefix):
+            return prefix
+
+    cwd = Path.cwd()
+    for directory in (cwd, *cwd.parents):
+        candidate = directory / ".venv"
+        if (candidate / "pyvenv.cfg").is_file():
+            return str(candidate)
+
+    return None
+
+
+def get_site_packages_dirs(prefix: str) -> list[str]:
+    """
+    List the site-packages directories of an environment.
+
+    Args:
+        prefix: Environment prefix (the directory holding pyvenv.cfg)
+
+    Returns:
+        List of existing site-packages directories
+    """
+
+    if os.path.normcase(os.path.abspath(prefix)) == os.path.normcase(
+        os.path.abspath(sys.prefix)
+    ):
+        paths = sysconfig.get_paths()
+        candidates = [paths["purelib"], paths["platlib"]]
+    elif os.name == "nt":
+        candidates = [os.path.join(prefix, "Lib", "site-packages")]
+    else:
+        candidates = sorted(
+            glob.glob(os.path.join(prefix, "lib", "python*", "site-packages"))
+        ) + sorted(glob.glob(os.path.join(prefix, "lib64", "python*", "site-packages")))
+
+    site_dirs = []
+    for candidate in candidates:
+        real = os.path.realpath(candidate)
+        if os.path.isdir(real) and real not in site_dirs:
+            site_dirs.append(real)
+
+    return site_dirs
+
+
+class InstalledDistribution(NamedTuple):
+    name: str
+    version: str
+    location: str
+    path: str  # path to the .dist-info / .egg-info entry
+
+
+def _read_metadata_headers(path: str) -> tuple[Optional[str], Optional[str]]:
+    """Read Name and Version from the header block of a METADATA/PKG-INFO file."""
+
+    name = version = None
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line in ("\n", "\r\n"):
+                    break  # end of the header block
+                if line.startswith("Name:"):
+                    name = line[5:].strip()
+                elif line.startswith("Version:"):
+                    version = line[8:].strip()
+                if name and version:
+                    break
+    except OSError:
+        pass
+
+    return name, version
+
+
+def _read_distribution(site_dir: str, entry: str) -> Optional[InstalledDistribution]:
+    """Build an InstalledDistribution from a single site-packages entry."""
+
+    path = os.path.join(site_dir, entry)
+
+    if entry.endswith(".dist-info"):
+        metadata = os.path.join(path, "METADATA")
+        stem = entry[: -len(".dist-info")]
+    elif entry.endswith(".egg-info"):
+        # egg-info can either be a directory or a single PKG-INFO style file
+        metadata = os.path.join(path, "PKG-INFO") if os.path.isdir(path) else path
+        stem = entry[: -len(".egg-info")]
+    else:
+        return None
+
+    name, version = _read_metadata_headers(metadata)
+
+    if not name or not version:
+        # fall back to the "{name}-{version}" directory name
+        dir_name, _, dir_version = stem.partition("-")
+        name = name or dir_name
+        version = version or dir_version.split("-py")[0]
+
+    if not name or not version:
+        return None
+
+    return InstalledDistribution(name, version, site_dir, path)
+
+
+class InstalledIndex:
+    """
+    In-process index of the distributions installed in an environment.
+
+    The index is built by scanning the *.dist-info / *.egg-info entries of
+    every site-packages directory. Each directory is rescanned only when its
+    mtime changes, so lookups cost a few stat calls plus a dictionary lookup.
+    A rescan only reads the metadata of entries that are new or modified.
+    """
+
+    _instances: dict[tuple[str, ...], "InstalledIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, site_dirs: list[str]):
+        self.site_dirs = list(site_dirs)
+
+        self._lock = threading.Lock()
+        self._mtimes: dict[str, int] = {}
+        self._dir_entries: dict[str, dict[str, InstalledDistribution]] = {}
+        # site dir -> {entry: (entry mtime, distribution)} of the last scan
+        self._scanned: dict[str, dict[str, tuple[int, InstalledDistribution]]] = {}
+        self._by_name: dict[str, InstalledDistribution] = {}
+
+        # bumped every time the set of distributions is rebuilt
+        self.generation = 0
+
+    @classmethod
+    def for_environment(cls, prefix: Optional[str] = None) -> "InstalledIndex":
+        """
+        Return the shared index for an environment.
+
+        Args:
+            prefix: Environment prefix, defaults to the environment uv targets
+
+        Returns:
+            InstalledIndex: index for the environment (empty if not found)
+        """
+
+        if prefix is None:
+            prefix = default_environment_prefix()
+
+        site_dirs = get_site_packages_dirs(prefix) if prefix else []
+        key = tuple(site_dirs)
+
+        with cls._instances_lock:
+            index = cls._instances.get(key)
+            if index is None:
+                index = cls(site_dirs)
+                cls._instances[key] = index
+
+            return index
+
+    def available(self) -> bool:
+        """True if the index has at least one site-packages directory to scan."""
+
+        return bool(self.site_dirs)
+
+    def invalidate(self):
+        """Force a full rescan on the next lookup."""
+
+        with self._lock:
+            self._mtimes.clear()
+            self._scanned.clear()
+
+    def refresh(self, on_scanned: Optional[ScanCallback] = None) -> bool:
+        """
+        Rescan every site-packages directory whose mtime changed.
+
+        Args:
+            on_scanned: Called with batches of the distributions of every
+                        rescanned directory as they are read, in directory
+                        order and before shadowed duplicates are dropped
+
+        Returns:
+            bool: True if the set of distributions was rebuilt
+        """
+
+        with self._lock:
+            changed = False
+
+            for site_dir in self.site_dirs:
+                try:
+                    mtime = os.stat(site_dir).st_mtime_ns
+                except OSError:
+                    mtime = -1
+
+                if self._mtimes.get(site_dir) == mtime:
+                    continue
+
+                self._dir_entries[site_dir] = self._scan_dir(site_dir, on_scanned)
+                self._mtimes[site_dir] = mtime
+                changed = True
+
+            if changed:
+                self._rebuild()
+
+            return changed
+
+    def _scan_dir(
+        self, site_dir: str, on_scanned: Optional[ScanCallback] = None
+    ) -> dict[str, InstalledDistribution]:
+        entries: dict[str, InstalledDistribution] = {}
+        batch: list[InstalledDistribution] = []
+        previous = self._scanned.get(site_dir, {})
+        scanned: dict[str, tuple[int, InstalledDistribution]] = {}
+
+        try:
+            names = os.listdir(site_dir)
+        except OSError as e:
+            logger.error(f"Error scanning {site_dir}: {e}")
+            return entries
+
+        for entry in names:
+            if not entry.endswith((".dist-info", ".egg-info")):
+                continue
+
+            try:
+                mtime = os.stat(os.path.join(site_dir, entry)).st_mtime_ns
+            except OSError:
+                continue
+
+            # unchanged entries keep the metadata read by the last scan
+            cached = previous.get(entry)
+            if cached is not None and cached[0] == mtime:
+                dist = cached[1]
+            else:
+                dist = _read_distribution(site_dir, entry)
+
+            if dist is not None:
+                scanned[entry] = (mtime, dist)
+                entries.setdefault(normalize_name(dist.name), dist)
+
+                if on_scanned is not None:
+                    batch.append(dist)
+                    if len(batch) >= SCAN_BATCH:
+                        self._emit(on_scanned, batch)
+                        batch = []
+
+        if batch:
+            self._emit(on_scanned, batch)
+
+        self._scanned[site_dir] = scanned
+
+        return entries
+
+    @staticmethod
+    def _emit(on_scanned: ScanCallback, batch: list[InstalledDistribution]):
+        try:
+            on_scanned(batch)
+        except Exception as e:
+            logger.error(f"Scan callback failed: {e}")
+
+    def _rebuild(self):
+        by_name: dict[str, InstalledDistribution] = {}
+
+        # earlier directories shadow later ones, the same way sys.path does
+        for site_dir in self.site_dirs:
+            for key, dist in self._dir_entries.get(site_dir, {}).items():
+                by_name.setdefault(key, dist)
+
+        self._by_name = dict(sorted(by_name.items()))
+        self.generation += 1
+
+    def get(self, name: str) -> Optional[InstalledDistribution]:
+        """
+        Look up an installed distribution.
+
+        Args:
+            name: Distribution name in any PEP 503 spelling
+
+        Returns:
+            InstalledDistribution if installed, None otherwise
+        """
+
+        self.refresh()
+
+        return self._by_name.get(normalize_name(name))
+
+    def is_installed(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def version(self, name: str) -> Optional[str]:
+        dist = self.get(name)
+
+        return dist.version if dist else None
+
+    def snapshot(self) -> dict[str, InstalledDistribution]:
+        """Installed distributions keyed by normalized name, without refreshing."""
+
+        with self._lock:
+            return dict(self._by_name)
+
+    def distributions(
+        self, on_scanned: Optional[ScanCallback] = None
+    ) -> list[InstalledDistribution]:
+        """All installed distributions ordered by normalized name."""
+
+        self.refresh(on_scanned)
+
+        return list(self._by_name.values())
+
+    def packages(
+        self, on_scanned: Optional[ScanCallback] = None
+    ) -> list[tuple[str, str]]:
+        """All installed distributions as (package_name, version) tuples."""
+
+        return [(dist.name, dist.version) for dist in self.distributions(on_scanned)]
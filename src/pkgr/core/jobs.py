@@ -0,0 +1,384 @@
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Any, Callable, Hashable, Optional
+
+from pkgr.core.command_engine import CommandHandle
+
+logger = logging.getLogger(__name__)
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+# read-only jobs running at the same time, over all environments
+MAX_READERS = 4
+
+# finished jobs kept for the job list
+HISTORY = 50
+
+_current = threading.local()
+
+
+def current_job() -> Optional["Job"]:
+    """The job running on this thread, None outside of the scheduler."""
+
+    return getattr(_current, "job", None)
+
+
+class Job:
+    """
+    One unit of work for the JobScheduler.
+
+    Commands started while the job runs are attached to it (see attach),
+    so cancelling a running job kills its uv processes.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        description: str,
+        run: Callable[[], Any],
+        environment: Optional[str],
+        mutating: bool,
+        priority: int,
+        key: Optional[Hashable],
+    ):
+        self.id = job_id
+        self.description = description
+        self.run = run
+        self.environment = environment
+        self.mutating = mutating
+        self.priority = priority
+        self.key = key
+
+        self.state = QUEUED
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error = ""
+        # identical requests merged into this job
+        self.coalesced = 0
+
+        self._lock = threading.Lock()
+        self._handles: list[CommandHandle] = []
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    @property
+    def waited(self) -> float:
+        """Seconds spent in the queue."""
+
+        return (self.started_at or self.finished_at or time.time()) - self.submitted_at
+
+    @property
+    def duration(self) -> float:
+        """Seconds spent running, so far if the job is still running."""
+
+        if self.started_at is None:
+            return 0.0
+
+        return (self.finished_at or time.time()) - self.started_at
+
+    def attach(self, handle: CommandHandle):
+        """Cancel handle together with this job."""
+
+        with self._lock:
+            self._handles = [h for h in self._handles if not h.done()]
+            self._handles.append(handle)
+
+        if self.cancelled:
+            handle.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finished, returns False on timeout."""
+
+        return self._finished.wait(timeout)
+
+    def _cancel(self):
+        self._cancelled.set()
+
+        with self._lock:
+            handles = list(self._handles)
+
+        for handle in handles:
+            handle.cancel()
+
+
+class JobScheduler:
+    """
+    Runs package operations without letting them trample on each other.
+
+    Every environment has a FIFO queue. A mutating job (install, uninstall,
+    upgrade) runs alone in its environment, read-only jobs run side by side
+    until a mutation is due. Jobs of different environments never wait for
+    each other. Submitting a request that is already queued or running
+    returns the existing job instead of running it twice, and a higher
+    priority moves a job ahead of the others in its queue.
+    """
+
+    _instance: Optional["JobScheduler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_readers: int = MAX_READERS, history: int = HISTORY):
+        self.max_readers = max_readers
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._queued: list[Job] = []
+        self._running: list[Job] = []
+        self._finished: deque[Job] = deque(maxlen=history)
+        self._callbacks: list[Callable[[Job], None]] = []
+
+    @classmethod
+    def default(cls) -> "JobScheduler":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+
+            return cls._instance
+
+    def submit(
+        self,
+        description: str,
+        run: Callable[[], Any],
+        environment: Optional[str] = None,
+        mutating: bool = True,
+        priority: int = PRIORITY_NORMAL,
+        key: Optional[Hashable] = None,
+    ) -> Job:
+        """
+        Queue run() for its environment.
+
+        Args:
+            description: Text shown in the job list
+            run: Work of the job, called on a scheduler thread
+            environment: Environment prefix the job works on
+            mutating: False for jobs that only read the environment
+            priority: Higher priorities leave the queue first
+            key: Identifies the request, a queued or running job with the
+                 same key and environment is returned instead of a new one
+
+        Returns:
+            Job: the new job or the one it was coalesced into
+        """
+
+        with self._lock:
+            if key is not None:
+                for job in self._running + self._queued:
+                    if job.key == key and job.environment == environment:
+                        job.coalesced += 1
+                        job.priority = max(job.priority, priority)
+                        logger.info(f"Job {job.id} ({job.description}) requested again")
+                        return job
+
+            job = Job(
+                next(self._ids),
+                description,
+                run,
+                environment,
+                mutating,
+                priority,
+                key,
+            )
+            self._queued.append(job)
+            started = self._dispatch()
+
+        self._notify(job)
+        for running in started:
+            self._notify(running)
+
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        """
+        Drop a queued job or kill the commands of a running one.
+
+        Returns:
+            bool: False if the job had already finished
+        """
+
+        with self._lock:
+            if job.finished:
+                return False
+
+            if job in self._queued:
+                self._queued.remove(job)
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                job._cancelled.set()
+                job._finished.set()
+                self._finished.append(job)
+                started = self._dispatch()
+            else:
+                started = []
+
+        # a running job finishes on its own once its commands are killed
+        job._cancel()
+
+        self._notify(job)
+        for running in started:
+            self._notify(running)
+
+        return True
+
+    def cancel_all(self, environment: Any = ...) -> int:
+        """Cancel every unfinished job, or only those of one environment."""
+
+        with self._lock:
+            jobs = [
+                job
+                for job in self._running + self._queued
+                if environment is ... or job.environment == environment
+            ]
+
+        return sum(self.cancel(job) for job in jobs)
+
+    def prioritize(self, job: Job, priority: int = PRIORITY_HIGH):
+        """Move a queued job ahead of the jobs with a lower priority."""
+
+        with self._lock:
+            if job.state != QUEUED:
+                return
+
+            job.priority = priority
+            started = self._dispatch()
+
+        self._notify(job)
+        for running in started:
+            self._notify(running)
+
+    def jobs(self) -> list[Job]:
+        """Running jobs, then queued jobs in run order, then finished ones."""
+
+        with self._lock:
+            return (
+                list(self._running)
+                + sorted(self._queued, key=self._order)
+                + list(reversed(self._finished))
+            )
+
+    def pending(self, environment: Any = ...) -> int:
+        """Number of queued and running jobs, of one environment if given."""
+
+        with self._lock:
+            return sum(
+                1
+                for job in self._running + self._queued
+                if environment is ... or job.environment == environment
+            )
+
+    def subscribe(self, callback: Callable[[Job], None]) -> Callable[[], None]:
+        """
+        Call callback(job) whenever a job changes state, from any thread.
+
+        Returns:
+            Function that removes the subscription
+        """
+
+        with self._lock:
+            self._callbacks.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+        return unsubscribe
+
+    @staticmethod
+    def _order(job: Job) -> tuple[int, int]:
+        return -job.priority, job.id
+
+    def _dispatch(self) -> list[Job]:
+        """Start every queued job that may run now, with self._lock held."""
+
+        started = []
+        # environments with a mutation waiting, later jobs queue behind it
+        blocked = set()
+        readers = sum(1 for job in self._running if not job.mutating)
+
+        for job in sorted(self._queued, key=self._order):
+            environment = job.environment
+            busy = [j for j in self._running if j.environment == environment]
+
+            if environment in blocked:
+                continue
+
+            if job.mutating:
+                blocked.add(environment)
+                if busy:
+                    continue
+            elif any(j.mutating for j in busy) or readers >= self.max_readers:
+                continue
+            else:
+                readers += 1
+
+            self._queued.remove(job)
+            self._running.append(job)
+            job.state = RUNNING
+            job.started_at = time.time()
+
+            threading.Thread(
+                target=self._run,
+                args=(job,),
+                name=f"pkgr-job-{job.id}",
+                daemon=True,
+            ).start()
+            started.append(job)
+
+        return started
+
+    def _run(self, job: Job):
+        _current.job = job
+
+        try:
+            job.result = job.run()
+            state = DONE
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.description}) failed: {e}")
+            job.error = str(e)
+            state = FAILED
+        finally:
+            _current.job = None
+
+        with self._lock:
+            job.state = CANCELLED if job.cancelled else state
+            job.finished_at = time.time()
+            self._running.remove(job)
+            self._finished.append(job)
+            started = self._dispatch()
+
+        job._finished.set()
+
+        self._notify(job)
+        for running in started:
+            self._notify(running)
+
+    def _notify(self, job: Job):
+        with self._lock:
+            callbacks = list(self._callbacks)
+
+        for callback in callbacks:
+            try:
+                callback(job)
+            except Exception as e:
+                logger.error(f"Error in job callback: {e}")
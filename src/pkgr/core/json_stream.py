@@ -0,0 +1,87 @@
+import json
+from typing import Any
+
+
+class JsonArrayParser:
+    """
+    Incremental parser for a JSON array that arrives in pieces.
+
+    feed() takes the next piece of text and returns the elements it
+    completed, so the elements of a long array can be used while the rest
+    is still being written, e.g. by `uv pip list --format=json`.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    @property
+    def finished(self) -> bool:
+        """True once the closing bracket has been read."""
+
+        return self._finished
+
+    def feed(self, text: str) -> list[Any]:
+        """
+        Parse the next piece of the array.
+
+        Returns:
+            list: elements completed by this piece, in order
+
+        Raises:
+            ValueError: if the text is not a JSON array
+        """
+
+        buffer = self._buffer + text
+        end = len(buffer)
+        position = 0
+        items = []
+
+        while True:
+            while position < end and buffer[position].isspace():
+                position += 1
+            if position == end:
+                break
+
+            char = buffer[position]
+
+            if not self._started:
+                if char != "[":
+                    raise ValueError(f"expected a JSON array, got {char!r}")
+                self._started = True
+                position += 1
+            elif self._finished:
+                raise ValueError(f"unexpected {char!r} after the JSON array")
+            elif char == "]":
+                self._finished = True
+                position += 1
+            elif char == ",":
+                position += 1
+            else:
+                try:
+                    item, stop = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # the element is not complete yet
+                    break
+
+                # a number or literal at the very end may still go on
+                if stop == end and not isinstance(item, (dict, list, str)):
+                    break
+
+                items.append(item)
+                position = stop
+
+        self._buffer = buffer[position:]
+
+        return items
+
+    def close(self):
+        """
+        Raises:
+            ValueError: if the array was not complete
+        """
+
+        if not self._finished:
+            raise ValueError("the JSON array ended before its closing bracket")
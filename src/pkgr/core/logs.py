@@ -0,0 +1,147 @@
+import os
+import copy
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Optional
+
+from pkgr.core.paths import user_log_dir
+
+LOG_FILE = "pkgr.log"
+
+# size rotation: pkgr.log is rolled over to pkgr.log.1 ... past this size
+MAX_LOG_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread and message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts a copy of the record on the queue with its message and traceback
+    rendered, unlike QueueHandler the traceback stays separate from the
+    message so JsonFormatter can report it in its own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+
+        return record
+
+
+def stop_logging():
+    """Flush the queued records and stop the listener thread."""
+
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def _file_handler(rotation: str) -> logging.Handler:
+    path = user_log_dir() / LOG_FILE
+
+    if rotation == "daily":
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when="midnight", backupCount=BACKUP_COUNT, encoding="utf-8"
+        )
+
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+    )
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    log_format: Optional[str] = None,
+    rotation: Optional[str] = None,
+) -> logging.handlers.QueueListener:
+    """
+    Route every log record through a queue to a background listener.
+
+    Loggers only put records on an unbounded queue, so logging never
+    blocks the Tk main thread or a worker on file I/O. The listener thread
+    writes them to the console and to pkgr.log in the user log directory.
+
+    Args:
+        level: Level name, defaults to PKGR_LOG_LEVEL or INFO
+        log_format: "text" or "json", defaults to PKGR_LOG_FORMAT or text
+        rotation: "size" (MAX_LOG_BYTES) or "daily", defaults to
+                  PKGR_LOG_ROTATION or size
+
+    Returns:
+        QueueListener: the running listener, stopped at exit
+    """
+
+    global _listener
+
+    stop_logging()
+
+    level = level or os.environ.get("PKGR_LOG_LEVEL", "INFO")
+    log_format = log_format or os.environ.get("PKGR_LOG_FORMAT", "text")
+    rotation = rotation or os.environ.get("PKGR_LOG_ROTATION", "size")
+
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    file_error = None
+    try:
+        handlers.append(_file_handler(rotation))
+    except OSError as e:
+        file_error = e
+
+    if log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+    if file_error is not None:
+        logging.getLogger(__name__).error(f"Logging to the console only: {file_error}")
+
+    return _listener
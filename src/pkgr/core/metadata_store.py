@@ -0,0 +1,469 @@
+import os
+import re
+import json
+import logging
+import sqlite3
+import threading
+from email.parser import HeaderParser
+from typing import Any, Optional
+
+from pkgr.core.disk_usage import distribution_usage, scan_usage
+from pkgr.core.installed_index import (
+    InstalledDistribution,
+    InstalledIndex,
+    normalize_name,
+)
+from pkgr.core.paths import user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+# 2: sizes include files RECORD lists without a size, and non-RECORD packages
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS distributions (
+    path       TEXT PRIMARY KEY,
+    mtime      INTEGER NOT NULL,
+    name       TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    version    TEXT NOT NULL,
+    summary    TEXT NOT NULL DEFAULT '',
+    home_page  TEXT NOT NULL DEFAULT '',
+    author     TEXT NOT NULL DEFAULT '',
+    license    TEXT NOT NULL DEFAULT '',
+    requires   TEXT NOT NULL DEFAULT '[]',
+    location   TEXT NOT NULL,
+    files      INTEGER NOT NULL DEFAULT 0,
+    size       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_distributions_normalized
+    ON distributions (normalized);
+CREATE INDEX IF NOT EXISTS idx_distributions_location
+    ON distributions (location);
+"""
+
+_REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def requirement_name(requirement: str) -> Optional[str]:
+    """Extract the distribution name from a Requires-Dist value."""
+
+    match = _REQUIREMENT_NAME_RE.match(requirement)
+
+    return match.group(1) if match else None
+
+
+def _location_filter(
+    site_dirs: Optional[list[str]], keyword: str = "WHERE"
+) -> tuple[str, list[str]]:
+    """
+    SQL condition restricting rows to site-packages directories.
+
+    Args:
+        site_dirs: Directories to keep, no restriction if empty or None
+        keyword: "WHERE", or "AND" to extend an existing condition
+
+    Returns:
+        (clause, params) to append to the query and its parameters
+    """
+
+    if not site_dirs:
+        return "", []
+
+    return f" {keyword} location IN ({','.join('?' * len(site_dirs))})", list(site_dirs)
+
+
+def _metadata_file(dist: InstalledDistribution) -> str:
+    if dist.path.endswith(".dist-info"):
+        return os.path.join(dist.path, "METADATA")
+    if os.path.isdir(dist.path):
+        return os.path.join(dist.path, "PKG-INFO")
+    return dist.path
+
+
+def parse_distribution(
+    dist: InstalledDistribution, usage: Optional[tuple[int, int]] = None
+) -> dict[str, Any]:
+    """
+    Parse the metadata of an installed distribution.
+
+    Args:
+        dist: Distribution found by the InstalledIndex
+        usage: (file count, size) if already computed, see disk_usage
+
+    Returns:
+        dict: a row for the distributions table
+    """
+
+    header_lines = []
+    try:
+        with open(_metadata_file(dist), encoding="utf-8", errors="replace") as f:
+            # only the header block is needed, skip the long description
+            for line in f:
+                if line in ("\n", "\r\n"):
+                    break
+                header_lines.append(line)
+    except OSError as e:
+        logger.error(f"Error reading metadata of {dist.name}: {e}")
+
+    headers = HeaderParser().parsestr("".join(header_lines))
+
+    def header(key: str) -> str:
+        value = str(headers.get(key, "")).strip()
+        return "" if value == "UNKNOWN" else value
+
+    requires = [str(r) for r in headers.get_all("Requires-Dist", [])]
+    # some projects put the full license text in the License field
+    license_ = header("License")
+
+    files, size = usage if usage is not None else distribution_usage(dist)
+
+    return {
+        "path": dist.path,
+        "name": dist.name,
+        "normalized": normalize_name(dist.name),
+        "version": dist.version,
+        "summary": header("Summary"),
+        "home_page": header("Home-page"),
+        "author": header("Author") or header("Author-email"),
+        "license": license_.splitlines()[0] if license_ else "",
+        "requires": json.dumps(requires),
+        "location": dist.location,
+        "files": files,
+        "size": size,
+    }
+
+
+class MetadataStore:
+    """
+    Persistent SQLite store of parsed distribution metadata.
+
+    Rows are keyed by the dist-info path and the mtime it had when it was
+    parsed, so a sync only re-parses distributions that were added or
+    changed since the previous session.
+    """
+
+    _default: Optional["MetadataStore"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._synced: dict[tuple[str, ...], int] = {}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS distributions")
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def default(cls) -> "MetadataStore":
+        """Return the shared store kept in the user cache directory."""
+
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(str(user_cache_dir() / "metadata.sqlite3"))
+
+            return cls._default
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def sync(self, site_dirs: list[str], distributions: list[InstalledDistribution]) -> int:
+        """
+        Bring the store up to date with the given distributions.
+
+        Args:
+            site_dirs: site-packages directories the distributions were found in
+            distributions: distributions currently installed in those directories
+
+        Returns:
+            int: number of rows that were (re)parsed
+        """
+
+        # only the reads and writes hold the lock, so queries from the Tk
+        # thread are not held up by the RECORD scan below
+        known = {}
+        if site_dirs:
+            clause, params = _location_filter(site_dirs)
+            known = {
+                row["path"]: row["mtime"]
+                for row in self._query(
+                    "SELECT path, mtime FROM distributions" + clause, params
+                )
+            }
+
+        changed = []
+        seen = set()
+
+        for dist in distributions:
+            seen.add(dist.path)
+            try:
+                mtime = os.stat(dist.path).st_mtime_ns
+            except OSError:
+                continue
+
+            if known.get(dist.path) != mtime:
+                changed.append((dist, mtime))
+
+        # sizes need every file of a distribution, scan them in parallel
+        usages = scan_usage(dist for dist, _ in changed)
+
+        rows = []
+        for dist, mtime in changed:
+            row = parse_distribution(dist, usages[dist.path])
+            row["mtime"] = mtime
+            rows.append(row)
+
+        stale = [(path,) for path in known if path not in seen]
+
+        if rows or stale:
+            with self._lock:
+                if rows:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO distributions "
+                        "(path, mtime, name, normalized, version, summary, "
+                        "home_page, author, license, requires, location, files, "
+                        "size) VALUES "
+                        "(:path, :mtime, :name, :normalized, :version, :summary, "
+                        ":home_page, :author, :license, :requires, :location, "
+                        ":files, :size)",
+                        rows,
+                    )
+                if stale:
+                    self._conn.executemany(
+                        "DELETE FROM distributions WHERE path = ?", stale
+                    )
+                self._conn.commit()
+
+        return len(rows)
+
+    def sync_index(self, index: InstalledIndex) -> int:
+        """
+        Sync the store with an InstalledIndex, skipping the work entirely
+        if the index has not changed since the last sync.
+        """
+
+        distributions = index.distributions()
+        key = tuple(index.site_dirs)
+        generation = index.generation
+
+        with self._lock:
+            if self._synced.get(key) == generation:
+                return 0
+
+        updated = self.sync(index.site_dirs, distributions)
+
+        with self._lock:
+            self._synced[key] = generation
+
+        return updated
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get(self, name: str, site_dirs: Optional[list[str]] = None) -> Optional[dict]:
+        """
+        Fetch the stored row for a distribution.
+
+        Args:
+            name: Distribution name in any PEP 503 spelling
+            site_dirs: restrict the lookup to these site-packages directories
+
+        Returns:
+            dict with the stored columns, or None if unknown
+        """
+
+        sql = "SELECT * FROM distributions WHERE normalized = ?"
+        params: list = [normalize_name(name)]
+
+        clause, location_params = _location_filter(site_dirs, "AND")
+        sql += clause
+        params.extend(location_params)
+
+        rows = self._query(sql, params)
+        if not rows:
+            return None
+
+        row = dict(rows[0])
+        row["requires"] = json.loads(row["requires"])
+
+        return row
+
+    def required_by(self, name: str, site_dirs: Optional[list[str]] = None) -> list[str]:
+        """Names of the stored distributions that declare a dependency on name."""
+
+        target = normalize_name(name)
+        sql = "SELECT name, requires FROM distributions"
+        params: list = []
+
+        clause, location_params = _location_filter(site_dirs)
+        sql += clause
+        params.extend(location_params)
+
+        dependents = []
+        for row in self._query(sql, params):
+            for req in json.loads(row["requires"]):
+                if "extra ==" in req or "extra==" in req:
+                    continue
+                req_name = requirement_name(req)
+                if req_name and normalize_name(req_name) == target:
+                    dependents.append(row["name"])
+                    break
+
+        return sorted(dependents, key=str.lower)
+
+    def details(self, name: str, site_dirs: Optional[list[str]] = None) -> dict[str, str]:
+        """
+        Package details in the same shape as `uv pip show` output.
+
+        Returns:
+            dict: details keyed by field name, empty if the package is unknown
+        """
+
+        row = self.get(name, site_dirs)
+        if row is None:
+            return {}
+
+        requires = []
+        for req in row["requires"]:
+            # optional dependencies are not installed requirements
+            if "extra ==" in req or "extra==" in req:
+                continue
+            req_name = requirement_name(req)
+            if req_name and req_name not in requires:
+                requires.append(req_name)
+
+        details = {
+            "Name": row["name"],
+            "Version": row["version"],
+            "Summary": row["summary"],
+            "Home-page": row["home_page"],
+            "Author": row["author"],
+            "License": row["license"],
+            "Location": row["location"],
+            "Requires": ", ".join(requires),
+            "Required-by": ", ".join(self.required_by(name, site_dirs)),
+            "Files": str(row["files"]),
+            "Size": format_size(row["size"]),
+        }
+
+        return {key: value for key, value in details.items() if value != ""}
+
+    def search(self, text: str, site_dirs: Optional[list[str]] = None) -> list[str]:
+        """Names of the distributions whose name or summary contains text."""
+
+        pattern = f"%{text.strip().lower()}%"
+        sql = (
+            "SELECT name FROM distributions "
+            "WHERE (lower(name) LIKE ? OR lower(summary) LIKE ?)"
+        )
+        params: list = [pattern, pattern]
+
+        clause, location_params = _location_filter(site_dirs, "AND")
+        sql += clause
+        params.extend(location_params)
+
+        return [row["name"] for row in self._query(sql + " ORDER BY normalized", params)]
+
+    def requirements(self, site_dirs: Optional[list[str]] = None) -> list[dict]:
+        """normalized, name, path, mtime and parsed requires of every row."""
+
+        sql = "SELECT normalized, name, path, mtime, requires FROM distributions"
+        params: list = []
+
+        clause, location_params = _location_filter(site_dirs)
+        sql += clause
+        params.extend(location_params)
+
+        rows = []
+        for row in self._query(sql, params):
+            row = dict(row)
+            row["requires"] = json.loads(row["requires"])
+            rows.append(row)
+
+        return rows
+
+    def summaries(self, site_dirs: Optional[list[str]] = None) -> dict[str, str]:
+        """{normalized name: summary} for every stored distribution."""
+
+        sql = "SELECT normalized, summary FROM distributions"
+        params: list = []
+
+        clause, location_params = _location_filter(site_dirs)
+        sql += clause
+        params.extend(location_params)
+
+        return {row["normalized"]: row["summary"] for row in self._query(sql, params)}
+
+    def by_size(
+        self, limit: Optional[int] = None, site_dirs: Optional[list[str]] = None
+    ) -> list[tuple[str, str, int]]:
+        """(name, version, size) tuples ordered from largest to smallest."""
+
+        sql = "SELECT name, version, size FROM distributions"
+        params: list = []
+
+        clause, location_params = _location_filter(site_dirs)
+        sql += clause
+        params.extend(location_params)
+
+        sql += " ORDER BY size DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return [(row["name"], row["version"], row["size"]) for row in self._query(sql, params)]
+
+    def sizes(self, site_dirs: Optional[list[str]] = None) -> dict[str, int]:
+        """{normalized name: size in bytes} for every stored distribution."""
+
+        sql = "SELECT normalized, size FROM distributions"
+        params: list = []
+
+        clause, location_params = _location_filter(site_dirs)
+        sql += clause
+        params.extend(location_params)
+
+        return {row["normalized"]: row["size"] for row in self._query(sql, params)}
+
+    def totals(self, site_dirs: Optional[list[str]] = None) -> tuple[int, int, int]:
+        """(distributions, files, bytes) over the stored distributions."""
+
+        sql = (
+            "SELECT COUNT(*) AS count, COALESCE(SUM(files), 0) AS files, "
+            "COALESCE(SUM(size), 0) AS size FROM distributions"
+        )
+        params: list = []
+
+        clause, location_params = _location_filter(site_dirs)
+        sql += clause
+        params.extend(location_params)
+
+        row = self._query(sql, params)[0]
+
+        return row["count"], row["files"], row["size"]
+
+
+def format_size(size: int) -> str:
+    """Human readable size, e.g. 12.3 MB."""
+
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+    return f"{value:.1f} GB"
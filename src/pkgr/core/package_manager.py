@@ -1,9 +1,41 @@
-import subprocess
+import os
 import json
 import logging
 import sys
 import re
-from typing import Any, Dict
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
+
+from pkgr.core.environments import python_executable
+from pkgr.core.installed_index import (
+    InstalledIndex,
+    default_environment_prefix,
+    normalize_name,
+)
+from pkgr.core.json_stream import JsonArrayParser
+from pkgr.core.metadata_store import MetadataStore, requirement_name
+from pkgr.core.resolution import (
+    PlanCache,
+    ResolutionPlan,
+    file_fingerprint,
+    installed_fingerprint,
+    plan_from_changes,
+    replayable,
+)
+from pkgr.core.telemetry import span
+from pkgr.core.versions import compare_all, needs_upgrade, update_kind
+
+if TYPE_CHECKING:
+    # imported on first use: packaging.markers, asyncio (command engine),
+    # ssl and http.client (index client) are slow to import and a command
+    # like `pkgr list` mostly needs none of them
+    from pkgr.core.dependency_graph import DependencyGraph
+    from pkgr.core.snapshots import Snapshot
+    from pkgr.core.watcher import SitePackagesWatcher
+    from pkgr.core.wheelhouse import WheelEntry
 
 logger = logging.getLogger(__name__)
 
@@ -11,14 +43,112 @@ logger = logging.getLogger(__name__)
 class PackageManager:
     """Handles package management operations."""
 
+    # environment every command targets, None for the one uv picks by default
+    environment_prefix: Optional[str] = None
+    python: Optional[str] = None
+
+    # per-thread override of the two above, see targeting()
+    _target = threading.local()
+
     @staticmethod
-    def run_pip_command(cmd: list[str]) -> tuple[bool, str, str]:
+    def set_environment(prefix: Optional[str], python: Optional[str] = None):
+        """
+        Target another environment with all following operations.
+
+        Args:
+            prefix: Environment prefix, None to go back to uv's default
+            python: Interpreter of the environment, passed as uv pip --python
+        """
+
+        PackageManager.environment_prefix = prefix
+        PackageManager.python = python
+
+    @staticmethod
+    def current_environment() -> tuple[Optional[str], Optional[str]]:
+        """(prefix, python) targeted by operations on this thread."""
+
+        target = getattr(PackageManager._target, "environment", None)
+        if target is not None:
+            return target
+
+        return PackageManager.environment_prefix, PackageManager.python
+
+    @staticmethod
+    @contextmanager
+    def targeting(
+        prefix: Optional[str], python: Optional[str] = None
+    ) -> Iterator[None]:
+        """
+        Target an environment on this thread only, while the block runs.
+
+        Queued jobs use it to keep working on the environment they were
+        submitted for after the user switched to another one.
+        """
+
+        previous = getattr(PackageManager._target, "environment", None)
+        PackageManager._target.environment = (prefix, python)
+        try:
+            yield
+        finally:
+            PackageManager._target.environment = previous
+
+    @staticmethod
+    def uv_pip(*args: str) -> list[str]:
+        """Build a `uv pip` command for the targeted environment."""
+
+        cmd = ["uv", "pip", *args]
+
+        _, python = PackageManager.current_environment()
+        if python:
+            cmd.extend(["--python", python])
+
+        return cmd
+
+    @staticmethod
+    def installed_index() -> InstalledIndex:
+        """The in-process index of the targeted environment."""
+
+        prefix, _ = PackageManager.current_environment()
+
+        return InstalledIndex.for_environment(prefix)
+
+    @staticmethod
+    def watcher() -> "SitePackagesWatcher":
+        """
+        The running site-packages watcher of the targeted environment.
+
+        Keep the returned watcher to follow that environment after the
+        user switched to another one.
+        """
+
+        from pkgr.core.watcher import SitePackagesWatcher
+
+        return SitePackagesWatcher.for_index(PackageManager.installed_index())
+
+    @staticmethod
+    def run_pip_command(
+        cmd: list[str],
+        timeout: Optional[float] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+        streams: tuple[str, ...] = ("stdout", "stderr"),
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> tuple[bool, str, str]:
         """
         Runs pip command return sucess status,stdout and stderr.
 
+        The command runs on the shared CommandEngine, so it is bounded by a
+        timeout and can be cancelled with CommandEngine.default().cancel_all(),
+        or by cancelling the scheduler job it runs in.
 
         Args:
            cmd: List of command arguments.
+           timeout: Seconds before the command is killed (engine default if None)
+           on_output: Stream mode, called with every output line as it arrives;
+                      only the tail of the output is returned
+           streams: The streams ("stdout", "stderr") whose output goes to
+                    on_output and on_chunk
+           on_chunk: Stream mode, called with every piece of output as it is
+                     read, before its line is complete
 
 
         Returns:
@@ -28,16 +158,36 @@ class PackageManager:
 
         """
 
+        from pkgr.core.command_engine import CommandEngine
+        from pkgr.core.jobs import current_job
+
         try:
-            process = subprocess.run(
-                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            on_line = None
+            if on_output is not None:
+
+                def on_line(stream: str, line: str):
+                    if stream in streams:
+                        on_output(line)
+
+            on_text = None
+            if on_chunk is not None:
+
+                def on_text(stream: str, text: str):
+                    if stream in streams:
+                        on_chunk(text)
+
+            handle = CommandEngine.default().submit(
+                cmd, timeout, on_line=on_line, on_chunk=on_text
             )
 
-            success = (
-                process.returncode == 0
-            )  # set variable success to either True or False
+            # cancelling the job that started the command kills the command
+            job = current_job()
+            if job is not None:
+                job.attach(handle)
+
+            result = handle.result()
 
-            return success, process.stdout, process.stderr
+            return result.success, result.stdout, result.stderr
 
         except FileNotFoundError as e:
             logger.error(f"Executable not found:{e}")
@@ -63,7 +213,19 @@ class PackageManager:
             Tuple: True if package is installed, False otherwise
         """
 
-        cmd = ["uv", "pip", "show", pkg_name]
+        index = PackageManager.installed_index()
+
+        if index.available():
+            dist = index.get(pkg_name)
+            if dist is not None:
+                return True, (
+                    f"Name: {dist.name}\nVersion: {dist.version}\n"
+                    f"Location: {dist.location}\n"
+                )
+            return False, f"Package(s) not found for: {pkg_name}"
+
+        # fall back to uv when the target environment could not be located
+        cmd = PackageManager.uv_pip("show", pkg_name)
 
         success, stdout, stderr = PackageManager.run_pip_command(cmd)
         if success:
@@ -81,7 +243,16 @@ class PackageManager:
 
         """
 
-        cmd = ["uv", "pip", "list", "--format=json"]
+        index = PackageManager.installed_index()
+
+        if index.available():
+            with span("index:installed_packages") as timing:
+                packages = index.packages()
+                timing.set(rows=len(packages))
+            return packages
+
+        # fall back to uv when the target environment could not be located
+        cmd = PackageManager.uv_pip("list", "--format=json")
 
         success, stdout, stderr = PackageManager.run_pip_command(cmd)
 
@@ -90,10 +261,12 @@ class PackageManager:
             return []
 
         try:
-            packages = []
-            data = json.loads(stdout)
-            for pkg in data:
-                packages.append((pkg["name"], pkg["version"]))
+            with span("parse:pip_list", output_bytes=len(stdout)) as timing:
+                packages = []
+                data = json.loads(stdout)
+                for pkg in data:
+                    packages.append((pkg["name"], pkg["version"]))
+                timing.set(rows=len(packages))
 
             return packages
 
@@ -102,15 +275,27 @@ class PackageManager:
             return []
 
     @staticmethod
-    def get_outdated_packages() -> list[tuple[str, str, str]]:
+    def get_outdated_packages() -> list[tuple[str, str, str, str]]:
         """
         Get list of outdated packages.
 
         Returns:
-            List of tuples containing (package_name, current_version, latest_version)
+            List of tuples containing
+            (package_name, current_version, latest_version, update_kind)
+            where update_kind is "major", "minor", "patch" or "other"
         """
 
-        cmd = ["uv", "pip", "list", "--outdated", "--format=json"]
+        from pkgr.core.index_client import IndexUnavailableError
+
+        index = PackageManager.installed_index()
+
+        if index.available():
+            try:
+                return PackageManager._outdated_from_index(index.packages())
+            except IndexUnavailableError as e:
+                logger.error(f"Index client failed, falling back to uv: {e}")
+
+        cmd = PackageManager.uv_pip("list", "--outdated", "--format=json")
 
         success, stdout, stderr = PackageManager.run_pip_command(cmd)
 
@@ -119,11 +304,20 @@ class PackageManager:
             return []
 
         try:
-            packages = []
-            data = json.loads(stdout)
-
-            for pkg in data:
-                packages.append((pkg["name"], pkg["version"], pkg["latest_version"]))
+            with span("parse:pip_list_outdated", output_bytes=len(stdout)) as timing:
+                packages = []
+                data = json.loads(stdout)
+
+                for pkg in data:
+                    packages.append(
+                        (
+                            pkg["name"],
+                            pkg["version"],
+                            pkg["latest_version"],
+                            update_kind(pkg["version"], pkg["latest_version"]),
+                        )
+                    )
+                timing.set(rows=len(packages))
 
             return packages
         except json.JSONDecodeError as e:
@@ -134,20 +328,176 @@ class PackageManager:
             return []
 
     @staticmethod
-    def install_package(package_name: str) -> tuple[bool, str]:
+    def stream_installed_packages(
+        on_rows: Callable[[list[tuple[str, str]]], None],
+    ) -> list[tuple[str, str]]:
+        """
+        get_installed_packages(), handing the rows to on_rows as they are found.
+
+        The in-process index emits the distributions of every site-packages
+        directory it has to scan while reading them, uv's JSON output is
+        parsed as it arrives. When nothing had to be scanned the whole list
+        is emitted at once.
+
+        Args:
+            on_rows: Called from a worker thread with (package_name, version)
+                     tuples, in the order they were found
+
+        Returns:
+            The complete list, sorted and without the shadowed duplicates
+            the streamed rows may contain
+        """
+
+        index = PackageManager.installed_index()
+
+        if index.available():
+            streamed = False
+
+            def on_scanned(distributions):
+                nonlocal streamed
+                streamed = True
+                on_rows([(dist.name, dist.version) for dist in distributions])
+
+            with span("index:installed_packages", streamed=True) as timing:
+                packages = index.packages(on_scanned)
+                timing.set(rows=len(packages))
+
+            if not streamed:
+                on_rows(packages)
+
+            return packages
+
+        cmd = PackageManager.uv_pip("list", "--format=json")
+
+        return PackageManager._stream_uv_list(
+            cmd,
+            lambda pkg: (pkg["name"], pkg["version"]),
+            on_rows,
+            "stream:pip_list",
+        )
+
+    @staticmethod
+    def stream_outdated_packages(
+        on_rows: Callable[[list[tuple[str, str, str, str]]], None],
+    ) -> list[tuple[str, str, str, str]]:
+        """
+        get_outdated_packages(), handing the rows to on_rows as they are found.
+
+        Only uv's output arrives over time, the index client compares the
+        whole environment at once and its result is emitted in one go.
+        """
+
+        from pkgr.core.index_client import IndexUnavailableError
+
+        index = PackageManager.installed_index()
+
+        if index.available():
+            try:
+                packages = PackageManager._outdated_from_index(index.packages())
+                on_rows(packages)
+                return packages
+            except IndexUnavailableError as e:
+                logger.error(f"Index client failed, falling back to uv: {e}")
+
+        cmd = PackageManager.uv_pip("list", "--outdated", "--format=json")
+
+        return PackageManager._stream_uv_list(
+            cmd,
+            lambda pkg: (
+                pkg["name"],
+                pkg["version"],
+                pkg["latest_version"],
+                update_kind(pkg["version"], pkg["latest_version"]),
+            ),
+            on_rows,
+            "stream:pip_list_outdated",
+        )
+
+    @staticmethod
+    def _stream_uv_list(
+        cmd: list[str],
+        to_row: Callable[[dict], tuple],
+        on_rows: Callable[[list], None],
+        label: str,
+    ) -> list[tuple]:
+        """
+        Run a `uv pip list --format=json` command, parsing its output
+        incrementally and emitting the rows of every parsed piece.
+
+        uv writes the whole array on one line, so the parser is fed the
+        output as it is read rather than line by line.
+        """
+
+        parser = JsonArrayParser()
+        packages: list[tuple] = []
+        errors: list[Exception] = []
+
+        def collect(text: str):
+            if errors:
+                return
+
+            try:
+                rows = [to_row(pkg) for pkg in parser.feed(text)]
+            except (ValueError, KeyError, TypeError) as e:
+                errors.append(e)
+                return
+
+            if rows:
+                packages.extend(rows)
+                on_rows(rows)
+
+        with span(label) as timing:
+            success, _, stderr = PackageManager.run_pip_command(
+                cmd, on_chunk=collect, streams=("stdout",)
+            )
+            timing.set(rows=len(packages))
+
+        if not success:
+            logger.error(f"Error listing packages: {stderr}")
+            return []
+
+        try:
+            if errors:
+                raise errors[0]
+            parser.close()
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error parsing package list: {e}")
+            return []
+
+        return packages
+
+    @staticmethod
+    def _outdated_from_index(
+        installed: list[tuple[str, str]],
+    ) -> list[tuple[str, str, str, str]]:
+        """Compare installed versions with the index using the IndexClient."""
+
+        from pkgr.core.index_client import IndexClient
+
+        with span("index:get_many", projects=len(installed)):
+            projects = IndexClient.default().get_many([name for name, _ in installed])
+
+        with span("parse:compare_versions", rows=len(installed)):
+            return [tuple(candidate) for candidate in compare_all(installed, projects)]
+
+    @staticmethod
+    def install_package(package_name: str, on_output=None) -> tuple[bool, str]:
         """
         Install a new package.
 
         Args:
             package_name: Name of the package to install
+            on_output: Optional callback receiving uv output lines as they arrive
 
         Returns:
             bool: True if successful, False otherwise
         """
 
-        cmd = ["uv", "pip", "install", package_name]
-
-        success, stdout, stderr = PackageManager.run_pip_command(cmd)
+        success, stdout, stderr = PackageManager._run_install(
+            PackageManager.run_pip_command,
+            *PackageManager._install_commands([package_name]),
+            on_output=on_output,
+        )
 
         if success and stdout:
             return True, stdout
@@ -156,20 +506,23 @@ class PackageManager:
             return False, stderr
 
     @staticmethod
-    def uninstall_package(package_name) -> tuple[bool, str]:
+    def uninstall_package(package_name, on_output=None) -> tuple[bool, str]:
         """
         Uninstall a package.
 
         Args:
             package_name: Name of the package to uninstall
+            on_output: Optional callback receiving uv output lines as they arrive
 
         Returns:
             bool: True if successful, False otherwise
         """
 
-        cmd = ["uv", "pip", "uninstall", package_name, "--yes"]
+        cmd = PackageManager.uv_pip("uninstall", package_name, "--yes")
 
-        success, stdout, stderr = PackageManager.run_pip_command(cmd)
+        success, stdout, stderr = PackageManager.run_pip_command(
+            cmd, on_output=on_output
+        )
 
         if success:
             return True, stdout
@@ -178,12 +531,13 @@ class PackageManager:
             return False, stderr
 
     @staticmethod
-    def upgrade_package(package_name) -> tuple[bool, str]:
+    def upgrade_package(package_name, on_output=None) -> tuple[bool, str]:
         """
         Update a package
 
         Args:
             package_name:Name of the package to update
+            on_output: Optional callback receiving uv output lines as they arrive
 
 
 
@@ -194,20 +548,593 @@ class PackageManager:
 
         """
 
-        cmd_upgrade = [
-            "uv",
-            "pip",
-            "install",
-            "--upgrade",
-            package_name,
-        ]
-
-        success, stdout, stderr = PackageManager.run_pip_command(cmd_upgrade)
+        success, stdout, stderr = PackageManager._run_install(
+            PackageManager.run_pip_command,
+            *PackageManager._install_commands([package_name], upgrade=True),
+            on_output=on_output,
+        )
         if success:
             return True, stdout
         else:
             return False, stderr
 
+    @staticmethod
+    def _plan_key(
+        package_names: list[str],
+        requirements_file: Optional[str] = None,
+        upgrade: bool = False,
+    ) -> Optional[tuple]:
+        """
+        Memo key of a resolution: the requirement set, the installed-state
+        fingerprint and the index. None when the installed state is unknown.
+        """
+
+        from pkgr.core.index_client import default_index_url
+
+        index = PackageManager.installed_index()
+
+        if not index.available():
+            return None
+
+        try:
+            source = file_fingerprint(requirements_file) if requirements_file else None
+        except OSError:
+            return None
+
+        index.refresh()
+        prefix, _ = PackageManager.current_environment()
+
+        return (
+            prefix,
+            tuple(sorted(package_names)),
+            source,
+            upgrade,
+            installed_fingerprint(index.snapshot()),
+            default_index_url(),
+        )
+
+    @staticmethod
+    def _wheelhouse_args() -> tuple[list[str], list[str]]:
+        """
+        uv options pointing at the wheelhouse: (--find-links, the same
+        without the index and the network), two empty lists while it is empty.
+        """
+
+        from pkgr.core.wheelhouse import Wheelhouse
+
+        wheelhouse = Wheelhouse.default()
+
+        if not wheelhouse.usage()[0]:
+            return [], []
+
+        find_links = ["--find-links", str(wheelhouse.links_dir)]
+
+        return find_links, ["--offline", "--no-index", *find_links]
+
+    @staticmethod
+    def _install_commands(
+        package_names: list[str],
+        requirements_file: Optional[str] = None,
+        upgrade: bool = False,
+    ) -> tuple[Optional[list[str]], list[str]]:
+        """
+        The uv install commands, replaying a memoized plan if there is one.
+
+        Returns:
+            (command installing from the wheelhouse only, None when it does not
+             hold the requested packages; command that may use the index)
+        """
+
+        from pkgr.core.snapshots import Snapshot
+        from pkgr.core.wheelhouse import Wheelhouse
+
+        wheelhouse = Wheelhouse.default()
+        find_links, local = PackageManager._wheelhouse_args()
+
+        plan = None
+        # the plan of a path, URL or option install only serves the preview
+        if replayable(package_names, requirements_file):
+            key = PackageManager._plan_key(package_names, requirements_file, upgrade)
+            plan = PlanCache.default().get(key) if key is not None else None
+
+        # uv only removes packages it replaces, a plan removing others is
+        # resolved again to be safe
+        if plan and not plan.removed:
+            logger.info(f"Installing the planned versions: {plan.describe()}")
+            pins = plan.pins()
+
+            offline = None
+            planned = dict(pin.split("==", 1) for pin in pins)
+            if local and wheelhouse.has_all(planned.items()):
+                wheelhouse.touch(planned, planned)
+                offline = PackageManager.uv_pip("install", "--no-deps", *local, *pins)
+
+            return offline, PackageManager.uv_pip(
+                "install", "--no-deps", *find_links, *pins
+            )
+
+        args = []
+
+        if upgrade:
+            args.append("--upgrade")
+
+        args.extend(package_names)
+
+        if requirements_file:
+            args.extend(["-r", requirements_file])
+
+        offline = None
+        # an upgrade wants the latest version, only the index knows it
+        if local and not upgrade:
+            names = [requirement_name(name) or name for name in package_names]
+            pins: Optional[list[tuple[str, str]]] = []
+
+            if requirements_file:
+                try:
+                    pins = list(Snapshot.load(requirements_file).packages.values())
+                except (OSError, ValueError):
+                    # not a lock file, its requirements may need the index
+                    pins = None
+
+            if (
+                pins is not None
+                and wheelhouse.has_projects(names)
+                and wheelhouse.has_all(pins)
+            ):
+                wheelhouse.touch([*names, *(name for name, _ in pins)], dict(pins))
+                offline = PackageManager.uv_pip("install", *local, *args)
+
+        return offline, PackageManager.uv_pip("install", *find_links, *args)
+
+    @staticmethod
+    def _run_install(
+        run: Callable[..., tuple],
+        offline: Optional[list[str]],
+        online: list[str],
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> tuple:
+        """
+        Run an install from the wheelhouse, falling back to the index.
+
+        Args:
+            run: run_pip_command or _run_collecting_changes
+            offline: Command using the wheelhouse only, or None
+            online: Command that may use the index
+
+        Returns:
+            What run returned for the command that was used
+        """
+
+        if offline is not None:
+            result = run(offline, on_output=on_output)
+            if result[0]:
+                return result
+
+            logger.info("The wheelhouse can not satisfy the install, using the index")
+
+        return run(online, on_output=on_output)
+
+    @staticmethod
+    def preview_install(
+        package_names: list[str],
+        requirements_file: Optional[str] = None,
+        upgrade: bool = False,
+    ) -> tuple[bool, str, Optional[ResolutionPlan]]:
+        """
+        Resolve an install without touching the environment (uv --dry-run).
+
+        The plan is memoized, so previewing the same request again, or
+        installing it afterwards, does not resolve it a second time as long
+        as the installed packages did not change.
+
+        Args:
+            package_names: Names (or requirement specifiers) to install
+            requirements_file: Optional requirements file to install from
+            upgrade: Upgrade the packages if they are already installed
+
+        Returns:
+            (success, uv output, ResolutionPlan or None on failure)
+        """
+
+        key = PackageManager._plan_key(package_names, requirements_file, upgrade)
+
+        if key is not None:
+            plan = PlanCache.default().get(key)
+            if plan is not None:
+                return True, "", plan
+
+        args = ["install", "--dry-run"]
+
+        if upgrade:
+            args.append("--upgrade")
+
+        args.extend(package_names)
+
+        if requirements_file:
+            args.extend(["-r", requirements_file])
+
+        success, stdout, stderr = PackageManager.run_pip_command(
+            PackageManager.uv_pip(*args)
+        )
+        output = "\n".join(part for part in (stdout, stderr) if part)
+
+        if not success:
+            logger.error(f"Error resolving {', '.join(package_names)}: {output}")
+            return False, output, None
+
+        plan = plan_from_changes(
+            tuple(package_names), upgrade, PackageManager.parse_uv_changes(output)
+        )
+
+        if key is not None:
+            PlanCache.default().put(key, plan)
+
+        return True, output, plan
+
+    @staticmethod
+    def parse_uv_changes(output: str) -> dict[str, dict[str, str]]:
+        """
+        Parse the ' + name==version' / ' - name==version' lines uv prints
+        after changing an environment.
+
+        Args:
+            output: Combined stdout and stderr of a uv pip command
+
+        Returns:
+            dict: {"added": {name: version}, "removed": {name: version}}
+                  keyed by normalized package name
+        """
+
+        changes = {"added": {}, "removed": {}}
+
+        with span("parse:uv_changes", output_bytes=len(output)):
+            for line in output.splitlines():
+                match = re.match(
+                    r"^\s*([-+~])\s+([A-Za-z0-9][A-Za-z0-9._-]*)==(\S+)", line
+                )
+                if not match:
+                    continue
+
+                sign, name, version = match.groups()
+                key = normalize_name(name)
+
+                if sign in "+~":
+                    changes["added"][key] = version
+                if sign in "-~":
+                    changes["removed"].setdefault(key, version)
+
+        return changes
+
+    @staticmethod
+    def summarize_batch(
+        package_names: list[str], changes: dict[str, dict[str, str]], operation: str
+    ) -> dict[str, str]:
+        """
+        Turn parsed uv changes into a result line for each requested package.
+
+        Returns:
+            dict: {package_name: result}
+        """
+
+        results = {}
+
+        for package_name in package_names:
+            key = normalize_name(requirement_name(package_name) or package_name)
+            added = changes["added"].get(key)
+            removed = changes["removed"].get(key)
+
+            if operation == "uninstall":
+                results[package_name] = (
+                    f"uninstalled {removed}" if removed else "not installed"
+                )
+            elif added and added == removed:
+                results[package_name] = f"reinstalled {added}"
+            elif added and removed:
+                results[package_name] = f"updated {removed} -> {added}"
+            elif added:
+                results[package_name] = f"installed {added}"
+            else:
+                results[package_name] = "unchanged"
+
+        return results
+
+    @staticmethod
+    def _run_collecting_changes(
+        cmd: list[str], on_output: Optional[Callable[[str], None]] = None
+    ) -> tuple[bool, str, dict[str, dict[str, str]]]:
+        """
+        Stream a uv command, keeping every +/- change line even when the
+        returned output is only the tail of what uv printed.
+
+        Returns:
+            (success, output tail, parsed changes)
+        """
+
+        change_lines = []
+
+        def collect(line: str):
+            if re.match(r"^\s*[-+~]\s", line):
+                change_lines.append(line)
+            if on_output is not None:
+                on_output(line)
+
+        success, stdout, stderr = PackageManager.run_pip_command(
+            cmd, on_output=collect
+        )
+        output = "\n".join(part for part in (stdout, stderr) if part)
+
+        return success, output, PackageManager.parse_uv_changes("\n".join(change_lines))
+
+    @staticmethod
+    def install_packages(
+        package_names: list[str],
+        requirements_file: Optional[str] = None,
+        upgrade: bool = False,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> tuple[bool, str, dict[str, str]]:
+        """
+        Install several packages with a single resolver run.
+
+        Args:
+            package_names: Names (or requirement specifiers) to install
+            requirements_file: Optional requirements file to install from
+            upgrade: Upgrade the packages if they are already installed
+            on_output: Optional callback receiving uv output lines as they arrive
+
+        Returns:
+            (success, output, {package_name: result})
+        """
+
+        commands = PackageManager._install_commands(
+            package_names, requirements_file, upgrade
+        )
+
+        success, output, changes = PackageManager._run_install(
+            PackageManager._run_collecting_changes, *commands, on_output=on_output
+        )
+
+        if not success:
+            logger.error(f"Error installing {', '.join(package_names)}: {output}")
+            return False, output, {}
+        requested = list(package_names)
+
+        if requirements_file:
+            # everything uv added on behalf of the requirements file
+            requested.extend(
+                name for name in changes["added"] if name not in requested
+            )
+
+        operation = "upgrade" if upgrade else "install"
+        return True, output, PackageManager.summarize_batch(requested, changes, operation)
+
+    @staticmethod
+    def uninstall_packages(
+        package_names: list[str], on_output: Optional[Callable[[str], None]] = None
+    ) -> tuple[bool, str, dict[str, str]]:
+        """
+        Uninstall several packages with a single uv invocation.
+
+        Args:
+            package_names: Names of the packages to uninstall
+            on_output: Optional callback receiving uv output lines as they arrive
+
+        Returns:
+            (success, output, {package_name: result})
+        """
+
+        cmd = PackageManager.uv_pip("uninstall", *package_names, "--yes")
+
+        success, output, changes = PackageManager._run_collecting_changes(
+            cmd, on_output
+        )
+
+        if not success:
+            logger.error(f"Error uninstalling {', '.join(package_names)}: {output}")
+            return False, output, {}
+
+        return True, output, PackageManager.summarize_batch(
+            package_names, changes, "uninstall"
+        )
+
+    @staticmethod
+    def snapshot_environment() -> "Snapshot":
+        """Pin every package installed in the targeted environment."""
+
+        from pkgr.core.snapshots import Snapshot
+
+        prefix, _ = PackageManager.current_environment()
+
+        return Snapshot.from_packages(PackageManager.get_installed_packages(), prefix)
+
+    @staticmethod
+    def sync_environment(
+        lock_file: str, on_output: Optional[Callable[[str], None]] = None
+    ) -> tuple[bool, str, dict[str, dict[str, str]]]:
+        """
+        Make the environment match a lock file with a single `uv pip sync`.
+
+        Packages missing from the lock file are removed and every other one
+        is installed at its pinned version, in one resolver run. When the
+        wheelhouse holds every pinned wheel the index is not used.
+
+        Args:
+            lock_file: Snapshot written by Snapshot.save() or any pinned
+                       requirements file
+            on_output: Optional callback receiving uv output lines as they arrive
+
+        Returns:
+            (success, output, parsed changes as returned by parse_uv_changes)
+        """
+
+        from pkgr.core.snapshots import Snapshot
+        from pkgr.core.wheelhouse import Wheelhouse
+
+        find_links, local = PackageManager._wheelhouse_args()
+
+        offline = None
+        if local:
+            try:
+                pins = list(Snapshot.load(lock_file).packages.values())
+            except (OSError, ValueError):
+                pins = None
+
+            wheelhouse = Wheelhouse.default()
+            if pins is not None and wheelhouse.has_all(pins):
+                wheelhouse.touch([name for name, _ in pins], dict(pins))
+                offline = PackageManager.uv_pip("sync", *local, lock_file)
+
+        success, output, changes = PackageManager._run_install(
+            PackageManager._run_collecting_changes,
+            offline,
+            PackageManager.uv_pip("sync", *find_links, lock_file),
+            on_output=on_output,
+        )
+
+        if not success:
+            logger.error(f"Error syncing with {lock_file}: {output}")
+
+        return success, output, changes
+
+    @staticmethod
+    def populate_wheelhouse(
+        lock_file: Optional[str] = None,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> tuple[bool, str, list["WheelEntry"]]:
+        """
+        Put a wheel of every pinned package into the wheelhouse.
+
+        Wheels already stored are skipped. The others are fetched, or built
+        from source distributions, by `pip wheel` run through `uv tool run`
+        with the interpreter of the targeted environment, so they match
+        its platform tags.
+
+        Args:
+            lock_file: Lock file to read the pins from, the installed
+                       packages of the targeted environment when None
+            on_output: Optional callback receiving pip output lines as they arrive
+
+        Returns:
+            (success, message, entries added to the wheelhouse)
+        """
+
+        from pkgr.core.snapshots import Snapshot
+        from pkgr.core.wheelhouse import Wheelhouse
+
+        try:
+            if lock_file:
+                snapshot = Snapshot.load(lock_file)
+            else:
+                snapshot = PackageManager.snapshot_environment()
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading {lock_file}: {e}")
+            return False, str(e), []
+
+        wheelhouse = Wheelhouse.default()
+        stored = wheelhouse.versions()
+
+        missing = [
+            f"{name}=={version}"
+            for key, (name, version) in sorted(snapshot.packages.items())
+            if (key, version) not in stored
+        ]
+
+        wheelhouse.touch(
+            [name for name, _ in snapshot.packages.values()],
+            dict(snapshot.packages.values()),
+        )
+
+        if not missing:
+            return True, "Every package is already in the wheelhouse", []
+
+        with tempfile.TemporaryDirectory(prefix="pkgr-wheelhouse-") as workdir:
+            wheel_dir = os.path.join(workdir, "wheels")
+            os.mkdir(wheel_dir)
+
+            with span("wheelhouse:build", requirements=len(missing)) as timing:
+                failed = PackageManager._build_wheels(
+                    missing, workdir, wheel_dir, on_output
+                )
+                added = wheelhouse.add_directory(wheel_dir)
+                timing.set(added=len(added), failed=len(failed))
+
+        message = f"Added {len(added)} wheels to the wheelhouse"
+        if failed:
+            message += f", no wheel for {', '.join(failed)}"
+            logger.error(f"Error building wheels: {', '.join(failed)}")
+
+        return bool(added) or not failed, message, added
+
+    @staticmethod
+    def _build_wheels(
+        requirements: list[str],
+        workdir: str,
+        wheel_dir: str,
+        on_output: Optional[Callable[[str], None]] = None,
+    ) -> list[str]:
+        """
+        Write wheels of pinned requirements to wheel_dir with `pip wheel`.
+
+        Returns:
+            The requirements no wheel could be made for
+        """
+
+        from pkgr.core.index_client import default_index_url
+        from pkgr.core.wheelhouse import parse_wheel_filename
+
+        _, python = PackageManager.current_environment()
+        if python is None:
+            prefix = default_environment_prefix()
+            python = python_executable(prefix) if prefix else None
+
+        cmd = ["uv", "tool", "run"]
+        if python:
+            cmd.extend(["--python", python])
+        cmd.extend(
+            [
+                "--from",
+                "pip",
+                "pip",
+                "wheel",
+                "--no-deps",
+                "--wheel-dir",
+                wheel_dir,
+                "--index-url",
+                default_index_url(),
+            ]
+        )
+
+        requirements_file = os.path.join(workdir, "requirements.txt")
+        with open(requirements_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(requirements) + "\n")
+
+        success, _, _ = PackageManager.run_pip_command(
+            [*cmd, "-r", requirements_file], on_output=on_output
+        )
+        if success:
+            return []
+
+        # pip stops at the first requirement it can not get (a package that
+        # is not on the index), get the others one at a time
+        built = set()
+        for filename in os.listdir(wheel_dir):
+            parsed = parse_wheel_filename(filename)
+            if parsed is not None:
+                built.add(parsed)
+
+        failed = []
+        for requirement in requirements:
+            name, _, version = requirement.partition("==")
+            if (normalize_name(name), version) in built:
+                continue
+
+            success, _, _ = PackageManager.run_pip_command(
+                [*cmd, requirement], on_output=on_output
+            )
+            if not success:
+                failed.append(requirement)
+
+        return failed
+
     @staticmethod
     def get_packages_details(package_name) -> Dict:
         """
@@ -223,7 +1150,22 @@ class PackageManager:
 
 
         """
-        cmd = ["uv", "pip", "show", package_name]
+
+        index = PackageManager.installed_index()
+
+        if index.available():
+            try:
+                with span("store:details"):
+                    store = MetadataStore.default()
+                    store.sync_index(index)
+                    details = store.details(package_name, index.site_dirs)
+                if details:
+                    return details
+            except sqlite3.Error as e:
+                logger.error(f"Metadata store error: {e}")
+
+        # fall back to uv when the package is not in the metadata store
+        cmd = PackageManager.uv_pip("show", package_name)
 
         success, stdout, stderr = PackageManager.run_pip_command(cmd)
         details = {}
@@ -233,9 +1175,10 @@ class PackageManager:
             return details
 
         try:
-            for line in stdout.splitlines():
-                key, value = line.split(":", 1)
-                details[key] = value
+            with span("parse:pip_show", output_bytes=len(stdout)):
+                for line in stdout.splitlines():
+                    key, value = line.split(":", 1)
+                    details[key] = value
 
             return details
         except ValueError as e:
@@ -245,17 +1188,161 @@ class PackageManager:
             logger.error(f"Error parsing package details:{e}")
             return details
 
+    @staticmethod
+    def get_package_summaries() -> dict[str, str]:
+        """
+        Summaries of the installed packages from the metadata store.
+
+        Returns:
+            dict: {normalized package name: summary}, empty if unavailable
+        """
+
+        index = PackageManager.installed_index()
+
+        if not index.available():
+            return {}
+
+        try:
+            with span("store:summaries"):
+                store = MetadataStore.default()
+                store.sync_index(index)
+                return store.summaries(index.site_dirs)
+        except sqlite3.Error as e:
+            logger.error(f"Metadata store error: {e}")
+            return {}
+
+    @staticmethod
+    def get_package_sizes() -> dict[str, int]:
+        """
+        Disk usage of the installed packages from the metadata store.
+
+        Returns:
+            dict: {normalized package name: size in bytes}, empty if unavailable
+        """
+
+        index = PackageManager.installed_index()
+
+        if not index.available():
+            return {}
+
+        try:
+            with span("store:sizes"):
+                store = MetadataStore.default()
+                store.sync_index(index)
+                return store.sizes(index.site_dirs)
+        except sqlite3.Error as e:
+            logger.error(f"Metadata store error: {e}")
+            return {}
+
+    @staticmethod
+    def get_disk_usage(
+        limit: Optional[int] = None,
+    ) -> tuple[list[tuple[str, str, int]], tuple[int, int, int]]:
+        """
+        The heaviest installed packages and the totals of the environment.
+
+        Args:
+            limit: Only return the limit largest packages (all if None)
+
+        Returns:
+            ([(package_name, version, size)] largest first,
+             (packages, files, bytes) of the whole environment)
+        """
+
+        index = PackageManager.installed_index()
+
+        if not index.available():
+            return [], (0, 0, 0)
+
+        try:
+            with span("store:disk_usage"):
+                store = MetadataStore.default()
+                store.sync_index(index)
+                return (
+                    store.by_size(limit, index.site_dirs),
+                    store.totals(index.site_dirs),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Metadata store error: {e}")
+            return [], (0, 0, 0)
+
+    @staticmethod
+    def get_dependency_graph() -> Optional["DependencyGraph"]:
+        """
+        Dependency graph of the targeted environment.
+
+        Returns:
+            DependencyGraph, or None if the environment can not be scanned
+        """
+
+        index = PackageManager.installed_index()
+
+        if not index.available():
+            return None
+
+        from pkgr.core.dependency_graph import DependencyGraph
+
+        try:
+            with span("graph:refresh"):
+                return DependencyGraph.for_index(
+                    index,
+                    MetadataStore.default(),
+                    PackageManager.current_environment()[1],
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Metadata store error: {e}")
+            return None
+
     @staticmethod
     def check_package_version(package_name) -> tuple[bool, str]:
+        """
+        Check whether a newer version of an installed package exists.
+
+        Args:
+            package_name: Name of the package to check
+
+        Returns:
+            (True, latest_version) if an upgrade is available, (False, "") otherwise
+        """
+
+        from pkgr.core.index_client import IndexClient, IndexUnavailableError
+
+        index = PackageManager.installed_index()
+        installed_version = index.version(package_name) if index.available() else None
+
+        if installed_version is not None:
+            try:
+                with span("index:get_project"):
+                    project = IndexClient.default().get_project(package_name)
+
+                if project is None:
+                    return False, f"{package_name} was not found on the index"
+
+                candidates = compare_all(
+                    [(package_name, installed_version)], {package_name: project}
+                )
+
+                if candidates:
+                    return True, candidates[0].latest
+                return False, ""
+
+            except IndexUnavailableError as e:
+                logger.error(f"Index client failed, falling back to pip: {e}")
+
         cmd_version = ["pip", "index", "versions", package_name]
 
+        _, python = PackageManager.current_environment()
+        if python:
+            cmd_version = [python, "-m", *cmd_version]
+
         # check if the latest version is already installed
 
         success_, stdout, stderr = PackageManager.run_pip_command(cmd_version)
 
         if success_:
-            installed_match = re.search(r"INSTALLED:\s*(\d+\.\d+\.\d+)", stdout)
-            latest_match = re.search(r"LATEST:\s*(\d+\.\d+\.\d+)", stdout)
+            with span("parse:index_versions", output_bytes=len(stdout)):
+                installed_match = re.search(r"INSTALLED:\s*(\S+)", stdout)
+                latest_match = re.search(r"LATEST:\s*(\S+)", stdout)
 
             if not installed_match or not latest_match:
                 logger.error("Could not parse version information from pip output")
@@ -264,8 +1351,8 @@ class PackageManager:
             installed_version = installed_match.group(1)
             latest_version = latest_match.group(1)
 
-            if installed_version != latest_version:
-                return True, ""
+            if needs_upgrade(installed_version, latest_version):
+                return True, latest_version
             else:
                 return False, ""
 
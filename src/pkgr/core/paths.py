@@ -0,0 +1,90 @@
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = "pkgr"
+
+
+def user_cache_dir() -> Path:
+    """
+    Per-user cache directory for pkgr, created on first use.
+
+    Honours PKGR_CACHE_DIR, then the platform convention
+    (%LOCALAPPDATA% on Windows, ~/Library/Caches on macOS and
+    $XDG_CACHE_HOME or ~/.cache elsewhere).
+
+    Returns:
+        Path: the cache directory
+    """
+
+    override = os.environ.get("PKGR_CACHE_DIR")
+
+    if override:
+        path = Path(override)
+    elif sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        path = Path(base) / APP_NAME / "Cache"
+    elif sys.platform == "darwin":
+        path = Path.home() / "Library" / "Caches" / APP_NAME
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        path = Path(base) / APP_NAME
+
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+def user_config_dir() -> Path:
+    """
+    Per-user configuration directory for pkgr (not created automatically).
+
+    Honours PKGR_CONFIG_DIR, then %APPDATA% on Windows,
+    ~/Library/Application Support on macOS and $XDG_CONFIG_HOME or
+    ~/.config elsewhere.
+
+    Returns:
+        Path: the configuration directory
+    """
+
+    override = os.environ.get("PKGR_CONFIG_DIR")
+
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming"
+        return Path(base) / APP_NAME
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Application Support" / APP_NAME
+
+    base = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(base) / APP_NAME
+
+
+def user_log_dir() -> Path:
+    """
+    Per-user log directory for pkgr, created on first use.
+
+    Honours PKGR_LOG_DIR, then %LOCALAPPDATA% on Windows, ~/Library/Logs
+    on macOS and $XDG_STATE_HOME or ~/.local/state elsewhere.
+
+    Returns:
+        Path: the log directory
+    """
+
+    override = os.environ.get("PKGR_LOG_DIR")
+
+    if override:
+        path = Path(override)
+    elif sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        path = Path(base) / APP_NAME / "Logs"
+    elif sys.platform == "darwin":
+        path = Path.home() / "Library" / "Logs" / APP_NAME
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+        path = Path(base) / APP_NAME / "log"
+
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
@@ -0,0 +1,170 @@
+import time
+import functools
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchResult(NamedTuple):
+    value: Any
+    fetched_at: float
+    error: str = ""
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def describe_age(seconds: float) -> str:
+    """Short freshness text such as 'just now' or '3 min ago'."""
+
+    if seconds < 5:
+        return "just now"
+    if seconds < 60:
+        return f"{int(seconds)} s ago"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+
+    return f"{int(seconds // 3600)} h ago"
+
+
+class Prefetcher:
+    """
+    Runs queries on a small background pool and keeps their latest results.
+
+    Starting a query that is already running is a no-op, so the UI can
+    ask for a warm result as often as it likes without piling up work.
+    Invalidating a key discards the result of a query still in flight.
+    Streaming queries also expose the rows they produced so far.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pkgr-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._results: dict[Hashable, PrefetchResult] = {}
+        self._running: dict[Hashable, concurrent.futures.Future] = {}
+        self._epochs: dict[Hashable, int] = {}
+        # rows emitted by streaming queries that are still running
+        self._partial: dict[Hashable, list] = {}
+
+    def start(
+        self, key: Hashable, fetch: Callable[..., Any], stream: bool = False
+    ) -> concurrent.futures.Future:
+        """
+        Run fetch in the background and store its result under key.
+
+        Args:
+            key: Identifies the query, e.g. ("installed", environment prefix)
+            fetch: Function returning the value to keep
+            stream: fetch takes an emit(rows) argument, rows it emits can be
+                    read with partial() until the query finishes
+
+        Returns:
+            Future of the running query
+        """
+
+        with self._lock:
+            future = self._running.get(key)
+            if future is not None:
+                return future
+
+            epoch = self._epochs.get(key, 0)
+            if stream:
+                self._partial[key] = []
+                emit = functools.partial(self._emit, key, epoch)
+                fetch = functools.partial(fetch, emit)
+
+            future = self._executor.submit(self._run, key, fetch, epoch)
+            self._running[key] = future
+
+            return future
+
+    def _run(self, key: Hashable, fetch: Callable[[], Any], epoch: int):
+        try:
+            result = PrefetchResult(fetch(), time.time())
+        except Exception as e:
+            logger.error(f"Prefetch of {key} failed: {e}")
+            result = PrefetchResult(None, time.time(), str(e))
+
+        with self._lock:
+            if self._epochs.get(key, 0) == epoch:
+                self._results[key] = result
+                self._running.pop(key, None)
+                self._partial.pop(key, None)
+
+        return result
+
+    def _emit(self, key: Hashable, epoch: int, rows: list):
+        with self._lock:
+            partial = self._partial.get(key)
+            if partial is not None and self._epochs.get(key, 0) == epoch:
+                partial.extend(rows)
+
+    def partial(
+        self, key: Hashable, start: int = 0, generation: Optional[int] = None
+    ) -> tuple[int, list]:
+        """
+        Rows a streaming query for key emitted so far.
+
+        Args:
+            start: Skip the rows already taken, e.g. len() of earlier calls
+            generation: Generation the rows already taken belong to, start
+                        is ignored if the query was restarted since
+
+        Returns:
+            (generation, rows): the generation of the current query and its
+            new rows, no rows once the query finished
+        """
+
+        with self._lock:
+            current = self._epochs.get(key, 0)
+            if generation is not None and generation != current:
+                start = 0
+
+            return current, self._partial.get(key, [])[start:]
+
+    def get(self, key: Hashable) -> Optional[PrefetchResult]:
+        """The latest finished result for key, None if there is none yet."""
+
+        with self._lock:
+            return self._results.get(key)
+
+    def update(self, key: Hashable, transform: Callable[[Any], Any]) -> bool:
+        """
+        Replace a stored result with transform(value), keeping its age.
+
+        Returns:
+            bool: False if there was no successful result to update
+        """
+
+        with self._lock:
+            result = self._results.get(key)
+            if result is None or result.error:
+                return False
+
+            self._results[key] = result._replace(value=transform(result.value))
+
+            return True
+
+    def is_running(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._running
+
+    def invalidate(self, *keys: Hashable):
+        """Forget the results for keys (every key if none are given)."""
+
+        with self._lock:
+            if not keys:
+                keys = tuple(set(self._results) | set(self._running))
+
+            for key in keys:
+                self._results.pop(key, None)
+                # a query still running was started before the change
+                self._running.pop(key, None)
+                self._partial.pop(key, None)
+                self._epochs[key] = self._epochs.get(key, 0) + 1
@@ -0,0 +1,121 @@
+import re
+from collections import deque
+from typing import Optional
+
+
+_SUMMARY_RE = re.compile(
+    r"^(Resolved|Prepared|Installed|Uninstalled|Audited|Built)\s+(\d+)\s+packages?"
+)
+_DOWNLOADING_RE = re.compile(r"^Downloading\s+(\S+)(?:\s+\(([^)]+)\))?")
+_DOWNLOADED_RE = re.compile(r"^Downloaded\s+(\S+)")
+_BUILDING_RE = re.compile(r"^Building\s+(\S+)")
+_CHANGE_RE = re.compile(r"^\s*([-+~])\s+\S+==\S+")
+
+
+class UvProgress:
+    """
+    Incremental parser for the progress lines uv prints while it works.
+
+    Feed it output lines as they arrive; it keeps the counts uv reported
+    (resolved, prepared, installed, ...) plus the package currently being
+    downloaded or built, and only the last `tail_size` lines of output.
+    """
+
+    def __init__(self, tail_size: int = 200):
+        self.counts: dict[str, int] = {}
+        self.downloading: dict[str, str] = {}
+        self.downloaded = 0
+        self.building: Optional[str] = None
+        self.changes = 0
+        self.tail: deque[str] = deque(maxlen=tail_size)
+
+    def feed(self, line: str) -> bool:
+        """
+        Parse one output line.
+
+        Args:
+            line: A single line of uv output
+
+        Returns:
+            bool: True if the line changed the progress state
+        """
+
+        line = line.rstrip()
+        if not line:
+            return False
+
+        self.tail.append(line)
+        text = line.strip()
+
+        match = _SUMMARY_RE.match(text)
+        if match:
+            self.counts[match.group(1).lower()] = int(match.group(2))
+            self.building = None
+            return True
+
+        match = _DOWNLOADING_RE.match(text)
+        if match:
+            self.downloading[match.group(1)] = match.group(2) or ""
+            return True
+
+        match = _DOWNLOADED_RE.match(text)
+        if match:
+            self.downloading.pop(match.group(1), None)
+            self.downloaded += 1
+            return True
+
+        match = _BUILDING_RE.match(text)
+        if match:
+            self.building = match.group(1)
+            return True
+
+        if _CHANGE_RE.match(line):
+            self.changes += 1
+            return True
+
+        return False
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Rough overall completion between 0 and 1, None before resolution."""
+
+        if "installed" in self.counts or "uninstalled" in self.counts:
+            return 1.0
+        if "prepared" in self.counts:
+            return 0.9
+        if "resolved" not in self.counts:
+            return None
+
+        started = self.downloaded + len(self.downloading)
+        if not started:
+            return 0.1
+
+        return 0.1 + 0.8 * self.downloaded / started
+
+    def describe(self) -> str:
+        """Short one-line description of the current state for the status bar."""
+
+        if "uninstalled" in self.counts:
+            return f"Uninstalled {self.counts['uninstalled']} package(s)"
+        if "installed" in self.counts:
+            return f"Installed {self.counts['installed']} package(s)"
+        if self.building:
+            return f"Building {self.building}...."
+        if self.downloading:
+            name, size = next(reversed(self.downloading.items()))
+            size = f" ({size})" if size else ""
+            return (
+                f"Downloading {name}{size} "
+                f"[{self.downloaded}/{self.downloaded + len(self.downloading)}]"
+            )
+        if "prepared" in self.counts:
+            return f"Prepared {self.counts['prepared']} package(s), installing...."
+        if "resolved" in self.counts:
+            return f"Resolved {self.counts['resolved']} package(s), preparing...."
+
+        return "Resolving...."
+
+    def output(self) -> str:
+        """The retained tail of the output."""
+
+        return "\n".join(self.tail)
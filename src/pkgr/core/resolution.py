@@ -0,0 +1,199 @@
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+from pkgr.core.installed_index import InstalledDistribution
+
+# a plan is trusted this long, the index may publish new releases meanwhile
+PLAN_TTL = 10 * 60
+
+PLAN_CACHE_SIZE = 64
+
+# a name from the index with optional extras, version specifiers and markers;
+# no direct reference (name @ url), path or archive
+_PLAIN_REQUIREMENT_RE = re.compile(
+    r"^[A-Za-z0-9][A-Za-z0-9._-]*\s*(\[[A-Za-z0-9._,\s-]*\])?\s*"
+    r"([<>=!~][^;@/\\]*)?(;[^@]*)?$"
+)
+
+# a requirement naming a local archive looks like a plain name
+_ARCHIVE_SUFFIXES = (".whl", ".zip", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+class ResolutionPlan(NamedTuple):
+    """What a `uv pip install` would change, from a --dry-run."""
+
+    requirements: tuple[str, ...]
+    upgrade: bool
+    added: dict[str, str]  # {name: version} of new packages
+    removed: dict[str, str]  # {name: version} of packages uv would remove
+    changed: dict[str, tuple[str, str]]  # {name: (installed, planned)}
+    created_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def describe(self) -> str:
+        parts = []
+        if self.added:
+            parts.append(f"{len(self.added)} to install")
+        if self.changed:
+            parts.append(f"{len(self.changed)} to change")
+        if self.removed:
+            parts.append(f"{len(self.removed)} to remove")
+
+        return ", ".join(parts) or "nothing to do"
+
+    def lines(self) -> list[str]:
+        """One ' + name==version' style line per planned change."""
+
+        lines = [f" + {name}=={version}" for name, version in self.added.items()]
+        lines.extend(
+            f" ~ {name} {old} -> {new}" for name, (old, new) in self.changed.items()
+        )
+        lines.extend(f" - {name}=={version}" for name, version in self.removed.items())
+
+        return lines
+
+    def pins(self) -> list[str]:
+        """Exact requirements that reproduce the plan without resolving again."""
+
+        pins = [f"{name}=={version}" for name, version in self.added.items()]
+        pins.extend(f"{name}=={new}" for name, (_, new) in self.changed.items())
+
+        return pins
+
+
+def plan_from_changes(
+    requirements: tuple[str, ...], upgrade: bool, changes: dict[str, dict[str, str]]
+) -> ResolutionPlan:
+    """
+    Build a plan from PackageManager.parse_uv_changes() output.
+
+    A package both removed and added is a version change.
+    """
+
+    added = {}
+    changed = {}
+    for name, version in changes["added"].items():
+        old = changes["removed"].get(name)
+        if old is None:
+            added[name] = version
+        elif old != version:
+            changed[name] = (old, version)
+
+    removed = {
+        name: version
+        for name, version in changes["removed"].items()
+        if name not in changes["added"]
+    }
+
+    return ResolutionPlan(requirements, upgrade, added, removed, changed, time.time())
+
+
+def replayable(
+    requirements: list[str], requirements_file: Optional[str] = None
+) -> bool:
+    """
+    Whether installing a plan's pins reproduces the requested install.
+
+    Pins name index releases, so local paths, URLs, VCS and editable
+    requirements, or a requirements file with options (-e, --index-url,
+    --find-links, ...), have to be installed from the original request.
+    """
+
+    lines = list(requirements)
+
+    if requirements_file:
+        try:
+            with open(requirements_file, encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+        except (OSError, UnicodeDecodeError):
+            return False
+
+    for line in lines:
+        line = line.split(" #", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.endswith(_ARCHIVE_SUFFIXES) or not _PLAIN_REQUIREMENT_RE.match(line):
+            return False
+
+    return True
+
+
+def installed_fingerprint(snapshot: dict[str, InstalledDistribution]) -> str:
+    """Digest of the installed (name, version) pairs of an environment."""
+
+    digest = hashlib.sha1()
+    for key in sorted(snapshot):
+        digest.update(f"{key}=={snapshot[key].version}\n".encode())
+
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """Digest of a requirements file, so edits to it make new plans."""
+
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class PlanCache:
+    """
+    Memoized resolution plans.
+
+    Keys combine the requirement set, the installed-state fingerprint and
+    the index, so a plan is only reused while none of them changed, and
+    at most PLAN_TTL seconds.
+    """
+
+    _instance: Optional["PlanCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, ttl: float = PLAN_TTL, size: int = PLAN_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._plans: OrderedDict[Hashable, ResolutionPlan] = OrderedDict()
+
+    @classmethod
+    def default(cls) -> "PlanCache":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+
+            return cls._instance
+
+    def get(self, key: Hashable) -> Optional[ResolutionPlan]:
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                return None
+
+            if plan.age > self.ttl:
+                del self._plans[key]
+                return None
+
+            self._plans.move_to_end(key)
+
+            return plan
+
+    def put(self, key: Hashable, plan: ResolutionPlan):
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+
+            while len(self._plans) > self.size:
+                self._plans.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
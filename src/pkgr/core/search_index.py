@@ -0,0 +1,97 @@
+from typing import Optional
+
+from pkgr.core.installed_index import normalize_name
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Trigram index over package names and summaries for the package filter.
+
+    Names are matched in their PEP 503 normalized form, so the query
+    "typing_ext" finds "typing-extensions". Queries of three or more
+    characters are answered from the trigram postings; when a query
+    extends the previous one, only the previous results are re-checked.
+    """
+
+    def __init__(self, names: list[str], summaries: Optional[dict[str, str]] = None):
+        summaries = summaries or {}
+
+        self.names = [normalize_name(name) for name in names]
+        self.summaries = [summaries.get(name, "").lower() for name in self.names]
+
+        self._postings: dict[str, set[int]] = {}
+        for i, (name, summary) in enumerate(zip(self.names, self.summaries)):
+            for trigram in _trigrams(name) | _trigrams(summary):
+                self._postings.setdefault(trigram, set()).add(i)
+
+        self._last_query: Optional[str] = None
+        self._last_result: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _matches(self, i: int, name_query: str, text_query: str) -> bool:
+        return name_query in self.names[i] or text_query in self.summaries[i]
+
+    def search(self, query: str) -> list[int]:
+        """
+        Find the rows matching a query.
+
+        Args:
+            query: Text typed into the search box
+
+        Returns:
+            Indices of the matching rows, in their original order
+        """
+
+        text_query = query.strip().lower()
+        name_query = normalize_name(text_query)
+
+        if not text_query:
+            result = list(range(len(self.names)))
+
+        elif self._last_query and text_query.startswith(self._last_query):
+            # the query grew, so the answer is a subset of the last one
+            result = [
+                i for i in self._last_result if self._matches(i, name_query, text_query)
+            ]
+
+        else:
+            candidates: Optional[set[int]] = None
+
+            if len(name_query) >= 3 and len(text_query) >= 3:
+                name_hits = self._intersect(_trigrams(name_query))
+                text_hits = self._intersect(_trigrams(text_query))
+                candidates = name_hits | text_hits
+
+            if candidates is None:
+                rows = range(len(self.names))
+            else:
+                rows = sorted(candidates)
+
+            result = [i for i in rows if self._matches(i, name_query, text_query)]
+
+        self._last_query = text_query
+        self._last_result = result
+
+        return result
+
+    def _intersect(self, trigrams: set[str]) -> set[int]:
+        postings = sorted(
+            (self._postings.get(trigram, set()) for trigram in trigrams), key=len
+        )
+
+        if not postings or not postings[0]:
+            return set()
+
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+
+        return result
@@ -0,0 +1,179 @@
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from pkgr.core.installed_index import normalize_name
+from pkgr.core.versions import needs_upgrade
+
+SNAPSHOT_HEADER = "# pkgr snapshot"
+
+
+class Snapshot(NamedTuple):
+    """The pinned set of packages installed in an environment."""
+
+    packages: dict[str, tuple[str, str]]  # {normalized name: (name, version)}
+    environment: Optional[str] = None
+    created_at: Optional[float] = None
+
+    @classmethod
+    def from_packages(
+        cls,
+        packages: Iterable[tuple[str, str]],
+        environment: Optional[str] = None,
+    ) -> "Snapshot":
+        """Build a snapshot from (package_name, version) pairs."""
+
+        return cls(
+            {normalize_name(name): (name, version) for name, version in packages},
+            environment,
+            time.time(),
+        )
+
+    def requirements(self) -> list[str]:
+        """name==version lines, sorted by normalized name."""
+
+        return [
+            f"{name}=={version}"
+            for _, (name, version) in sorted(self.packages.items())
+        ]
+
+    def dumps(self) -> str:
+        """The lock file text: a pinned requirements file uv pip sync accepts."""
+
+        header = SNAPSHOT_HEADER
+        if self.environment:
+            header += f" of {self.environment}"
+        if self.created_at:
+            header += " at " + time.strftime(
+                "%Y-%m-%dT%H:%M:%S", time.localtime(self.created_at)
+            )
+
+        return "\n".join([header, *self.requirements()]) + "\n"
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def loads(cls, text: str) -> "Snapshot":
+        """
+        Parse a lock file written by dumps() or any requirements file
+        made of name==version pins.
+
+        Raises:
+            ValueError: for a requirement that is not pinned with ==
+        """
+
+        pins = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.split("#", 1)[0].strip()
+            if not line or line.startswith("-"):
+                continue
+
+            name, sep, version = line.partition("==")
+            # drop extras and environment markers, they do not change the pin
+            name = name.split("[", 1)[0].strip()
+            version = version.split(";", 1)[0].strip()
+
+            if not sep or not name or not version:
+                raise ValueError(f"line {number}: '{line}' is not pinned with ==")
+
+            pins.append((name, version))
+
+        # the file does not say when it was taken
+        return cls.from_packages(pins)._replace(created_at=None)
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with open(path, encoding="utf-8") as f:
+            return cls.loads(f.read())
+
+
+class SnapshotDiff(NamedTuple):
+    added: list[tuple[str, str]]  # (name, version)
+    removed: list[tuple[str, str]]  # (name, version)
+    upgraded: list[tuple[str, str, str]]  # (name, old version, new version)
+    downgraded: list[tuple[str, str, str]]  # (name, old version, new version)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.upgraded or self.downgraded)
+
+    def describe(self) -> str:
+        parts = []
+        for label, items in (
+            ("added", self.added),
+            ("removed", self.removed),
+            ("upgraded", self.upgraded),
+            ("downgraded", self.downgraded),
+        ):
+            if items:
+                parts.append(f"{len(items)} {label}")
+
+        return ", ".join(parts) or "identical"
+
+    def lines(self) -> list[str]:
+        """One ' + name==version' style line per difference."""
+
+        lines = [f" + {name}=={version}" for name, version in self.added]
+        lines.extend(f" - {name}=={version}" for name, version in self.removed)
+        lines.extend(f" ↑ {name} {old} -> {new}" for name, old, new in self.upgraded)
+        lines.extend(f" ↓ {name} {old} -> {new}" for name, old, new in self.downgraded)
+
+        return lines
+
+    def records(self) -> list[dict[str, str]]:
+        """One {"name", "change", ...} record per difference, for JSON output."""
+
+        records = [
+            {"name": name, "change": "added", "version": version}
+            for name, version in self.added
+        ]
+        records.extend(
+            {"name": name, "change": "removed", "version": version}
+            for name, version in self.removed
+        )
+        for change, items in (
+            ("upgraded", self.upgraded),
+            ("downgraded", self.downgraded),
+        ):
+            records.extend(
+                {"name": name, "change": change, "from": old, "version": new}
+                for name, old, new in items
+            )
+
+        return records
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> SnapshotDiff:
+    """
+    Compare two snapshots with set operations on the normalized names.
+
+    Args:
+        old: Snapshot taken before, e.g. the live environment
+        new: Snapshot taken after, e.g. a lock file to restore
+
+    Returns:
+        SnapshotDiff going from old to new, each list sorted by name
+    """
+
+    old_keys = old.packages.keys()
+    new_keys = new.packages.keys()
+
+    added = [new.packages[key] for key in sorted(new_keys - old_keys)]
+    removed = [old.packages[key] for key in sorted(old_keys - new_keys)]
+
+    upgraded = []
+    downgraded = []
+    for key in sorted(old_keys & new_keys):
+        name, old_version = old.packages[key]
+        _, new_version = new.packages[key]
+
+        if old_version == new_version:
+            continue
+
+        # "1.0" and "1.0.0" are the same version, neither branch is taken
+        if needs_upgrade(old_version, new_version):
+            upgraded.append((name, old_version, new_version))
+        elif needs_upgrade(new_version, old_version):
+            downgraded.append((name, old_version, new_version))
+
+    return SnapshotDiff(added, removed, upgraded, downgraded)
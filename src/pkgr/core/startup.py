@@ -0,0 +1,42 @@
+import time
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """
+    Named timestamps of the application start, relative to the first import
+    of pkgr.main, e.g. "imports", "window", "first_frame" and "ready".
+    """
+
+    _instance: Optional["StartupProfile"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks: dict[str, float] = {}
+
+    @classmethod
+    def default(cls) -> "StartupProfile":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+
+            return cls._instance
+
+    def mark(self, name: str) -> float:
+        """Record that the phase name finished now, returns ms since the origin."""
+
+        elapsed = (time.perf_counter() - self.origin) * 1000
+        self.marks.setdefault(name, elapsed)
+
+        return elapsed
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {ms:.0f} ms" for name, ms in self.marks.items())
+
+    def log(self):
+        logger.info(f"Startup: {self.summary()}")
@@ -0,0 +1,223 @@
+import os
+import json
+import math
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Optional
+
+from pkgr.core.paths import user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+# spans kept in memory for the performance panel
+RECENT_SPANS = 2000
+
+# spans.jsonl is moved to spans.jsonl.1 once it grows past this size
+MAX_SINK_BYTES = 5 * 1024 * 1024
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of values (fraction in 0..1), 0 if empty."""
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = min(max(1, math.ceil(fraction * len(ordered))), len(ordered))
+
+    return ordered[rank - 1]
+
+
+class Span:
+    """
+    Times a block of code and records it when the block exits.
+
+    Fields such as exit_code or output_bytes can be added with set() while
+    the block runs; an exception escaping the block is recorded as error.
+    """
+
+    def __init__(self, recorder: "SpanRecorder", name: str, fields: dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.fields = fields
+        self.start = 0.0
+
+    def set(self, **fields: Any):
+        self.fields.update(fields)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+
+        self.recorder.record(
+            self.name, (time.perf_counter() - self.start) * 1000, **self.fields
+        )
+
+
+class SpanRecorder:
+    """
+    Collects timing spans in memory and appends them to a JSONL sink.
+
+    Each line of the sink is one span: {"ts", "name", "ms", ...fields}.
+    The sink is spans.jsonl in the user cache directory, PKGR_SPANS_FILE
+    overrides it and PKGR_SPANS_FILE="" keeps spans in memory only.
+    Spans are handed to a writer thread through a queue, so recording one
+    on the Tk thread never waits on the disk.
+    """
+
+    _instance: Optional["SpanRecorder"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, sink: Optional[Path] = None, max_recent: int = RECENT_SPANS):
+        self.sink = sink
+        self.spans: deque[dict[str, Any]] = deque(maxlen=max_recent)
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
+        if sink is not None:
+            # flush the queued spans when the process exits
+            atexit.register(self.close)
+
+    @classmethod
+    def default(cls) -> "SpanRecorder":
+        with cls._instance_lock:
+            if cls._instance is None:
+                override = os.environ.get("PKGR_SPANS_FILE")
+                if override is None:
+                    sink = user_cache_dir() / "spans.jsonl"
+                else:
+                    sink = Path(override) if override else None
+                cls._instance = cls(sink)
+
+            return cls._instance
+
+    def span(self, name: str, **fields: Any) -> Span:
+        return Span(self, name, fields)
+
+    def record(self, name: str, ms: float, **fields: Any) -> dict[str, Any]:
+        """Store a finished span and append it to the sink."""
+
+        entry = {"ts": round(time.time(), 3), "name": name, "ms": round(ms, 3)}
+        entry.update(fields)
+
+        with self._lock:
+            self.spans.append(entry)
+
+            if self.sink is not None:
+                self._queue.put(entry)
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name="pkgr-spans", daemon=True
+                    )
+                    self._writer.start()
+
+        return entry
+
+    def _write_loop(self):
+        while True:
+            entries = [self._queue.get()]
+            # write whatever queued up meanwhile with a single flush
+            while True:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in entries
+            self._write([entry for entry in entries if entry is not None])
+
+            if stop:
+                return
+
+    def close(self):
+        """Write the queued spans, then stop the writer thread."""
+
+        with self._lock:
+            writer, self._writer = self._writer, None
+
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entries: list[dict[str, Any]]):
+        if self.sink is None or not entries:
+            return
+
+        try:
+            if self._file is None:
+                self.sink.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.sink, "a", encoding="utf-8")
+
+            self._file.write(
+                "".join(json.dumps(entry, default=str) + "\n" for entry in entries)
+            )
+            self._file.flush()
+
+            if self._file.tell() > MAX_SINK_BYTES:
+                self._file.close()
+                self._file = None
+                os.replace(self.sink, self.sink.with_name(self.sink.name + ".1"))
+        except OSError as e:
+            logger.error(f"Could not write span to {self.sink}: {e}")
+            self.sink = None
+
+    def recent(self, limit: int = 100) -> list[dict[str, Any]]:
+        """The latest spans, newest first."""
+
+        with self._lock:
+            spans = list(self.spans)
+
+        return spans[::-1][:limit]
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Latency summary of the spans in memory.
+
+        Returns:
+            dict: {span name: {"count", "p50_ms", "p95_ms", "max_ms", "last_ms"}}
+        """
+
+        with self._lock:
+            spans = list(self.spans)
+
+        durations: dict[str, list[float]] = {}
+        for entry in spans:
+            durations.setdefault(entry["name"], []).append(entry["ms"])
+
+        return {
+            name: {
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "max_ms": max(values),
+                "last_ms": values[-1],
+            }
+            for name, values in sorted(durations.items())
+        }
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+def span(name: str, **fields: Any) -> Span:
+    """Time a block with the shared recorder: `with span("parse:pip_list"):`"""
+
+    return SpanRecorder.default().span(name, **fields)
@@ -0,0 +1,162 @@
+import functools
+from typing import TYPE_CHECKING, Iterable, Mapping, NamedTuple, Optional
+
+from packaging.version import InvalidVersion, Version
+
+if TYPE_CHECKING:
+    # ssl and http.client are slow to import, only the annotations need it
+    from pkgr.core.index_client import ProjectVersions
+
+
+class UpgradeCandidate(NamedTuple):
+    name: str
+    current: str
+    latest: str
+    kind: str  # "major", "minor", "patch" or "other"
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_version(text: str) -> Optional[Version]:
+    """
+    Parse a version string once, caching the result.
+
+    Args:
+        text: Version string such as "2.1", "1.0rc1" or "2024.1.post2"
+
+    Returns:
+        Version, or None if the string is not a valid PEP 440 version
+    """
+
+    try:
+        return Version(text)
+    except InvalidVersion:
+        return None
+
+
+def classify(current: Version, latest: Version) -> str:
+    """
+    Classify an update by the first release segment that changes.
+
+    Returns:
+        str: "major", "minor", "patch" or "other" (pre/post/dev/local changes)
+    """
+
+    old = current.release + (0,) * (3 - len(current.release))
+    new = latest.release + (0,) * (3 - len(latest.release))
+
+    if new[0] != old[0]:
+        return "major"
+    if new[1] != old[1]:
+        return "minor"
+    if new[2:] != old[2:]:
+        return "patch"
+
+    return "other"
+
+
+def latest_version(
+    versions: Iterable[str],
+    yanked: Iterable[str] = (),
+    include_prereleases: bool = False,
+    include_yanked: bool = False,
+) -> Optional[Version]:
+    """
+    Pick the newest version from a list of available versions.
+
+    Args:
+        versions: Available version strings
+        yanked: Versions whose files are all yanked
+        include_prereleases: Consider alpha/beta/rc/dev releases
+        include_yanked: Consider yanked versions
+
+    Returns:
+        The newest matching Version, or None
+    """
+
+    yanked = set() if include_yanked else set(yanked)
+    best = None
+
+    for text in versions:
+        if text in yanked:
+            continue
+
+        version = parse_version(text)
+        if version is None:
+            continue
+        if version.is_prerelease and not include_prereleases:
+            continue
+
+        if best is None or version > best:
+            best = version
+
+    return best
+
+
+def compare_all(
+    installed: Iterable[tuple[str, str]],
+    available: Mapping[str, Optional["ProjectVersions"]],
+    include_prereleases: bool = False,
+    include_yanked: bool = False,
+) -> list[UpgradeCandidate]:
+    """
+    Compare a whole installed set against the available versions in one pass.
+
+    Pre-releases are always considered for packages whose installed version
+    is itself a pre-release, the same way pip and uv treat them.
+
+    Args:
+        installed: (name, version) tuples
+        available: {name: ProjectVersions} as returned by IndexClient.get_many
+        include_prereleases: Consider pre-releases for every package
+        include_yanked: Consider yanked versions
+
+    Returns:
+        One UpgradeCandidate per package with a newer version available
+    """
+
+    candidates = []
+
+    for name, version in installed:
+        project = available.get(name)
+        current = parse_version(version)
+
+        if project is None or current is None:
+            continue
+
+        latest = latest_version(
+            project.versions,
+            project.yanked,
+            include_prereleases=include_prereleases or current.is_prerelease,
+            include_yanked=include_yanked,
+        )
+
+        if latest is not None and latest > current:
+            candidates.append(
+                UpgradeCandidate(name, version, str(latest), classify(current, latest))
+            )
+
+    return candidates
+
+
+def needs_upgrade(current: str, latest: str) -> bool:
+    """True if latest is a newer version than current."""
+
+    parsed_current = parse_version(current)
+    parsed_latest = parse_version(latest)
+
+    if parsed_current is None or parsed_latest is None:
+        return current != latest
+
+    return parsed_latest > parsed_current
+
+
+def update_kind(current: str, latest: str) -> str:
+    """classify() for version strings, "other" if either can not be parsed."""
+
+    parsed_current = parse_version(current)
+    parsed_latest = parse_version(latest)
+
+    if parsed_current is None or parsed_latest is None:
+        return "other"
+
+    return classify(parsed_current, parsed_latest)
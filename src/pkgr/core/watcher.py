@@ -0,0 +1,336 @@
+import os
+import sys
+import errno
+import select
+import logging
+import threading
+import ctypes
+import ctypes.util
+from typing import Callable, NamedTuple, Optional
+
+from pkgr.core.installed_index import (
+    InstalledDistribution,
+    InstalledIndex,
+    normalize_name,
+)
+from pkgr.core.versions import needs_upgrade, update_kind
+
+logger = logging.getLogger(__name__)
+
+
+POLL_INTERVAL = 2.0
+
+# uv writes a whole transaction in a burst, wait until it settles
+SETTLE_DELAY = 0.3
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_MODIFY | _IN_ATTRIB
+)
+
+
+class PackageDelta(NamedTuple):
+    added: list[InstalledDistribution]
+    removed: list[InstalledDistribution]
+    changed: list[tuple[InstalledDistribution, InstalledDistribution]]  # (old, new)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def describe(self) -> str:
+        parts = []
+        if self.added:
+            parts.append(f"{len(self.added)} added")
+        if self.removed:
+            parts.append(f"{len(self.removed)} removed")
+        if self.changed:
+            parts.append(f"{len(self.changed)} changed")
+
+        return ", ".join(parts) or "no changes"
+
+
+def diff_distributions(
+    old: dict[str, InstalledDistribution], new: dict[str, InstalledDistribution]
+) -> PackageDelta:
+    """
+    Compare two snapshots of an InstalledIndex.
+
+    Args:
+        old: Distributions keyed by normalized name before the change
+        new: Distributions keyed by normalized name after the change
+
+    Returns:
+        PackageDelta with the added, removed and re-versioned distributions
+    """
+
+    added = [dist for key, dist in new.items() if key not in old]
+    removed = [dist for key, dist in old.items() if key not in new]
+    changed = [
+        (old[key], dist)
+        for key, dist in new.items()
+        if key in old and old[key].version != dist.version
+    ]
+
+    return PackageDelta(added, removed, changed)
+
+
+def apply_to_installed(
+    packages: list[tuple[str, str]], delta: PackageDelta
+) -> list[tuple[str, str]]:
+    """Apply a delta to a (package_name, version) list, keeping it sorted."""
+
+    removed = {normalize_name(dist.name) for dist in delta.removed}
+    versions = {normalize_name(new.name): new.version for _, new in delta.changed}
+
+    result = [
+        (name, versions.get(normalize_name(name), version))
+        for name, version in packages
+        if normalize_name(name) not in removed
+    ]
+    result.extend((dist.name, dist.version) for dist in delta.added)
+
+    if delta.added:
+        result.sort(key=lambda pkg: normalize_name(pkg[0]))
+
+    return result
+
+
+def apply_to_outdated(
+    packages: list[tuple[str, str, str, str]], delta: PackageDelta
+) -> list[tuple[str, str, str, str]]:
+    """
+    Apply a delta to a (name, current, latest, update_kind) list.
+
+    Removed packages are dropped and upgraded ones are dropped once they
+    reach the latest version. Added packages are not included, their
+    latest version is unknown until the index is asked again.
+    """
+
+    removed = {normalize_name(dist.name) for dist in delta.removed}
+    versions = {normalize_name(new.name): new.version for _, new in delta.changed}
+
+    result = []
+    for name, current, latest, kind in packages:
+        key = normalize_name(name)
+        if key in removed:
+            continue
+        if key in versions:
+            current = versions[key]
+            if not needs_upgrade(current, latest):
+                continue
+            kind = update_kind(current, latest)
+        result.append((name, current, latest, kind))
+
+    return result
+
+
+class _Inotify:
+    """Minimal inotify wrapper over libc, only available on Linux."""
+
+    def __init__(self, paths: list[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        for path in paths:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(error, f"inotify_add_watch failed for {path}")
+
+    def wait(self, timeout: float) -> bool:
+        """Block until an event arrives (True) or timeout passes (False)."""
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+
+        # the events only say that something changed, the index finds out what
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not data:
+                break
+
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SitePackagesWatcher:
+    """
+    Watches the site-packages directories behind an InstalledIndex.
+
+    Uses inotify on Linux and falls back to polling directory mtimes
+    elsewhere. When the installed distributions change, the index is
+    refreshed (only changed entries are re-read) and every subscriber
+    receives a PackageDelta from the watcher thread.
+    """
+
+    _instances: dict[tuple[str, ...], "SitePackagesWatcher"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, index: InstalledIndex, interval: float = POLL_INTERVAL):
+        self.index = index
+        self.interval = interval
+
+        self._callbacks: list[Callable[[PackageDelta], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: dict[str, InstalledDistribution] = {}
+        # set once the watcher thread took the snapshot to compare against
+        self._ready = threading.Event()
+
+    @classmethod
+    def for_index(cls, index: InstalledIndex) -> "SitePackagesWatcher":
+        """Return the shared, running watcher of an index."""
+
+        key = tuple(index.site_dirs)
+
+        with cls._instances_lock:
+            watcher = cls._instances.get(key)
+            if watcher is None:
+                watcher = cls(index)
+                cls._instances[key] = watcher
+
+        watcher.start()
+
+        return watcher
+
+    @classmethod
+    def stop_unused(cls):
+        """Stop the watchers nobody is subscribed to anymore."""
+
+        with cls._instances_lock:
+            watchers = list(cls._instances.values())
+
+        for watcher in watchers:
+            with watcher._lock:
+                unused = not watcher._callbacks
+            if unused:
+                watcher.stop()
+
+    def subscribe(self, callback: Callable[[PackageDelta], None]) -> Callable[[], None]:
+        """
+        Call callback with every delta from now on.
+
+        Returns:
+            Function that removes the subscription
+        """
+
+        with self._lock:
+            self._callbacks.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+        return unsubscribe
+
+    def start(self):
+        if not self.index.available():
+            return
+
+        with self._lock:
+            if (
+                self._thread is not None
+                and self._thread.is_alive()
+                and not self._stop.is_set()
+            ):
+                return
+
+            # watch before taking the snapshot so no change falls in between
+            inotify = None
+            if sys.platform.startswith("linux"):
+                try:
+                    inotify = _Inotify(self.index.site_dirs)
+                except (OSError, AttributeError) as e:
+                    logger.error(f"inotify unavailable, polling instead: {e}")
+
+            # a thread still winding down after stop() keeps its own event
+            self._ready.clear()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(inotify, self._stop),
+                name="pkgr-site-watcher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self) -> PackageDelta:
+        """Refresh the index now and publish the changes, if any."""
+
+        if self._thread is not None:
+            self._ready.wait()
+
+        self.index.refresh()
+        snapshot = self.index.snapshot()
+
+        with self._lock:
+            delta = diff_distributions(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            callbacks = list(self._callbacks)
+
+        if delta:
+            logger.info(f"{', '.join(self.index.site_dirs)}: {delta.describe()}")
+            for callback in callbacks:
+                try:
+                    callback(delta)
+                except Exception as e:
+                    logger.error(f"Error in package change callback: {e}")
+
+        return delta
+
+    def _run(self, inotify: Optional[_Inotify], stop: threading.Event):
+        try:
+            # a first scan of a large environment takes a while, the caller
+            # of start() (often the Tk thread) does not wait for it
+            self.index.refresh()
+            with self._lock:
+                self._snapshot = self.index.snapshot()
+            self._ready.set()
+
+            while not stop.is_set():
+                if inotify is not None:
+                    if not inotify.wait(self.interval):
+                        continue
+                    # swallow the rest of the burst before looking
+                    while inotify.wait(SETTLE_DELAY):
+                        pass
+                elif stop.wait(self.interval):
+                    break
+
+                if stop.is_set():
+                    break
+
+                self.check()
+        except Exception as e:
+            logger.error(f"Site-packages watcher stopped: {e}")
+        finally:
+            # a newer thread started by start() owns the event by now
+            if stop is self._stop:
+                self._ready.set()
+            if inotify is not None:
+                inotify.close()
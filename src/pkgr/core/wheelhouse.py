@@ -0,0 +1,378 @@
+import os
+import time
+import shutil
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+from pkgr.core.installed_index import normalize_name
+from pkgr.core.paths import user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+# least recently used wheels are evicted past this size
+MAX_BYTES = int(os.environ.get("PKGR_WHEELHOUSE_MAX_MB", "2048")) * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wheels (
+    filename   TEXT PRIMARY KEY,
+    sha256     TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    version    TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_wheels_sha256 ON wheels (sha256);
+CREATE INDEX IF NOT EXISTS idx_wheels_normalized ON wheels (normalized);
+"""
+
+
+class WheelEntry(NamedTuple):
+    filename: str
+    sha256: str
+    name: str  # normalized
+    version: str
+    size: int
+    last_used: float
+
+
+def parse_wheel_filename(filename: str) -> Optional[tuple[str, str]]:
+    """
+    (normalized name, version) of a wheel file name, None if it is not one.
+
+    name-version(-build)?-python-abi-platform.whl
+    """
+
+    if not filename.endswith(".whl"):
+        return None
+
+    parts = filename[: -len(".whl")].split("-")
+    if len(parts) not in (5, 6):
+        return None
+
+    return normalize_name(parts[0]), parts[1]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+class Wheelhouse:
+    """
+    Local, content-addressed store of wheel files.
+
+    Every wheel is kept once under objects/ by its SHA-256, whichever
+    environment it came from. links/ holds a hard link (a copy where links
+    are not supported) named after the wheel file for every stored wheel,
+    that is the directory uv is pointed at with --find-links. An SQLite
+    manifest records the hash, size and last use of every file name, so
+    the store can be kept under max_bytes by evicting the least recently
+    used wheels.
+    """
+
+    _default: Optional["Wheelhouse"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, root: str, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+        self.objects_dir = self.root / "objects"
+        self.links_dir = self.root / "links"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.links_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(
+            str(self.root / "wheelhouse.sqlite3"), check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def default(cls) -> "Wheelhouse":
+        """
+        Return the shared wheelhouse in the user cache directory, or in
+        PKGR_WHEELHOUSE_DIR.
+        """
+
+        with cls._default_lock:
+            if cls._default is None:
+                root = os.environ.get("PKGR_WHEELHOUSE_DIR") or str(
+                    user_cache_dir() / "wheelhouse"
+                )
+                cls._default = cls(root)
+
+            return cls._default
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / sha256
+
+    # adding
+
+    def add(self, path: str) -> Optional[WheelEntry]:
+        """
+        Store a wheel file, a no-op for content that is already stored.
+
+        Returns:
+            WheelEntry, None if path is not a wheel
+        """
+
+        filename = os.path.basename(path)
+        parsed = parse_wheel_filename(filename)
+        if parsed is None:
+            return None
+
+        name, version = parsed
+        sha256 = file_sha256(path)
+        size = os.path.getsize(path)
+
+        target = self._object_path(sha256)
+        if not target.exists():
+            target.parent.mkdir(exist_ok=True)
+            # copy next to the target first so a reader never sees half a file
+            fd, partial = tempfile.mkstemp(dir=target.parent, suffix=".part")
+            os.close(fd)
+            try:
+                shutil.copyfile(path, partial)
+                os.chmod(partial, 0o644)
+                os.replace(partial, target)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+
+        self._link(target, self.links_dir / filename)
+
+        entry = WheelEntry(filename, sha256, name, version, size, time.time())
+
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT sha256 FROM wheels WHERE filename = ?", (filename,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO wheels VALUES (?, ?, ?, ?, ?, ?)", entry
+            )
+            self._conn.commit()
+
+            # a rebuilt wheel replaced the content stored under its name
+            if previous is not None and previous[0] != sha256:
+                self._remove_unused_object(previous[0])
+
+        return entry
+
+    @staticmethod
+    def _link(target: Path, link: Path):
+        try:
+            if os.path.samefile(target, link):
+                return
+        except OSError:
+            pass
+
+        partial = link.with_name(link.name + ".part")
+        if partial.exists():
+            partial.unlink()
+
+        try:
+            os.link(target, partial)
+        except OSError:
+            shutil.copyfile(target, partial)
+
+        os.replace(partial, link)
+
+    def add_directory(self, directory: str) -> list[WheelEntry]:
+        """Store every wheel of a directory, then evict down to max_bytes."""
+
+        added = []
+
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if not os.path.isfile(path):
+                continue
+
+            try:
+                entry = self.add(path)
+            except OSError as e:
+                logger.error(f"Error adding {path} to the wheelhouse: {e}")
+                continue
+
+            if entry is not None:
+                added.append(entry)
+
+        self.evict()
+
+        return added
+
+    # lookups
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def entries(self) -> list[WheelEntry]:
+        """Every stored wheel, most recently used first."""
+
+        rows = self._query("SELECT * FROM wheels ORDER BY last_used DESC")
+
+        return [WheelEntry(*row) for row in rows]
+
+    def find(self, name: str, version: Optional[str] = None) -> list[WheelEntry]:
+        """Stored wheels of a project, of one version if given."""
+
+        sql = "SELECT * FROM wheels WHERE normalized = ?"
+        params: tuple = (normalize_name(name),)
+        if version is not None:
+            sql += " AND version = ?"
+            params += (version,)
+
+        return [WheelEntry(*row) for row in self._query(sql, params)]
+
+    def versions(self) -> set[tuple[str, str]]:
+        """(normalized name, version) of every stored wheel."""
+
+        return {
+            (row["normalized"], row["version"])
+            for row in self._query("SELECT normalized, version FROM wheels")
+        }
+
+    def has_all(self, pins: Iterable[tuple[str, str]]) -> bool:
+        """True if a wheel of every (name, version) pin is stored."""
+
+        stored = self.versions()
+
+        return all((normalize_name(name), version) in stored for name, version in pins)
+
+    def has_projects(self, names: Iterable[str]) -> bool:
+        """True if some wheel of every project is stored."""
+
+        stored = {name for name, _ in self.versions()}
+
+        return all(normalize_name(name) in stored for name in names)
+
+    def usage(self) -> tuple[int, int]:
+        """
+        Returns:
+            (stored wheel files, bytes used on disk), identical content
+            counted once
+        """
+
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM wheels").fetchone()[0]
+            size = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM "
+                "(SELECT size FROM wheels GROUP BY sha256)"
+            ).fetchone()[0]
+
+        return files, size
+
+    # least recently used
+
+    def _remove_unused_object(self, sha256: str) -> bool:
+        """Delete an object no file name refers to, called with the lock held."""
+
+        used = self._conn.execute(
+            "SELECT 1 FROM wheels WHERE sha256 = ? LIMIT 1", (sha256,)
+        ).fetchone()
+        if used is not None:
+            return False
+
+        try:
+            os.remove(self._object_path(sha256))
+        except OSError:
+            pass
+
+        return True
+
+    def touch(self, names: Iterable[str], versions: Optional[dict[str, str]] = None):
+        """
+        Mark the wheels of projects as used now.
+
+        Args:
+            names: Project names
+            versions: {name: version}, to only touch the version in use
+        """
+
+        now = time.time()
+        versions = {normalize_name(k): v for k, v in (versions or {}).items()}
+
+        with self._lock:
+            for name in names:
+                key = normalize_name(name)
+                if key in versions:
+                    self._conn.execute(
+                        "UPDATE wheels SET last_used = ? "
+                        "WHERE normalized = ? AND version = ?",
+                        (now, key, versions[key]),
+                    )
+                else:
+                    self._conn.execute(
+                        "UPDATE wheels SET last_used = ? WHERE normalized = ?",
+                        (now, key),
+                    )
+            self._conn.commit()
+
+    def evict(self, max_bytes: Optional[int] = None) -> list[WheelEntry]:
+        """
+        Remove the least recently used wheels until the store fits.
+
+        An object is deleted once no file name refers to it anymore.
+
+        Args:
+            max_bytes: Size to shrink to, defaults to self.max_bytes
+
+        Returns:
+            The evicted entries
+        """
+
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        _, total = self.usage()
+        evicted = []
+
+        if total <= limit:
+            return evicted
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM wheels ORDER BY last_used ASC"
+            ).fetchall()
+
+            for row in rows:
+                if total <= limit:
+                    break
+
+                entry = WheelEntry(*row)
+                self._conn.execute(
+                    "DELETE FROM wheels WHERE filename = ?", (entry.filename,)
+                )
+                evicted.append(entry)
+
+                try:
+                    os.remove(self.links_dir / entry.filename)
+                except OSError:
+                    pass
+
+                if self._remove_unused_object(entry.sha256):
+                    total -= entry.size
+
+            self._conn.commit()
+
+        logger.info(f"Evicted {len(evicted)} wheels from the wheelhouse")
+
+        return evicted
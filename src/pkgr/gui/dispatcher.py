@@ -0,0 +1,72 @@
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# how often the Tk thread picks up posted updates, about once per frame
+FRAME_MS = 16
+
+
+class UiDispatcher:
+    """
+    Hands UI updates from any thread to the Tk thread.
+
+    post() only appends to a queue, it never touches Tk, so worker threads
+    can call it freely. The Tk thread drains the queue once per frame.
+    Updates posted with a key replace the pending update with the same key
+    (last write wins), so a burst of status or progress changes from a
+    busy operation costs a single redraw.
+    """
+
+    def __init__(self, root, frame_ms: int = FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+
+        self._lock = threading.Lock()
+        self._pending: OrderedDict[Hashable, tuple[Callable, tuple]] = OrderedDict()
+        self._ids = itertools.count()
+        self._job: Optional[str] = None
+
+        self._job = self.root.after(self.frame_ms, self._drain)
+
+    def post(self, callback: Callable[..., Any], *args: Any, key: Hashable = None):
+        """
+        Run callback(*args) on the Tk thread during the next frame.
+
+        Args:
+            callback: Function touching Tk
+            key: Updates sharing a key are coalesced, only the last one runs
+        """
+
+        with self._lock:
+            if key is None:
+                key = next(self._ids)
+            else:
+                # keep the order of the latest write among the other updates
+                self._pending.pop(key, None)
+
+            self._pending[key] = (callback, args)
+
+    def _drain(self):
+        # schedule the next frame first: a callback may open a modal dialog,
+        # whose event loop then keeps draining the updates posted meanwhile
+        self._job = self.root.after(self.frame_ms, self._drain)
+
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        for callback, args in pending:
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Error in UI update {callback!r}: {e}")
+
+    def close(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
@@ -0,0 +1,171 @@
+from customtkinter import (
+    CTkToplevel,
+    CTkFont,
+    CTkLabel,
+    CTkButton,
+    CTkFrame,
+)
+from tkinter import ttk
+
+from pkgr.core.jobs import QUEUED, JobScheduler
+
+
+REFRESH_MS = 500
+
+COLUMNS = ["#", "Job", "Environment", "State", "Waited (s)", "Duration (s)"]
+
+STATE_ICONS = {
+    "queued": "⏳ queued",
+    "running": "▶️ running",
+    "done": "✅ done",
+    "failed": "❌ failed",
+    "cancelled": "⛔ cancelled",
+}
+
+
+class JobsWindow:
+    """Queued, running and finished package operations"""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.scheduler = JobScheduler.default()
+        self.jobs = {}
+        self._refresh_job = None
+
+        self.create_window()
+        self.refresh()
+
+    def create_window(self):
+        self.window = CTkToplevel(self.parent)
+
+        self.window.title("Jobs")
+
+        self.window.geometry("800x450")
+
+        self.window.transient(self.parent)
+
+        self.window.configure(fg_color=("#f8f9fa", "#1a1a1a"))
+
+        main_container = CTkFrame(self.window, fg_color="transparent")
+        main_container.pack(fill="both", expand=True, padx=15, pady=15)
+
+        header_frame = CTkFrame(main_container, fg_color=("#ecf0f1", "#2c3e50"))
+        header_frame.pack(fill="x", pady=(0, 15))
+
+        self.summary_label = CTkLabel(
+            header_frame,
+            text="",
+            font=CTkFont(size=14, weight="bold"),
+        )
+        self.summary_label.pack(side="left", padx=15, pady=15)
+
+        cancel_button = CTkButton(
+            header_frame,
+            text="⛔ Cancel",
+            width=90,
+            command=self.cancel_selected,
+        )
+        cancel_button.pack(side="right", padx=(5, 15), pady=15)
+
+        prioritize_button = CTkButton(
+            header_frame,
+            text="⏫ Run next",
+            width=90,
+            command=self.prioritize_selected,
+        )
+        prioritize_button.pack(side="right", padx=5, pady=15)
+
+        tree_container = CTkFrame(
+            main_container, fg_color=("#ffffff", "#2c3e50"), corner_radius=10
+        )
+        tree_container.pack(fill="both", expand=True)
+
+        self.treeview = ttk.Treeview(
+            tree_container,
+            columns=COLUMNS,
+            show="headings",
+            style="Treeview",
+            selectmode="extended",
+        )
+
+        for i, col in enumerate(COLUMNS):
+            self.treeview.heading(col, text=col)
+            self.treeview.column(
+                col, width={0: 40, 1: 260, 2: 180}.get(i, 90), anchor="center"
+            )
+
+        scrollbar = ttk.Scrollbar(
+            tree_container,
+            orient="vertical",
+            command=self.treeview.yview,
+        )
+
+        self.treeview.configure(yscrollcommand=scrollbar.set)
+
+        self.treeview.pack(side="left", fill="both", padx=10, pady=10, expand=True)
+        scrollbar.pack(side="left", fill="y", pady=10)
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+    def refresh(self):
+        """Redraw the job list and schedule the next refresh"""
+
+        jobs = self.scheduler.jobs()
+        self.jobs = {str(job.id): job for job in jobs}
+
+        # keep the rows (and so the selection) of jobs that are still listed
+        existing = set(self.treeview.get_children())
+
+        for job in jobs:
+            description = job.description
+            if job.coalesced:
+                description += f" (×{job.coalesced + 1})"
+
+            values = (
+                job.id,
+                description,
+                job.environment or "default",
+                STATE_ICONS.get(job.state, job.state),
+                f"{job.waited:.1f}",
+                f"{job.duration:.1f}" if job.started_at else "",
+            )
+
+            item = str(job.id)
+            if item in existing:
+                self.treeview.item(item, values=values)
+                existing.discard(item)
+            else:
+                self.treeview.insert(parent="", index="end", iid=item, values=values)
+
+        if existing:
+            self.treeview.delete(*existing)
+
+        self.treeview.set_children("", *self.jobs)
+
+        pending = sum(1 for job in jobs if not job.finished)
+        self.summary_label.configure(
+            text=f"📋 {pending} pending, {len(jobs) - pending} finished"
+        )
+
+        self._refresh_job = self.window.after(REFRESH_MS, self.refresh)
+
+    def selected_jobs(self):
+        return [
+            self.jobs[item] for item in self.treeview.selection() if item in self.jobs
+        ]
+
+    def cancel_selected(self):
+        for job in self.selected_jobs():
+            self.scheduler.cancel(job)
+
+    def prioritize_selected(self):
+        for job in self.selected_jobs():
+            if job.state == QUEUED:
+                self.scheduler.prioritize(job)
+
+    def close(self):
+        if self._refresh_job is not None:
+            self.window.after_cancel(self._refresh_job)
+            self._refresh_job = None
+
+        self.window.destroy()
@@ -1,30 +1,84 @@
 import customtkinter
-from pkgr.gui.packages_window import PackageWindow
 from pkgr.core.package_manager import PackageManager
-
-from tkinter import messagebox
-
+from pkgr.core.command_engine import CommandEngine
+from pkgr.core.environments import EnvironmentRegistry
+from pkgr.core.jobs import QUEUED, JobScheduler
+from pkgr.core.prefetch import Prefetcher, describe_age
+from pkgr.core.startup import StartupProfile
+from pkgr.core.watcher import (
+    SitePackagesWatcher,
+    apply_to_installed,
+    apply_to_outdated,
+)
+from pkgr.gui.dispatcher import UiDispatcher
+
+from tkinter import Menu, messagebox
+
+import re
+import logging
 import threading
 
 import functools
-from pkgr.core.base_operation import Operations
+
+# the other pkgr.gui windows, pkgr.core.base_operation and tkinter.filedialog
+# are imported on first use to keep them off the startup path
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_ENVIRONMENT = "Default environment"
+# rows streamed by a running query show up within about a frame
+PREFETCH_POLL_MS = 20
 
 
 class PackageManagerApp(customtkinter.CTk):
     def __init__(self):
         super().__init__()
+
+        # every update coming from another thread goes through here
+        self.ui = UiDispatcher(self)
+
+        self.registry = EnvironmentRegistry()
+        self.environment_choices = {}
+
+        # warm the package lists while the window is being drawn
+        self.prefetcher = Prefetcher()
+        self.prefetch_package_lists()
+
+        self._unwatch = None
+
         self.setup_app()
 
         self.setup_ui()
 
+        StartupProfile.default().mark("window")
+
+        # the rest waits until the window has been drawn once
+        self.after_idle(self.on_first_frame)
+
+    def on_first_frame(self):
+        StartupProfile.default().mark("first_frame")
+
+        self.after(0, self.finish_setup)
+
+    def finish_setup(self):
+        """Setup that is not needed to show the window"""
+
+        self.watch_environment()
+
+        self.discover_environments()
+
+        StartupProfile.default().mark("ready")
+        StartupProfile.default().log()
+
     def setup_app(self):
         """initialize application settings"""
         # customtkinter.set_default_color_theme("blue")
         customtkinter.set_appearance_mode("dark")
 
         self.title("Python Package Manager")
-        self.geometry("520x700")
-        self.minsize(500, 650)
+        self.geometry("520x800")
+        self.minsize(500, 750)
 
         self.configure(fg_color=("#f0f0f0", "#0a0a0a"))
 
@@ -68,6 +122,169 @@ class PackageManagerApp(customtkinter.CTk):
         )
         self.subtitle_label.pack()
 
+        # environment switcher, filled once discovery finishes
+        self.environment_menu = customtkinter.CTkOptionMenu(
+            header_frame,
+            values=[DEFAULT_ENVIRONMENT],
+            command=self.switch_environment,
+            width=300,
+            dynamic_resizing=False,
+        )
+        self.environment_menu.pack(pady=(10, 0))
+
+    def discover_environments(self):
+        """Discover and scan environments in the background"""
+
+        def discover():
+            try:
+                environments = self.registry.discover()
+                self.ui.post(self.set_environment_choices, environments)
+                self.registry.scan_all(environments)
+            except Exception as e:
+                logger.error(f"Error discovering environments: {e}")
+                self.update_status_ui("Failed to discover environments", "error")
+
+        threading.Thread(target=discover, daemon=True).start()
+
+    def set_environment_choices(self, environments):
+        self.environment_choices = {
+            f"{env.name} ({env.source})": env for env in environments
+        }
+        self.environment_menu.configure(
+            values=[DEFAULT_ENVIRONMENT, *self.environment_choices]
+        )
+
+    def prefetch_keys(self):
+        prefix = PackageManager.environment_prefix
+
+        return ("installed", prefix), ("outdated", prefix)
+
+    def prefetch_package_lists(self):
+        """Start loading the installed and outdated lists in the background"""
+
+        installed_key, outdated_key = self.prefetch_keys()
+
+        self.prefetcher.start(
+            installed_key, PackageManager.stream_installed_packages, stream=True
+        )
+        self.prefetcher.start(
+            outdated_key, PackageManager.stream_outdated_packages, stream=True
+        )
+
+    def refresh_prefetched(self):
+        """Drop the warmed lists after a change and load them again"""
+
+        self.prefetcher.invalidate(*self.prefetch_keys())
+        self.prefetch_package_lists()
+
+    def watch_environment(self):
+        """Follow changes made to the targeted environment by any tool"""
+
+        if self._unwatch is not None:
+            self._unwatch()
+
+        self._unwatch = PackageManager.watcher().subscribe(self.on_packages_changed)
+
+        # windows still open on the previous environment keep its watcher
+        SitePackagesWatcher.stop_unused()
+
+    def on_packages_changed(self, delta):
+        """Called from the watcher thread"""
+
+        self.ui.post(self.apply_package_delta, delta)
+
+    def apply_package_delta(self, delta):
+        """Patch the warmed lists instead of loading them again"""
+
+        installed_key, outdated_key = self.prefetch_keys()
+
+        self.prefetcher.update(installed_key, lambda p: apply_to_installed(p, delta))
+
+        if delta.added:
+            # whether a new package is outdated needs the package index
+            self.prefetcher.invalidate(outdated_key)
+            self.prefetcher.start(
+                outdated_key, PackageManager.stream_outdated_packages, stream=True
+            )
+        else:
+            self.prefetcher.update(outdated_key, lambda p: apply_to_outdated(p, delta))
+
+    def open_when_ready(self, key, fetch, on_ready, loading_message, window=None):
+        """
+        Call on_ready with the prefetched result of key on the main thread.
+
+        Opens at once when the result is warm, otherwise starts (or joins)
+        the query and polls for it without blocking the event loop.
+        fetch streams its rows: while it runs, they are appended to window
+        as they arrive, and polling stops if window is closed. Rows of a
+        query restarted meanwhile, e.g. after an invalidation, replace the
+        ones streamed before.
+        """
+
+        result = self.prefetcher.get(key)
+        if result is not None:
+            on_ready(result)
+            return
+
+        self.update_status(loading_message, "loading")
+        self.prefetcher.start(key, fetch, stream=True)
+
+        generation = None
+        received = 0
+
+        def poll():
+            nonlocal generation, received
+
+            if window is not None and not window.window.winfo_exists():
+                return
+
+            result = self.prefetcher.get(key)
+            if result is not None:
+                on_ready(result)
+                return
+
+            current, rows = self.prefetcher.partial(key, received, generation)
+            if generation is not None and current != generation:
+                received = 0
+                if window is not None:
+                    window.restart_loading()
+            generation = current
+
+            if rows:
+                received += len(rows)
+                if window is not None:
+                    window.append_packages(rows)
+
+            self.after(PREFETCH_POLL_MS, poll)
+
+        self.after(PREFETCH_POLL_MS, poll)
+
+    def switch_environment(self, choice):
+        """Target the chosen environment with every following operation"""
+
+        environment = self.environment_choices.get(choice)
+
+        if environment is None:
+            PackageManager.set_environment(None)
+            self.prefetch_package_lists()
+            self.watch_environment()
+            self.subtitle_label.configure(text="Manage your python packages")
+            self.update_status("Using the default environment", "info")
+            return
+
+        PackageManager.set_environment(environment.prefix, environment.python)
+        self.prefetch_package_lists()
+        self.watch_environment()
+        self.subtitle_label.configure(text=environment.prefix)
+
+        scan = self.registry.cached_scan(environment.prefix)
+        if scan is not None and not scan.error:
+            self.update_status(
+                f"{environment.name}: {len(scan.packages)} packages", "info"
+            )
+        else:
+            self.update_status(f"Switched to {environment.name}", "info")
+
     def create_buttons(self, parent, text, command, fg_color, hover_color):
         btn = customtkinter.CTkButton(
             parent,
@@ -96,6 +313,12 @@ class PackageManagerApp(customtkinter.CTk):
                 "#27ae60",
                 "#2ecc71",
             ),
+            (
+                "📄 Install Requirements",
+                functools.partial(self.show_requirements_dialog),
+                "#16a085",
+                "#1abc9c",
+            ),
             (
                 "📋 View Packages",
                 functools.partial(self.show_installed_packages_window),
@@ -120,6 +343,12 @@ class PackageManagerApp(customtkinter.CTk):
                 "#95a5a6",
                 "#7f8c8d",
             ),
+            (
+                "💾 Snapshots",
+                functools.partial(self.show_snapshot_menu),
+                "#8e44ad",
+                "#9b59b6",
+            ),
         ]
 
         for text, command, fg_color, hover_color in primary_buttons:
@@ -165,6 +394,74 @@ class PackageManagerApp(customtkinter.CTk):
         )
         self.status_label.pack(side="left")
 
+        # cancel whatever uv commands are currently running
+        self.cancel_button = customtkinter.CTkButton(
+            status_frame,
+            text="⛔",
+            width=36,
+            height=30,
+            corner_radius=8,
+            fg_color="transparent",
+            hover_color=("#d5dbdb", "#34495e"),
+            command=self.cancel_running_commands,
+        )
+        self.cancel_button.place(relx=1.0, rely=0.5, x=-10, anchor="e")
+
+        # latency of recent commands and UI updates
+        self.performance_button = customtkinter.CTkButton(
+            status_frame,
+            text="📈",
+            width=36,
+            height=30,
+            corner_radius=8,
+            fg_color="transparent",
+            hover_color=("#d5dbdb", "#34495e"),
+            command=self.show_performance_window,
+        )
+        self.performance_button.place(relx=0.0, rely=0.5, x=10, anchor="w")
+
+        # queued, running and finished operations
+        self.jobs_button = customtkinter.CTkButton(
+            status_frame,
+            text="📋",
+            width=36,
+            height=30,
+            corner_radius=8,
+            fg_color="transparent",
+            hover_color=("#d5dbdb", "#34495e"),
+            command=self.show_jobs_window,
+        )
+        self.jobs_button.place(relx=0.0, rely=0.5, x=50, anchor="w")
+
+        # live progress of the running uv command, built on first use
+        self.status_frame = status_frame
+        self.progress_bar = None
+
+    def cancel_running_commands(self):
+        """Cancel every queued and running job and kill every uv command"""
+
+        jobs = JobScheduler.default().cancel_all()
+        running = CommandEngine.default().running()
+
+        if not jobs and not running:
+            self.update_status("Nothing to cancel", "info")
+            return
+
+        CommandEngine.default().cancel_all()
+        self.update_status(
+            f"Cancelled {jobs} job(s) and {running} running command(s)", "warning"
+        )
+
+    def show_performance_window(self):
+        from pkgr.gui.performance_window import PerformanceWindow
+
+        PerformanceWindow(self)
+
+    def show_jobs_window(self):
+        from pkgr.gui.jobs_window import JobsWindow
+
+        JobsWindow(self)
+
     def update_status(self, message, status_type="info"):
         """Update the status label"""
 
@@ -181,7 +478,24 @@ class PackageManagerApp(customtkinter.CTk):
         self.status_icon.configure(text=icon)
         self.status_label.configure(text=message)
 
-        self.update()
+    def update_progress(self, fraction):
+        """Show the progress bar at fraction (0..1), hide it when None"""
+
+        if fraction is None:
+            if self.progress_bar is not None:
+                self.progress_bar.place_forget()
+            return
+
+        if self.progress_bar is None:
+            self.progress_bar = customtkinter.CTkProgressBar(
+                self.status_frame, height=4, corner_radius=2
+            )
+
+        self.progress_bar.set(fraction)
+        self.progress_bar.place(relx=0.05, rely=1.0, y=-6, relwidth=0.9, anchor="sw")
+
+    def update_progress_ui(self, fraction):
+        self.ui.post(self.update_progress, fraction, key="progress")
 
     def show_input_dialog(self, operation):
         """show input dialog for package operations"""
@@ -193,17 +507,157 @@ class PackageManagerApp(customtkinter.CTk):
         }
 
         dialog = customtkinter.CTkInputDialog(
-            text=f"Enter the package name to {operation}:",
+            text=f"Enter the package names to {operation} (separated by spaces or commas):",
             title=dialog_titles.get(operation, "package operation"),
         )
 
-        package_name = dialog.get_input()
+        package_names = dialog.get_input()
+
+        if package_names:
+            names = [name for name in re.split(r"[,\s]+", package_names) if name]
+
+            if names:
+                self.execute_package_operation(
+                    operation, names[0] if len(names) == 1 else names
+                )
+
+    def show_requirements_dialog(self):
+        """Pick a requirements file and install it in one go"""
+
+        from tkinter import filedialog
+
+        path = filedialog.askopenfilename(
+            title="📄 Select requirements file",
+            filetypes=[("Requirements", "*.txt *.in"), ("All files", "*.*")],
+        )
+
+        if path:
+            self.execute_package_operation("install", [], requirements_file=path)
+
+    def submit_job(
+        self, description, run, key=None, mutating=True, environment=None
+    ):
+        """
+        Queue run on the JobScheduler for the current environment.
+
+        The job keeps targeting this environment even if another one is
+        selected before it starts. Identical requests (same key) that are
+        still queued or running are merged instead of run twice.
+        environment, a (prefix, python) pair, targets another environment,
+        e.g. the one a package window was opened for.
+        """
 
-        if package_name:
-            self.execute_package_operation(operation, package_name.strip())
+        prefix, python = environment or PackageManager.current_environment()
+
+        def run_job():
+            try:
+                with PackageManager.targeting(prefix, python):
+                    return run()
+            finally:
+                if mutating:
+                    self.ui.post(self.refresh_prefetched, key="refresh_prefetched")
+
+        job = JobScheduler.default().submit(
+            description, run_job, environment=prefix, mutating=mutating, key=key
+        )
+
+        if job.coalesced:
+            self.update_status(f"'{job.description}' is already {job.state}", "info")
+        elif job.state == QUEUED:
+            waiting = JobScheduler.default().pending(prefix) - 1
+            self.update_status(
+                f"Queued '{description}' behind {waiting} job(s)", "loading"
+            )
+
+        return job
+
+    def show_snapshot_menu(self):
+        menu = Menu(self, tearoff=0)
+        menu.add_command(label="💾 Export snapshot…", command=self.export_snapshot)
+        menu.add_command(label="♻️ Restore snapshot…", command=self.restore_snapshot)
+        menu.tk_popup(self.winfo_pointerx(), self.winfo_pointery())
+
+    def export_snapshot(self):
+        """Write every installed package, pinned, to a lock file"""
+
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(
+            title="💾 Export snapshot",
+            initialfile="pkgr-lock.txt",
+            defaultextension=".txt",
+            filetypes=[("Lock files", "*.txt"), ("All files", "*.*")],
+        )
+
+        if not path:
+            return
+
+        def export():
+            snapshot = PackageManager.snapshot_environment()
+            snapshot.save(path)
+            self.update_status_ui(
+                f"Exported {len(snapshot.packages)} packages to {path}", "success"
+            )
+
+        self.submit_job(f"export snapshot to {path}", export, mutating=False)
+
+    def restore_snapshot(self, preview_lines=20):
+        """Make the environment match a lock file with a single uv pip sync"""
+
+        from tkinter import filedialog
+
+        from pkgr.core.snapshots import Snapshot, diff_snapshots
+
+        path = filedialog.askopenfilename(
+            title="♻️ Restore snapshot",
+            filetypes=[("Lock files", "*.txt"), ("All files", "*.*")],
+        )
+
+        if not path:
+            return
+
+        try:
+            target = Snapshot.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("❌ Error", f"Can not read {path}:\n{e}")
+            return
+
+        def restore():
+            diff = diff_snapshots(PackageManager.snapshot_environment(), target)
+
+            if not diff:
+                self.update_status_ui("The environment already matches", "success")
+                return
+
+            lines = diff.lines()
+            if len(lines) > preview_lines:
+                more = len(lines) - preview_lines
+                lines = lines[:preview_lines] + [f" … and {more} more"]
+
+            if not self.ask_confirmation(
+                f"Sync with {path}: {diff.describe()}\n\n" + "\n".join(lines)
+            ):
+                self.update_status_ui("Restore cancelled", "info")
+                return
+
+            self.update_status_ui(f"Syncing with {path}....", "loading")
+            success, message, _ = PackageManager.sync_environment(path)
+
+            if success:
+                self.update_status_ui(f"Restored: {diff.describe()}", "success")
+                self.show_info_win(f"Restored {path}\n\n{diff.describe()}")
+            else:
+                self.update_status_ui("Restore failed", "error")
+                self.show_err_win(f"Failed to sync with {path}\n{message}")
+
+        self.submit_job(f"restore {path}", restore, key=("sync", path))
+
+    def execute_package_operation(self, operation, package_name, requirements_file=None):
+        names = [package_name] if isinstance(package_name, str) else list(package_name)
 
-    def execute_package_operation(self, operation, package_name):
         def run_operation():
+            from pkgr.core.base_operation import Operations
+
             try:
                 Operations(
                     package_name,
@@ -211,80 +665,169 @@ class PackageManagerApp(customtkinter.CTk):
                     self.update_status_ui,
                     self.show_info_win,
                     self.show_err_win,
-                    self.update_status,
+                    self.reset_status_ui,
+                    requirements_file=requirements_file,
+                    update_progress_ui=self.update_progress_ui,
+                    confirm=self.ask_confirmation,
                 )
             except Exception as e:
-                print(e)
+                logger.error(f"Error running {operation}: {e}")
+                self.update_status_ui(f"Failed to {operation}", "error")
 
-        threading.Thread(target=run_operation, daemon=True).start()
+        self.submit_job(
+            f"{operation} {', '.join(names) or requirements_file}",
+            run_operation,
+            key=(operation, tuple(sorted(names)), requirements_file),
+        )
 
     def show_info_win(self, message):
-        # run command in the main thread using self.after
-        self.after(0, lambda: messagebox.showinfo("Info", message))
+        # the dispatcher runs it on the main thread
+        self.ui.post(messagebox.showinfo, "Info", message)
 
     def show_err_win(self, message):
-        self.after(0, lambda: messagebox.showerror("Error", message))
+        self.ui.post(messagebox.showerror, "Error", message)
+
+    def ask_confirmation(self, message):
+        """Ask a yes/no question from a worker thread and wait for the answer"""
+
+        answer = {}
+        answered = threading.Event()
+
+        def ask():
+            try:
+                answer["yes"] = messagebox.askyesno("📦 Confirm changes", message)
+            finally:
+                answered.set()
+
+        self.ui.post(ask)
+        answered.wait()
+
+        return answer.get("yes", False)
 
     def update_status_ui(self, message, status_type="info"):
-        self.after(0, lambda: self.update_status(message, status_type))
+        """update_status from any thread, only the latest status of a frame is drawn"""
+
+        self.ui.post(self.update_status, message, status_type, key="status")
+
+    def reset_status_ui(self, message, status_type="info"):
+        """
+        update_status from any thread, after everything posted before it
+
+        Unlike update_status_ui it does not replace a pending status, so a
+        result stays shown until the dialog reporting it was closed.
+        """
+
+        self.ui.post(self.update_status, message, status_type)
 
     def show_installed_packages_window(self):
         """Display a window with installed packages"""
 
-        try:
-            self.update_status("Loading installed packages....", "loading")
+        from pkgr.gui.packages_window import PackageWindow
 
-            packages = PackageManager.get_installed_packages()
+        key, _ = self.prefetch_keys()
 
-            if not packages:
-                messagebox.showinfo(
-                    "⚠️ Warning", "No packages found or failed to retrieve package list"
-                )
-                self.update_status("Ready to manage packages", "info")
+        # the window shows the rows as they arrive
+        window = PackageWindow(
+            parent=self,
+            window_type="installed",
+            packages=None,
+            columns=["#", "package_name", "version", "size"],
+            title="📋 Installed Packages",
+        )
 
-                return
+        def show(result):
+            try:
+                packages = result.value
 
-            PackageWindow(
-                parent=self,
-                window_type="installed",
-                packages=packages,
-                columns=["#", "package_name", "version"],
-                title="📋 Installed Packages",
-            )
-            self.update_status(f"Found {len(packages)} installed packages", "info")
+                if not packages:
+                    window.window.destroy()
+                    messagebox.showinfo(
+                        "⚠️ Warning",
+                        "No packages found or failed to retrieve package list",
+                    )
+                    self.update_status("Ready to manage packages", "info")
+                    self.prefetcher.invalidate(key)
 
-        except Exception as e:
-            print(e)
+                    return
+
+                age = describe_age(result.age)
+                window.finish_loading(
+                    packages, f"📋 Installed Packages (updated {age})"
+                )
+                self.update_status(
+                    f"Found {len(packages)} installed packages ({age})", "info"
+                )
+
+            except Exception as e:
+                logger.error(f"Error showing installed packages: {e}")
+                if window.window.winfo_exists():
+                    window.window.destroy()
+                self.prefetcher.invalidate(key)
+                self.update_status("Failed to load installed packages", "error")
+
+        self.open_when_ready(
+            key,
+            PackageManager.stream_installed_packages,
+            show,
+            "Loading installed packages....",
+            window=window,
+        )
 
     def show_outdated_package_window(self):
         """Display a window with outdated packages"""
 
-        def load_outdated():
+        from pkgr.gui.packages_window import PackageWindow
+
+        _, key = self.prefetch_keys()
+
+        window = PackageWindow(
+            window_type="outdated",
+            packages=None,
+            parent=self,
+            columns=[
+                "#",
+                "Package Name",
+                "Current Version",
+                "Latest Version",
+                "Update",
+            ],
+            title="⚠️ Outdated Packages",
+        )
+
+        def show(result):
             try:
-                self.update_status("Checking for outdated packages.....", "loading")
-                packages = PackageManager.get_outdated_packages()
+                if result.error:
+                    raise RuntimeError(result.error)
+
+                packages = result.value
+                age = describe_age(result.age)
 
                 if not packages:
-                    self.update_status("All packages are up to date! ", "success")
+                    window.window.destroy()
+                    self.update_status(
+                        f"All packages are up to date! ({age})", "success"
+                    )
                     messagebox.showinfo("ℹ️ Info", "All packages are up to date!")
 
                     return
 
-                PackageWindow(
-                    window_type="outdated",
-                    packages=packages,
-                    parent=self,
-                    columns=["#", "Package Name", "Current Version", "Latest Version"],
-                    title="⚠️ Outdated Packages",
-                )
+                window.finish_loading(packages, f"⚠️ Outdated Packages (checked {age})")
 
                 self.update_status(
-                    f"Found {len(packages)} outdated packages", "warning"
+                    f"Found {len(packages)} outdated packages ({age})", "warning"
                 )
             except Exception as e:
+                window.window.destroy()
+                self.prefetcher.invalidate(key)
                 error_msg = f"Failed to check outdated packages: {str(e)}"
                 messagebox.showerror("❌ Error", error_msg)
 
                 self.update_status("Failed to check updates", "error")
 
-        load_outdated()
+        self.open_when_ready(
+            key,
+            PackageManager.stream_outdated_packages,
+            show,
+            "Checking for outdated packages.....",
+            window=window,
+        )
@@ -1,8 +1,8 @@
 import site
 import os
 import subprocess
-import threading
 import platform
+from collections import deque
 from pathlib import Path
 
 from customtkinter import (
@@ -21,10 +21,37 @@ from tkinter import ttk
 from tkinter import messagebox, Menu
 
 
+from pkgr.core.installed_index import normalize_name
+from pkgr.core.metadata_store import format_size
 from pkgr.core.package_manager import PackageManager
+from pkgr.core.search_index import SearchIndex
+from pkgr.core.telemetry import span
+from pkgr.core.versions import parse_version
+from pkgr.core.watcher import apply_to_installed, apply_to_outdated
+from pkgr.gui.virtual_tree import VirtualTreeview
+
+
+# above this many rows the Treeview only materializes the visible rows
+VIRTUALIZE_THRESHOLD = 1000
+ROW_HEIGHT = 24
+
+# wait for a pause in typing before filtering
+SEARCH_DEBOUNCE_MS = 150
+
+# Treeview items inserted per event-loop turn while the list is loading
+ROWS_PER_TURN = 200
 
 
 class PackageWindow:
+    """
+    Treeview of installed or outdated packages.
+
+    The window opens before its list is known. Rows handed to
+    append_packages() are inserted a few at a time over the following
+    event-loop turns, finish_loading() then swaps in the complete list.
+    Passing packages to the constructor does both at once.
+    """
+
     def __init__(
         self,
         window_type: str,
@@ -34,26 +61,93 @@ class PackageWindow:
         title: str,
     ):
         self.parent = parent
-        self.packages = packages
+        self.packages = []
 
         self.columns = columns
         self.window_type = window_type
         self.title = title
 
         # search variables
+        self.search_index = None
+        self.indexed_packages = None
+        self._filter_job = None
         self.search_var = StringVar()
         self.search_var.trace_add("write", self.filter_packages)
 
+        # {name: summary} for the search, read off the Tk thread
+        self.summaries = {}
+        # {normalized name: bytes}, filled when the window has a size column
+        self.sizes = {}
+        self.sort_column = None
+        self.sort_reverse = False
+
+        # rows waiting for their turn to be inserted
+        self.loading = True
+        self._pending = deque()
+        self._complete = None
+        self._insert_job = None
+        self._stale = False
+
         self.package_folder = self.get_packages_dir()
 
         self.create_window()
 
+        # the environment the window lists, whichever one is selected later
+        self.environment = PackageManager.current_environment()
+        self.watcher = PackageManager.watcher()
+
+        # keep the rows current when packages change on disk
+        self._unsubscribe = self.watcher.subscribe(self.on_packages_changed)
+        self.window.bind("<Destroy>", lambda _: self._unsubscribe(), add="+")
+
+        if packages is not None:
+            self.finish_loading(packages)
+
+    def post(self, callback, *args):
+        """Run callback on the Tk thread, unless the window was closed by then"""
+
+        def run():
+            if self.window.winfo_exists():
+                callback(*args)
+
+        self.parent.ui.post(run)
+
+    def submit_job(self, description, run, key=None, mutating=True):
+        """Queue run as a job on the environment this window lists"""
+
+        self.parent.submit_job(
+            description, run, key=key, mutating=mutating, environment=self.environment
+        )
+
+    def on_packages_changed(self, delta):
+        """Called from the watcher thread"""
+
+        self.post(self.apply_delta, delta)
+
+    def apply_delta(self, delta):
+        """Update only the rows of packages that were added, removed or changed"""
+
+        if self.loading:
+            # the list still loading may or may not include the change
+            self._stale = True
+            return
+
+        if self.window_type == "installed":
+            self.packages = apply_to_installed(self.packages, delta)
+        elif self.window_type == "outdated":
+            self.packages = apply_to_outdated(self.packages, delta)
+
+        self.packages = self.sorted_packages(self.packages)
+
+        self.apply_filter()
+        self.reload_details()
+
     def create_window(self):
         """Create a new window for handle packages"""
 
         self.window = CTkToplevel(self.parent)
 
-        self.window.title(self.title)
+        self.window.title(f"{self.title} · loading…")
 
         self.window.geometry("750x550")
 
@@ -145,7 +239,7 @@ class PackageWindow:
         txt_box.pack(fill="both", expand=True, padx=10, pady=10)
 
         for key, value in details.items():
-            txt_box.insert("end", f"{key}:{value}\n\n")
+            txt_box.insert("end", f"{key}: {value.strip()}\n\n")
 
         txt_box.configure(state="disabled")
 
@@ -179,6 +273,7 @@ class PackageWindow:
             fieldbackground="#34495e",
             borderwidth=0,
             font=("Segoe UI", 10),
+            rowheight=ROW_HEIGHT,
         )
 
         style.configure(
@@ -190,11 +285,15 @@ class PackageWindow:
 
         # create the treeview
         self.treeview = ttk.Treeview(
-            tree_container, columns=self.columns, show="headings", style="Treeview"
+            tree_container,
+            columns=self.columns,
+            show="headings",
+            style="Treeview",
+            selectmode="extended",
         )
 
         for i, col in enumerate(self.columns):
-            self.treeview.heading(col, text=col)
+            self.treeview.heading(col, text=col, command=lambda c=col: self.sort_by(c))
 
             self.treeview.column(col, width=50, anchor="center")
 
@@ -216,37 +315,325 @@ class PackageWindow:
         self.treeview.pack(side="left", fill="both", padx=10, pady=10, expand=True)
         scrollbar.pack(side="left", fill="y", pady=10)
 
-        # add items to treeview
-
-        self.populate_treeview(self.packages)
+        self.scrollbar = scrollbar
+        self.items = []
+        self.rows = []
+        self.shown = None
+        self.virtual = None
 
         self.treeview.bind("<Button-3>", self.show_context_menu)
 
-    def populate_treeview(self, packages: list[tuple]):
-        # clear existing items
+    def virtualize(self):
+        """Switch to a virtualized Treeview once the list grows past the threshold"""
+
+        if self.items:
+            self.treeview.delete(*self.items)
+            self.items = []
+
+        self.virtual = VirtualTreeview(
+            self.treeview, self.scrollbar, row_height=ROW_HEIGHT
+        )
+        self.virtual.set_rows(list(self.rows))
+
+    def append_packages(self, packages: list[tuple]):
+        """Queue rows that arrived while loading, they show up over the next turns"""
+
+        if not self.window.winfo_exists():
+            return
+
+        self._pending.extend(packages)
+        self._schedule_insert()
+
+    def restart_loading(self):
+        """Drop the rows streamed so far, the query sending them was restarted"""
+
+        if not self.window.winfo_exists():
+            return
+
+        self._pending.clear()
+        self.packages = []
+        self.rows = []
+
+        if self.virtual is not None:
+            self.virtual.set_rows([])
+        elif self.items:
+            self.treeview.delete(*self.items)
+            self.items = []
+
+    def finish_loading(self, packages: list[tuple], title: str = None):
+        """
+        Show the complete list once the rows queued before it are inserted.
+
+        Args:
+            packages: The complete list, it replaces the rows appended so far
+            title: New window title
+        """
+
+        if not self.window.winfo_exists():
+            return
+
+        if not self.rows and not self._pending:
+            # nothing was streamed, the first turns show the list all the same
+            self._pending.extend(packages)
+
+        if title is not None:
+            self.title = title
+
+        self._complete = packages
+        self._schedule_insert()
+
+    def _schedule_insert(self):
+        if self._insert_job is None:
+            # after() rather than after_idle() lets Tk draw between two turns
+            self._insert_job = self.window.after(1, self._insert_pending)
+
+    def _insert_pending(self):
+        self._insert_job = None
+
+        if not self.window.winfo_exists():
+            return
+
+        if self.virtual is None and (
+            len(self.rows) + len(self._pending) > VIRTUALIZE_THRESHOLD
+        ):
+            self.virtualize()
+
+        # a virtualized Treeview only draws the visible rows, take them all
+        count = len(self._pending)
+        if self.virtual is None:
+            count = min(count, ROWS_PER_TURN)
+
+        with span("ui:append_rows", rows=count):
+            start = len(self.rows) + 1
+            batch = [self._pending.popleft() for _ in range(count)]
+            rows = [(i, *pkg) for i, pkg in enumerate(batch, start)]
+            if "size" in self.columns:
+                rows = [(*row, "") for row in rows]
+
+            self.packages.extend(batch)
+            self.rows.extend(rows)
+
+            if self.virtual is not None:
+                self.virtual.extend_rows(rows)
+            else:
+                self.items.extend(
+                    self.treeview.insert(parent="", index="end", values=row)
+                    for row in rows
+                )
+
+        if self._pending:
+            self.window.title(f"{self.title} · loading {len(self.rows)}…")
+            self._schedule_insert()
+        elif self._complete is not None:
+            packages, self._complete = self._complete, None
+            self.load_details(packages)
+
+    def load_details(self, packages: list[tuple]):
+        """Read summaries and sizes off the Tk thread, then show the complete list"""
+
+        def load():
+            details = self.read_details()
+            self.post(self.show_loaded, packages, details)
+
+        self.submit_job(
+            f"index {self.window_type} packages",
+            load,
+            key=("index", self.window_type, id(self)),
+            mutating=False,
+        )
+
+    def show_loaded(self, packages: list[tuple], details):
+        self.loading = False
+        self.window.title(self.title)
+
+        self.packages = self.sorted_packages(packages)
+        self.populate_treeview(self.packages, details)
+        self.apply_filter()
+
+        if self._stale:
+            self._stale = False
+            self.refresh_package()
+
+    def reload_details(self):
+        """Read summaries and sizes again after the package list changed"""
+
+        def load():
+            details = self.read_details()
+            self.post(self.show_details, details)
+
+        self.submit_job(
+            f"index {self.window_type} packages",
+            load,
+            key=("details", self.window_type, id(self)),
+            mutating=False,
+        )
+
+    def show_details(self, details):
+        # the complete list reads its own details once it arrives
+        if self.loading:
+            return
+
+        # rows shown meanwhile used the previous details, build them again
+        self.indexed_packages = None
+        self.populate_treeview(self.packages, details)
+        self.apply_filter()
+
+    def read_details(self) -> tuple[dict[str, str], dict[str, int]]:
+        """(summaries, sizes) of the installed packages, sizes only when shown"""
+
+        summaries = PackageManager.get_package_summaries()
+        sizes = PackageManager.get_package_sizes() if "size" in self.columns else {}
+
+        return summaries, sizes
+
+    def populate_treeview(self, packages: list[tuple], details=None):
+        """
+        Build the rows and the search index for a new package list
+
+        Args:
+            packages: The rows to show
+            details: read_details() result, the last one read when None
+        """
+
+        with span("ui:populate_treeview", rows=len(packages)):
+            summaries, sizes = details or (self.summaries, self.sizes)
+
+            self.summaries = summaries
+            self.search_index = SearchIndex([pkg[0] for pkg in packages], summaries)
+            self.indexed_packages = packages
+            rows = [(i, *pkg) for i, pkg in enumerate(packages, 1)]
+
+            if "size" in self.columns:
+                self.sizes = sizes
+                rows = [
+                    (*row, format_size(self.sizes.get(normalize_name(row[1]), 0)))
+                    for row in rows
+                ]
+                total = format_size(sum(self.sizes.values()))
+                self.window.title(f"{self.title} · {total}")
+
+            if self.virtual is not None:
+                self.rows = rows
+                self.shown = list(range(len(rows)))
+                self.virtual.set_rows(rows)
+                return
+
+            # reuse the items of packages already listed so that a change only
+            # touches the rows that differ, filtering later detaches/reattaches them
+
+            previous = {row[1]: (item, row) for item, row in zip(self.items, self.rows)}
+            items = []
+
+            for row in rows:
+                item, old_row = previous.pop(row[1], (None, None))
+
+                if item is None:
+                    item = self.treeview.insert(parent="", index="end", values=row)
+                elif old_row != row:
+                    self.treeview.item(item, values=row)
+
+                items.append(item)
+
+            if previous:
+                self.treeview.delete(*(item for item, _ in previous.values()))
 
-        for item in self.treeview.get_children():
-            self.treeview.delete(item)
+            self.items = items
+            self.rows = rows
+            # reused items may be out of order, let show_rows reorder them
+            self.shown = None
 
-        # insert packages
+    def sort_by(self, column):
+        """Sort the rows by a column, clicking it again reverses the order"""
 
-        for i, pkg in enumerate(packages, 1):
-            self.treeview.insert(parent="", index="end", values=(i, *pkg))
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            # the largest packages are the interesting ones
+            self.sort_reverse = column == "size"
+
+        # the complete list is sorted when it arrives
+        if self.loading:
+            return
+
+        self.packages = self.sorted_packages(self.packages)
+        self.apply_filter()
+
+    def sorted_packages(self, packages):
+        """packages ordered by the current sort column"""
+
+        column = self.sort_column
+        if column is None or column not in self.columns[1:]:
+            return packages
+
+        if column == "size":
+            sizes = self.sizes
+
+            def key(pkg):
+                return sizes.get(normalize_name(pkg[0]), 0)
+
+        else:
+            position = self.columns.index(column) - 1
+
+            def key(pkg):
+                value = pkg[position]
+                if position == 0:
+                    return normalize_name(value)
+                version = parse_version(value)
+                # versions compare as versions, anything else as text
+                return (0, version) if version is not None else (1, value)
+
+        return sorted(packages, key=key, reverse=self.sort_reverse)
 
     def filter_packages(self, *_):
-        """Filter packages based on search input"""
+        """Filter packages based on search input once typing pauses"""
+
+        if self._filter_job is not None:
+            self.window.after_cancel(self._filter_job)
 
-        query = self.search_var.get().lower().strip()
+        self._filter_job = self.window.after(SEARCH_DEBOUNCE_MS, self.apply_filter)
 
-        self.filtered_packages = [pkg for pkg in self.packages if query in pkg[0]]
+    def apply_filter(self):
+        self._filter_job = None
 
-        self.populate_treeview(self.filtered_packages)
+        # the search text is applied once the complete list is shown
+        if self.loading:
+            return
+
+        if self.indexed_packages is not self.packages:
+            self.populate_treeview(self.packages)
+
+        with span("ui:filter", rows=len(self.packages)) as timing:
+            indices = self.search_index.search(self.search_var.get())
+
+            self.filtered_packages = [self.packages[i] for i in indices]
+
+            self.show_rows(indices)
+            timing.set(shown=len(indices))
+
+    def show_rows(self, indices: list[int]):
+        """Show only the given rows, touching the Treeview as little as possible"""
+
+        if indices == self.shown:
+            return
+
+        self.shown = indices
+
+        if self.virtual is not None:
+            self.virtual.set_rows([self.rows[i] for i in indices])
+            return
+
+        # one Tk call detaches the hidden rows and reattaches the visible ones
+        self.treeview.set_children("", *(self.items[i] for i in indices))
 
     def show_context_menu(self, event):
         row = self.treeview.identify_row(event.y)
         if not row:
             return
-        self.treeview.selection_set(row)
+
+        # keep a multi-row selection when right clicking inside it
+        if row not in self.treeview.selection():
+            self.treeview.selection_set(row)
 
         menu = Menu(self.window, tearoff=0)
         menu.add_command(
@@ -280,17 +667,31 @@ class PackageWindow:
 
         return self.treeview.item(selection)["values"][1]
 
+    def get_selected_packages(self):
+        """Names of every selected row"""
+
+        if self.virtual is not None:
+            rows = self.virtual.selected_rows()
+        else:
+            rows = [self.treeview.item(item)["values"] for item in self.treeview.selection()]
+
+        if not rows:
+            messagebox.showerror("❌ Error", "No package selected")
+            return []
+
+        return [str(row[1]) for row in rows]
+
     def copy_package_name(self):
         """Copy selected item to clipboard"""
 
-        name = self.get_selected_package()
-        if name:
+        names = self.get_selected_packages()
+        if names:
             self.window.clipboard_clear()
 
-            self.window.clipboard_append(name)
+            self.window.clipboard_append("\n".join(names))
 
             messagebox.showinfo(
-                "📋 Copied", f"Package name '{name}' copied to clipboard"
+                "📋 Copied", f"Package name '{', '.join(names)}' copied to clipboard"
             )
 
     def open_package_location(self):
@@ -301,9 +702,18 @@ class PackageWindow:
         if not name:
             return
 
-        package_details = PackageManager.get_packages_details(name)
+        def locate():
+            package_details = PackageManager.get_packages_details(name)
+            self.post(self.open_location, name, package_details)
+
+        self.submit_job(
+            f"locate {name}", locate, key=("locate", name), mutating=False
+        )
+
+    def open_location(self, name, package_details):
+        """Open the directory of name, package_details from get_packages_details()"""
 
-        location = package_details.get("Location", None)
+        location = package_details.get("Location", None) if package_details else None
 
         if not location:
             return
@@ -327,99 +737,191 @@ class PackageWindow:
             messagebox.showerror("Error", f"Failed to open directory:\n{e}")
 
     def uninstall_from_menu(self):
-        """Uninstall package from context menu"""
+        """Uninstall the selected packages from context menu"""
 
-        name = self.get_selected_package()
+        names = self.get_selected_packages()
 
-        if not name:
+        if not names:
             return
 
-        if messagebox.askyesno(
+        name = ", ".join(names)
+
+        def check():
+            # the dependency graph may sync the metadata store, keep it off Tk
+            impact = self.describe_removal_impact(names)
+            self.post(self.confirm_uninstall, names, impact)
+
+        self.parent.update_status(f"Checking what depends on {name}....", "loading")
+        self.submit_job(
+            f"check removal of {name}",
+            check,
+            key=("removal impact", tuple(sorted(names))),
+            mutating=False,
+        )
+
+    def confirm_uninstall(self, names, impact):
+        """Ask before uninstalling names, impact is describe_removal_impact()"""
+
+        name = ", ".join(names)
+
+        if not messagebox.askyesno(
             "🗑️ Confirm Uninstall",
-            f"Are you sure you want to uninstall '{name}'?",
+            f"Are you sure you want to uninstall '{name}'?" + impact,
         ):
+            self.parent.update_status("Ready to manage packages", "info")
+            return
+
+        def uninstall():
             try:
-                self.parent.update_status(f"Uninstalling {name}", "loading")
-                success, msg = PackageManager.uninstall_package(name)
+                success, msg, _ = PackageManager.uninstall_packages(names)
 
                 if success:
-                    self.parent.update_status(
+                    self.parent.update_status_ui(
                         f"package {name} uninstalled successfully", "success"
                     )
                 else:
-                    self.parent.update_status(
+                    self.parent.update_status_ui(
                         f"Failed to uninstall {name}:{msg}", "error"
                     )
             except Exception as e:
-                self.parent.update_status(
+                self.parent.update_status_ui(
                     f"Error uninstalling {name}: {str(e)}", "error"
                 )
 
+        self.parent.update_status(f"Uninstalling {name}", "loading")
+        self.submit_job(
+            f"uninstall {name}",
+            uninstall,
+            key=("uninstall", tuple(sorted(names)), None),
+        )
+
+    def describe_removal_impact(self, names, limit=15):
+        """Text listing the installed packages that break if names are removed"""
+
+        graph = PackageManager.get_dependency_graph()
+
+        if graph is None:
+            return ""
+
+        impact = graph.removal_impact(names)
+
+        if not impact:
+            return "\n\nNo other installed package depends on it."
+
+        lines = [
+            f"  • {broken} (needs {', '.join(causes)})"
+            for broken, causes in list(impact.items())[:limit]
+        ]
+        if len(impact) > limit:
+            lines.append(f"  … and {len(impact) - limit} more")
+
+        return (
+            f"\n\n⚠️ {len(impact)} installed package(s) depend on it and may break:\n"
+            + "\n".join(lines)
+        )
+
     def show_package_details(self):
         name = self.get_selected_package()
 
         if not name:
             return
 
-        package_details = PackageManager.get_packages_details(name)
+        def read():
+            package_details = PackageManager.get_packages_details(name)
 
-        if not package_details:
-            messagebox.showerror("❌ Error", "Failed to get package details")
-            return
+            if not package_details:
+                self.post(
+                    messagebox.showerror, "❌ Error", "Failed to get package details"
+                )
+                return
 
-        self.show_package_details_window(package_details)
+            self.post(self.show_package_details_window, package_details)
+
+        self.submit_job(
+            f"read details of {name}", read, key=("show details", name), mutating=False
+        )
 
     def update_from_menu(self):
-        name = self.get_selected_package()
+        names = self.get_selected_packages()
 
-        if not name:
+        if not names:
             return
 
+        name = ", ".join(names)
+
         if messagebox.askyesno(
             "⬆️ Confirm Upgrade",
             f"Are you sure you want to upgrade '{name}'to the latest version?",
         ):
-            success, message = PackageManager.upgrade_package(name)
-            if success:
-                messagebox.showinfo("✅ Success", message)
-            else:
-                messagebox.showerror("❌ Error", message)
+
+            def upgrade():
+                success, message, results = PackageManager.install_packages(
+                    names, upgrade=True
+                )
+                if success:
+                    message = "\n".join(
+                        f"{pkg}: {result}" for pkg, result in results.items()
+                    )
+                    self.parent.show_info_win(message)
+                else:
+                    self.parent.show_err_win(message)
+
+            self.submit_job(
+                f"upgrade {name}",
+                upgrade,
+                key=("upgrade", tuple(sorted(names)), None),
+            )
+
+    def show_refreshed(self, packages):
+        if self.window_type == "outdated" and not packages:
+            messagebox.showinfo("ℹ️ Info", "All packages are now up to date!")
+            self.window.destroy()
+            return
+
+        self.packages = self.sorted_packages(packages)
+        self.apply_filter()
+        self.reload_details()
+
+        messagebox.showinfo(
+            "✅ Success", f"{self.window_type.capitalize()} packages refreshed!"
+        )
 
     def refresh_package(self):
         """Refresh package list"""
 
+        if self.loading:
+            return
+
         def refresh():
             try:
-                if self.window_type == "installed":
-                    self.packages = PackageManager.get_installed_packages()
-
-                elif self.window_type == "outdated":
-                    self.packages = PackageManager.get_outdated_packages()
-
-                    if not self.packages:
-                        messagebox.showinfo(
-                            "ℹ️ Info", "All packages are now up to date!"
-                        )
-                        self.window.destroy()
-                        return
+                installed = self.window_type == "installed"
 
-                # update packages and refresh display
+                if installed and self.watcher.index.available():
+                    # the watcher pushes only the changed rows to open windows
+                    delta = self.watcher.check()
+                    self.post(
+                        messagebox.showinfo,
+                        "✅ Success",
+                        f"Installed packages refreshed ({delta.describe()})",
+                    )
+                    return
 
-                self.filter_packages()
+                if installed:
+                    packages = PackageManager.get_installed_packages()
+                else:
+                    packages = PackageManager.get_outdated_packages()
 
-                self.window.after(
-                    0,
-                    lambda: messagebox.showinfo(
-                        "✅ Success",
-                        f"{self.window_type.capitalize()} packages refreshed!",
-                    ),
-                )
+                # the rows are only touched on the Tk thread
+                self.post(self.show_refreshed, packages)
 
             except Exception as e:
                 error_msg = f"Failed to refresh package list: {str(e)}"
 
-                self.window.after(
-                    0, lambda: messagebox.showerror("❌ Error", error_msg)
-                )
+                self.post(messagebox.showerror, "❌ Error", error_msg)
 
-        threading.Thread(target=refresh, daemon=True).start()
+        self.submit_job(
+            f"refresh {self.window_type} packages",
+            refresh,
+            key=("refresh", self.window_type),
+            mutating=False,
+        )
@@ -0,0 +1,166 @@
+import time
+
+from customtkinter import (
+    CTkToplevel,
+    CTkFont,
+    CTkLabel,
+    CTkButton,
+    CTkFrame,
+)
+from tkinter import ttk
+
+from pkgr.core.telemetry import SpanRecorder
+
+
+REFRESH_MS = 2000
+RECENT_ROWS = 200
+
+STATS_COLUMNS = ["Operation", "Count", "p50 (ms)", "p95 (ms)", "Max (ms)", "Last (ms)"]
+RECENT_COLUMNS = ["Time", "Operation", "ms", "Exit code", "Output bytes", "Rows"]
+
+
+class PerformanceWindow:
+    """Latency of the recent uv commands, parse steps and Treeview updates"""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.recorder = SpanRecorder.default()
+        self._refresh_job = None
+
+        self.create_window()
+        self.refresh()
+
+    def create_window(self):
+        self.window = CTkToplevel(self.parent)
+
+        self.window.title("Performance")
+
+        self.window.geometry("800x600")
+
+        self.window.transient(self.parent)
+
+        self.window.configure(fg_color=("#f8f9fa", "#1a1a1a"))
+
+        main_container = CTkFrame(self.window, fg_color="transparent")
+        main_container.pack(fill="both", expand=True, padx=15, pady=15)
+
+        header_frame = CTkFrame(main_container, fg_color=("#ecf0f1", "#2c3e50"))
+        header_frame.pack(fill="x", pady=(0, 15))
+
+        self.summary_label = CTkLabel(
+            header_frame,
+            text="",
+            font=CTkFont(size=14, weight="bold"),
+        )
+        self.summary_label.pack(side="left", padx=15, pady=15)
+
+        clear_button = CTkButton(
+            header_frame,
+            text="🗑 Clear",
+            width=90,
+            command=self.clear,
+        )
+        clear_button.pack(side="right", padx=(5, 15), pady=15)
+
+        refresh_button = CTkButton(
+            header_frame,
+            text="🔄 Refresh",
+            width=90,
+            command=self.refresh,
+        )
+        refresh_button.pack(side="right", padx=5, pady=15)
+
+        self.stats_tree = self.create_treeview(main_container, STATS_COLUMNS, 10)
+        self.recent_tree = self.create_treeview(main_container, RECENT_COLUMNS, 12)
+
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+    def create_treeview(self, parent, columns, height):
+        tree_container = CTkFrame(
+            parent, fg_color=("#ffffff", "#2c3e50"), corner_radius=10
+        )
+        tree_container.pack(fill="both", expand=True, pady=(0, 10))
+
+        treeview = ttk.Treeview(
+            tree_container,
+            columns=columns,
+            show="headings",
+            style="Treeview",
+            height=height,
+        )
+
+        for i, col in enumerate(columns):
+            treeview.heading(col, text=col)
+            treeview.column(col, width=240 if i == 1 else 90, anchor="center")
+
+        scrollbar = ttk.Scrollbar(
+            tree_container,
+            orient="vertical",
+            command=treeview.yview,
+        )
+
+        treeview.configure(yscrollcommand=scrollbar.set)
+
+        treeview.pack(side="left", fill="both", padx=10, pady=10, expand=True)
+        scrollbar.pack(side="left", fill="y", pady=10)
+
+        return treeview
+
+    def refresh(self):
+        """Redraw both tables and schedule the next refresh"""
+
+        # a click on Refresh must not start a second redraw loop
+        self.cancel_refresh()
+
+        stats = self.recorder.stats()
+        recent = self.recorder.recent(RECENT_ROWS)
+
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        # slowest operations first
+        for name, stat in sorted(stats.items(), key=lambda s: -s[1]["p95_ms"]):
+            self.stats_tree.insert(
+                parent="",
+                index="end",
+                values=(
+                    name,
+                    stat["count"],
+                    f"{stat['p50_ms']:.1f}",
+                    f"{stat['p95_ms']:.1f}",
+                    f"{stat['max_ms']:.1f}",
+                    f"{stat['last_ms']:.1f}",
+                ),
+            )
+
+        self.recent_tree.delete(*self.recent_tree.get_children())
+        for entry in recent:
+            self.recent_tree.insert(
+                parent="",
+                index="end",
+                values=(
+                    time.strftime("%H:%M:%S", time.localtime(entry["ts"])),
+                    entry["name"],
+                    f"{entry['ms']:.1f}",
+                    entry.get("exit_code", ""),
+                    entry.get("output_bytes", ""),
+                    entry.get("rows", ""),
+                ),
+            )
+
+        self.summary_label.configure(
+            text=f"📈 {len(recent)} recent operations, {len(stats)} kinds"
+        )
+
+        self._refresh_job = self.window.after(REFRESH_MS, self.refresh)
+
+    def clear(self):
+        self.recorder.clear()
+        self.refresh()
+
+    def cancel_refresh(self):
+        if self._refresh_job is not None:
+            self.window.after_cancel(self._refresh_job)
+            self._refresh_job = None
+
+    def close(self):
+        self.cancel_refresh()
+        self.window.destroy()
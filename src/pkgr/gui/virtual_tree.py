@@ -0,0 +1,204 @@
+from tkinter import ttk
+
+
+class VirtualTreeview:
+    """
+    Virtualized list mode for a ttk.Treeview.
+
+    Only the rows in the visible window (plus a small overscan) exist as
+    Tk items. Scrolling recycles those items by rewriting their values, so
+    opening, scrolling and memory use stay flat however many rows there are.
+    Selection is tracked by row index so it survives scrolling.
+    """
+
+    def __init__(
+        self,
+        treeview: ttk.Treeview,
+        scrollbar: ttk.Scrollbar,
+        row_height: int = 24,
+        overscan: int = 4,
+    ):
+        self.treeview = treeview
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        self.overscan = overscan
+
+        self.rows: list[tuple] = []
+        self.offset = 0
+        self.visible = 20
+        self.pool: list[str] = []
+        self.selected: set[int] = set()
+        self.anchor = None
+
+        self._rendering = False
+
+        self.scrollbar.configure(command=self.yview)
+        self.treeview.configure(yscrollcommand=lambda *_: None)
+
+        self.treeview.bind("<Configure>", self._on_configure, add="+")
+        self.treeview.bind("<MouseWheel>", self._on_mousewheel)
+        self.treeview.bind("<Button-4>", lambda _: self.scroll(-3))
+        self.treeview.bind("<Button-5>", lambda _: self.scroll(3))
+        self.treeview.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        self.treeview.bind("<Up>", lambda _: self._move_selection(-1))
+        self.treeview.bind("<Down>", lambda _: self._move_selection(1))
+        self.treeview.bind("<Prior>", lambda _: self.scroll(-self.visible))
+        self.treeview.bind("<Next>", lambda _: self.scroll(self.visible))
+        self.treeview.bind("<Home>", lambda _: self.scroll_to(0))
+        self.treeview.bind("<End>", lambda _: self.scroll_to(len(self.rows)))
+
+    # data
+
+    def set_rows(self, rows: list[tuple]):
+        """Replace the rows being displayed and scroll back to the top."""
+
+        self.rows = rows
+        self.offset = 0
+        self.selected.clear()
+        self.anchor = None
+
+        self.render()
+
+    def extend_rows(self, rows: list[tuple]):
+        """Append rows, keeping the scroll position and the selection."""
+
+        self.rows.extend(rows)
+
+        # the pooled items only change while the window is not full yet
+        wanted = min(self.visible + self.overscan, len(self.rows) - self.offset)
+        if len(self.pool) < wanted:
+            self.render()
+        else:
+            self._update_scrollbar()
+
+    def row_for_item(self, item: str):
+        """Row index shown by a pooled Tk item, or None."""
+
+        try:
+            index = self.offset + self.pool.index(item)
+        except ValueError:
+            return None
+
+        return index if index < len(self.rows) else None
+
+    def selected_rows(self) -> list[tuple]:
+        """Values of every selected row, including rows scrolled out of view."""
+
+        return [self.rows[i] for i in sorted(self.selected) if i < len(self.rows)]
+
+    # scrolling
+
+    def yview(self, *args):
+        """Scrollbar command: handles 'moveto' and 'scroll' requests."""
+
+        if not args:
+            return
+
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible
+            self.scroll(amount)
+
+    def scroll(self, rows: int):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def scroll_to(self, offset: int):
+        offset = max(0, min(offset, len(self.rows) - self.visible))
+
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        else:
+            self._update_scrollbar()
+
+        return "break"
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+
+        return self.scroll(-3 * delta)
+
+    def _on_configure(self, event):
+        visible = max(1, event.height // self.row_height)
+
+        if visible != self.visible:
+            self.visible = visible
+            self.scroll_to(self.offset)
+            self.render()
+
+    # rendering
+
+    def render(self):
+        """Write the rows of the current window into the pooled items."""
+
+        wanted = min(self.visible + self.overscan, len(self.rows) - self.offset)
+        wanted = max(0, wanted)
+
+        self._rendering = True
+        try:
+            while len(self.pool) < wanted:
+                self.pool.append(self.treeview.insert("", "end", values=()))
+            while len(self.pool) > wanted:
+                self.treeview.delete(self.pool.pop())
+
+            selection = []
+            for i, item in enumerate(self.pool):
+                index = self.offset + i
+                self.treeview.item(item, values=self.rows[index])
+                if index in self.selected:
+                    selection.append(item)
+
+            self.treeview.selection_set(selection)
+            self.treeview.yview_moveto(0)
+        finally:
+            self._rendering = False
+
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+
+        if not total:
+            self.scrollbar.set(0, 1)
+            return
+
+        first = self.offset / total
+        last = min(1.0, (self.offset + self.visible) / total)
+        self.scrollbar.set(first, last)
+
+    def _on_select(self, _event):
+        if self._rendering:
+            return
+
+        # rows outside the window keep their state, visible rows follow Tk
+        window = range(self.offset, self.offset + len(self.pool))
+        self.selected = {i for i in self.selected if i not in window}
+
+        for item in self.treeview.selection():
+            row = self.row_for_item(item)
+            if row is not None:
+                self.selected.add(row)
+                self.anchor = row
+
+    def _move_selection(self, step: int):
+        if not self.rows:
+            return "break"
+
+        current = self.anchor if self.anchor is not None else self.offset - step
+        row = max(0, min(len(self.rows) - 1, current + step))
+
+        self.selected = {row}
+        self.anchor = row
+
+        if row < self.offset:
+            self.offset = row
+        elif row >= self.offset + self.visible:
+            self.offset = row - self.visible + 1
+
+        self.render()
+        return "break"
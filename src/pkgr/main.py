@@ -1,26 +1,35 @@
+import sys
 import logging
 
-from pkgr.gui.main_window import PackageManagerApp
+from pkgr import cli
+from pkgr.core.logs import setup_logging
+from pkgr.core.startup import StartupProfile
 
-from tkinter import messagebox
 
+logger = logging.getLogger(__name__)
 
-# configure logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=("%(asctime)s - %(levelname)s - %(message)s    "),
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler(),  # show in a console
-    ],
-)
+def main(argv=None):
+    # startup phases are timed from here
+    profile = StartupProfile.default()
 
-logger = logging.getLogger(__name__)
+    # records go through a queue, writing them never blocks the caller
+    setup_logging()
+
+    # subcommands run headless, Tk is only imported for the GUI
+    exit_code = cli.main(argv)
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    logger.info("Application started")
 
+    from tkinter import messagebox
 
-def main():
     try:
+        from pkgr.gui.main_window import PackageManagerApp
+
+        profile.mark("imports")
+
         app = PackageManagerApp()
 
         app.mainloop()
@@ -34,5 +43,4 @@ def main():
 
 
 if __name__ == "__main__":
-    logger.info("Application started")
     main()
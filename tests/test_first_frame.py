@@ -0,0 +1,44 @@
+"""
+The GUI draws its first frame within its budget.
+
+Uses the helpers of benchmarks/first_frame.py, see there for the measurement.
+"""
+
+import os
+import statistics
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location(
+    "first_frame_benchmark", ROOT / "benchmarks" / "first_frame.py"
+)
+first_frame = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(first_frame)
+
+RUNS = 3
+
+pytestmark = pytest.mark.skipif(
+    not first_frame.has_display(), reason="the first frame needs a display"
+)
+
+
+def test_first_frame_within_budget(tmp_path):
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(first_frame.SRC),
+        PKGR_CACHE_DIR=str(tmp_path / "cache"),
+        PKGR_LOG_DIR=str(tmp_path / "log"),
+        PKGR_SPANS_FILE="",
+    )
+    budget = float(
+        os.environ.get("PKGR_FIRST_FRAME_BUDGET_MS", first_frame.DEFAULT_BUDGET_MS)
+    )
+
+    first_frame.run_once(env)  # warms the caches
+    median = statistics.median(first_frame.run_once(env)[0] for _ in range(RUNS))
+
+    assert median <= budget, f"median {median:.0f} ms is over {budget:.0f} ms"
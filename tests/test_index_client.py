@@ -0,0 +1,73 @@
+"""IndexClient against a local simple-API index that sends ETags."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pkgr.core.index_client import IndexClient
+
+ETAG = '"v1"'
+
+
+class _Index(BaseHTTPRequestHandler):
+    statuses: list[int] = []
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            self.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+
+        body = json.dumps(
+            {
+                "meta": {"api-version": "1.0"},
+                "name": "demo",
+                "files": [
+                    {"filename": "demo-1.0.tar.gz"},
+                    {"filename": "demo-2.0-py3-none-any.whl"},
+                ],
+            }
+        ).encode()
+
+        self.statuses.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.pypi.simple.v1+json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Cache-Control", "max-age=0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def index():
+    _Index.statuses = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Index)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}/simple/"
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_revalidates_with_etag(index, tmp_path):
+    client = IndexClient(index_url=index, cache_dir=str(tmp_path))
+
+    first = client.get_project("demo")
+    assert first.versions == ["1.0", "2.0"]
+    assert _Index.statuses == [200]
+
+    # max-age=0: the cached page is revalidated, the 304 reuses it
+    again = client.get_many(["demo"])["demo"]
+    assert again == first
+    assert _Index.statuses == [200, 304]
+    assert len(list(tmp_path.glob("*.json"))) == 1
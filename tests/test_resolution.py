@@ -0,0 +1,71 @@
+"""
+A memoized plan is replayed as `--no-deps name==version` pins only when
+those pins are what the user asked for; local paths, URLs and requirements
+file options are installed from the original request.
+"""
+
+import pytest
+
+from pkgr.core.package_manager import PackageManager
+from pkgr.core.resolution import PlanCache, plan_from_changes, replayable
+
+
+@pytest.fixture
+def cached_plan(monkeypatch):
+    """Memoize the plan uv printed for installing mypkg from a local path."""
+
+    monkeypatch.setattr(PackageManager, "_plan_key", staticmethod(lambda *a: "key"))
+    monkeypatch.setattr(
+        PackageManager, "_wheelhouse_args", staticmethod(lambda: ([], []))
+    )
+    monkeypatch.setattr(PlanCache, "_instance", PlanCache())
+
+    changes = PackageManager.parse_uv_changes(
+        " + mypkg==0.1.0 (from file:///tmp/mypkg)"
+    )
+    assert changes["added"] == {"mypkg": "0.1.0"}
+
+    PlanCache.default().put("key", plan_from_changes(("mypkg",), False, changes))
+
+
+@pytest.mark.parametrize(
+    "requirement",
+    [
+        "./mypkg",
+        "/tmp/mypkg",
+        "mypkg @ file:///tmp/mypkg",
+        "git+https://example.org/mypkg",
+    ],
+)
+def test_local_and_url_installs_are_not_replayed(cached_plan, requirement):
+    _, online = PackageManager._install_commands([requirement])
+
+    assert "--no-deps" not in online
+    assert requirement in online
+    assert "mypkg==0.1.0" not in online
+
+
+def test_plain_requirements_are_replayed(cached_plan):
+    _, online = PackageManager._install_commands(["mypkg>=0.1"])
+
+    assert online[:4] == ["uv", "pip", "install", "--no-deps"]
+    assert "mypkg==0.1.0" in online
+
+
+def test_requirements_file_options_are_kept(cached_plan, tmp_path):
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("--index-url https://example.org/simple\nmypkg\n")
+
+    _, online = PackageManager._install_commands([], str(requirements))
+
+    assert "--no-deps" not in online
+    assert online[-2:] == ["-r", str(requirements)]
+
+
+def test_replayable():
+    assert replayable(
+        ["requests", "Flask[async]>=2,<4", 'tomli; python_version < "3.11"']
+    )
+    assert not replayable(["-e", "."])
+    assert not replayable(["mypkg-0.1.0-py3-none-any.whl"])
+    assert not replayable(["https://example.org/mypkg-0.1.0.tar.gz"])
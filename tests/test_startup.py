@@ -0,0 +1,51 @@
+"""
+`pkgr list` stays headless and within its startup budget.
+
+Uses the helpers of benchmarks/startup.py, see there for the measurement.
+"""
+
+import os
+import sys
+import statistics
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_spec = importlib.util.spec_from_file_location(
+    "startup_benchmark", ROOT / "benchmarks" / "startup.py"
+)
+startup = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(startup)
+
+RUNS = 5
+
+
+@pytest.fixture
+def cli(tmp_path):
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(startup.SRC),
+        PKGR_CACHE_DIR=str(tmp_path / "cache"),
+        PKGR_LOG_DIR=str(tmp_path / "log"),
+        PKGR_SPANS_FILE="",
+    )
+    args = ["list", "--format", "ndjson", "--prefix", sys.prefix]
+
+    return args, env
+
+
+def test_list_does_not_import_gui(cli):
+    assert startup.gui_modules(*cli) == []
+
+
+def test_list_within_startup_budget(cli):
+    args, env = cli
+    budget = float(os.environ.get("PKGR_STARTUP_BUDGET_MS", startup.DEFAULT_BUDGET_MS))
+
+    startup.run_once(args, env)  # fills the metadata store
+    median = statistics.median(startup.run_once(args, env) for _ in range(RUNS))
+
+    assert median <= budget, f"median {median:.0f} ms is over {budget:.0f} ms"
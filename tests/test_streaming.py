@@ -0,0 +1,40 @@
+"""
+Rows of `uv pip list --format=json` reach the caller while uv is still
+writing, although uv puts the whole array on a single line.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from pkgr.core.package_manager import PackageManager
+
+FAKE_UV = Path(__file__).resolve().parent.parent / "benchmarks" / "fake_uv.py"
+
+PACKAGES = 5
+SECONDS = 1.0
+
+
+def test_single_line_list_streams_rows(monkeypatch):
+    monkeypatch.setenv("PKGR_FAKE_PACKAGES", str(PACKAGES))
+    monkeypatch.setenv("PKGR_FAKE_STREAM_SECONDS", str(SECONDS))
+    monkeypatch.setenv("PKGR_SPANS_FILE", "")
+
+    arrivals = []
+    start = time.perf_counter()
+
+    def on_rows(rows):
+        arrivals.extend(time.perf_counter() - start for _ in rows)
+
+    packages = PackageManager._stream_uv_list(
+        [sys.executable, str(FAKE_UV), "uv", "pip", "list", "--format=json"],
+        lambda pkg: (pkg["name"], pkg["version"]),
+        on_rows,
+        "test:stream_list",
+    )
+    total = time.perf_counter() - start
+
+    assert len(packages) == PACKAGES
+    assert len(arrivals) == PACKAGES
+    # the first row shows up long before the array is complete
+    assert arrivals[0] < total - SECONDS / 2